@@ -0,0 +1,176 @@
+"""
+Endpoint bazında kabul kontrolü (admission control) ve kademeli hizmet düşürme
+
+Her endpoint'in aynı anda çalışabilecek istek sayısı sınırlıdır; sınır
+doluysa istek sınırlı bir kuyrukta bekler. Kuyruk doluysa veya bekleme
+süresi aşılırsa istek hemen HTTP 503 + Retry-After ile reddedilir
+(yavaş Groq çağrılarının arkasında sınırsız iş birikmez).
+
+Kuyrukta bekleyerek kabul edilen istekler, kabul anındaki kuyruk
+derinliğine göre bir yük kademesi alır:
+
+    full        -> tüm aşamalar
+    no_rag      -> RAG aşaması atlanır
+    no_analyzer -> RAG ve CV Analyzer (LLM analiz) aşamaları atlanır
+    score_only  -> sadece yerel skor döndürülür
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from werkzeug.exceptions import ServiceUnavailable
+
+LOAD_TIERS = ("full", "no_rag", "no_analyzer", "score_only")
+
+
+class ServerOverloadedError(ServiceUnavailable):
+    """Endpoint kuyruğu dolu veya bekleme süresi aşıldığında"""
+
+
+def parse_limits(spec: str) -> Dict[str, int]:
+    """
+    "analyze=4,score=16" biçimindeki endpoint sınırlarını okur
+
+    Returns:
+        endpoint adı -> eşzamanlı istek sınırı
+    """
+    limits = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            limits[name.strip()] = int(value)
+    return limits
+
+
+class _Gate:
+    """Tek bir endpoint'in sayaçları"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.tiers = {tier: 0 for tier in LOAD_TIERS}
+        # Ortalama servis süresinin üstel hareketli ortalaması (Retry-After tahmini için)
+        self.service_seconds = 1.0
+
+
+class AdmissionController:
+    """Thread-safe, endpoint başına sınırlı eşzamanlılık ve kuyruk derinliğine göre yük atma"""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, default_limit: int = 8,
+                 max_queue: int = 16, queue_timeout: float = 30.0,
+                 tier_depths: Tuple[int, int, int] = (1, 3, 6)):
+        """
+        Args:
+            limits: endpoint adı -> eşzamanlı istek sınırı
+            default_limit: limits'te olmayan endpoint'lerin sınırı
+            max_queue: Endpoint başına bekleyebilecek en fazla istek (üstü 503)
+            queue_timeout: Kuyrukta en fazla bekleme süresi (saniye, aşılırsa 503)
+            tier_depths: no_rag, no_analyzer ve score_only kademelerine geçilen kuyruk derinlikleri
+        """
+        self.limits = limits or {}
+        self.default_limit = default_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.tier_depths = tier_depths
+        self._gates: Dict[str, _Gate] = {}
+        self._condition = threading.Condition()
+
+    def _gate(self, endpoint: str) -> _Gate:
+        gate = self._gates.get(endpoint)
+        if gate is None:
+            gate = self._gates[endpoint] = _Gate(self.limits.get(endpoint, self.default_limit))
+        return gate
+
+    def _tier(self, depth: int) -> str:
+        tier = LOAD_TIERS[0]
+        for candidate, threshold in zip(LOAD_TIERS[1:], self.tier_depths):
+            if depth >= threshold:
+                tier = candidate
+        return tier
+
+    def _retry_after(self, gate: _Gate) -> int:
+        # Kuyruğun boşalması için gereken yaklaşık süre
+        return max(1, math.ceil(gate.service_seconds * (gate.queued + 1) / gate.limit))
+
+    def _reject(self, gate: _Gate, endpoint: str, reason: str):
+        gate.rejected += 1
+        retry_after = self._retry_after(gate)
+        print(f"🚦 İstek reddedildi ({endpoint}): {reason}, Retry-After: {retry_after} sn")
+        raise ServerOverloadedError(f"Sunucu yoğun, lütfen {retry_after} saniye sonra tekrar deneyin",
+                                    retry_after=retry_after)
+
+    def acquire(self, endpoint: str, timeout: Optional[float] = None) -> str:
+        """
+        Endpoint için yer ayırır; gerekirse kuyrukta bekler
+
+        Args:
+            endpoint: Endpoint adı
+            timeout: En fazla bekleme süresi (queue_timeout'tan uzunsa queue_timeout kullanılır)
+
+        Returns:
+            Yük kademesi (LOAD_TIERS)
+
+        Raises:
+            ServerOverloadedError: Kuyruk dolu veya bekleme süresi aşıldı
+        """
+        with self._condition:
+            gate = self._gate(endpoint)
+            if gate.in_flight < gate.limit and gate.queued == 0:
+                tier = LOAD_TIERS[0]
+            else:
+                if gate.queued >= self.max_queue:
+                    self._reject(gate, endpoint, f"kuyruk dolu ({gate.queued})")
+                # Kademe, isteğin kuyruğa girdiği andaki derinliğe göre belirlenir
+                tier = self._tier(gate.queued + 1)
+                wait_seconds = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+                gate.queued += 1
+                try:
+                    admitted = self._condition.wait_for(lambda: gate.in_flight < gate.limit, wait_seconds)
+                finally:
+                    gate.queued -= 1
+                if not admitted:
+                    self._reject(gate, endpoint, f"{wait_seconds:g} sn beklendi")
+            gate.in_flight += 1
+            gate.admitted += 1
+            gate.tiers[tier] += 1
+            return tier
+
+    def release(self, endpoint: str, elapsed: float) -> None:
+        """Ayrılan yeri bırakır ve servis süresi tahminini günceller"""
+        with self._condition:
+            gate = self._gate(endpoint)
+            gate.in_flight -= 1
+            gate.service_seconds = 0.8 * gate.service_seconds + 0.2 * elapsed
+            self._condition.notify_all()
+
+    @contextmanager
+    def admit(self, endpoint: str, timeout: Optional[float] = None) -> Iterator[str]:
+        """acquire / release çiftini saran context manager; yük kademesini verir"""
+        tier = self.acquire(endpoint, timeout)
+        started = time.monotonic()
+        try:
+            yield tier
+        finally:
+            self.release(endpoint, time.monotonic() - started)
+
+    def stats(self) -> dict:
+        """Endpoint başına anlık yük ve sayaçları döndürür"""
+        with self._condition:
+            return {
+                endpoint: {
+                    "limit": gate.limit,
+                    "in_flight": gate.in_flight,
+                    "queued": gate.queued,
+                    "admitted": gate.admitted,
+                    "rejected": gate.rejected,
+                    "tiers": dict(gate.tiers),
+                    "service_seconds": round(gate.service_seconds, 3),
+                }
+                for endpoint, gate in self._gates.items()
+            }
@@ -6,9 +6,11 @@ Bu modül farklı AI ajanlarını içerir.
 from .cv_analyzer_agent import CVAnalyzerAgent
 from .interview_questions_agent import InterviewQuestionsAgent
 from .cv_improvement_agent import CVImprovementAgent
+from .cv_report_agent import CVReportAgent
 
 __all__ = [
     'CVAnalyzerAgent',
     'InterviewQuestionsAgent', 
-    'CVImprovementAgent'
+    'CVImprovementAgent',
+    'CVReportAgent'
 ]
@@ -7,6 +7,9 @@ import os
 import re
 from groq import Groq
 from dotenv import load_dotenv
+from circuit_breaker import LLMUnavailableError
+from deadlines import Deadline, DeadlineExceeded
+from .llm_client import create_chat_completion
 
 # .env dosyasındaki değişkenleri yükle
 load_dotenv('config.env')
@@ -22,7 +25,7 @@ class CVAnalyzerAgent:
         self.client = Groq(api_key=self.api_key)
         self.model = "llama3-70b-8192"
     
-    def analyze(self, cv_text: str, job_text: str, company_name: str = None, language: str = 'Türkçe') -> str:
+    def analyze(self, cv_text: str, job_text: str, company_name: str = None, language: str = 'Türkçe', deadline: Deadline = None, mode: str = None) -> str:
         """
         CV ve iş ilanı arasındaki uyumu analiz eder.
         
@@ -31,6 +34,8 @@ class CVAnalyzerAgent:
             job_text: İş ilanı metni
             company_name: Şirket adı (opsiyonel)
             language: Dil seçimi
+            deadline: İsteğin son tarihi (opsiyonel)
+            mode: Model modu: auto / fast / quality (opsiyonel)
             
         Returns:
             Detaylı analiz sonucu
@@ -89,9 +94,14 @@ GÖREV: Bu CV'nin iş ilanına uygunluğunu analiz et ve aşağıdaki şık, emo
             
             print("✅ Prompt oluşturuldu, API'ye istek gönderiliyor...")
             
-            response = self.client.chat.completions.create(
+            response = create_chat_completion(
+                self.client,
                 messages=[{"role": "user", "content": prompt}],
                 model=self.model,
+                deadline=deadline,
+                mode=mode,
+                stage="CVAnalyzerAgent.analyze",
+                prompt_fields={"cv_text": cv_text, "job_text": job_text},
                 temperature=0.7,
                 max_tokens=1500
             )
@@ -100,11 +110,13 @@ GÖREV: Bu CV'nin iş ilanına uygunluğunu analiz et ve aşağıdaki şık, emo
             
             return response.choices[0].message.content
             
+        except (DeadlineExceeded, LLMUnavailableError):
+            raise
         except Exception as e:
             print(f"❌ HATA: {type(e).__name__} - {e}")
             return f"Analiz sırasında hata oluştu: {str(e)}"
 
-    def get_quick_analysis(self, cv_text: str, job_text: str, language: str = 'Türkçe') -> str:
+    def get_quick_analysis(self, cv_text: str, job_text: str, language: str = 'Türkçe', deadline: Deadline = None, mode: str = None) -> str:
         """
         Hızlı CV analizi yapar.
         
@@ -112,6 +124,8 @@ GÖREV: Bu CV'nin iş ilanına uygunluğunu analiz et ve aşağıdaki şık, emo
             cv_text: CV metni
             job_text: İş ilanı metni
             language: Dil seçimi
+            deadline: İsteğin son tarihi (opsiyonel)
+            mode: Model modu: auto / fast / quality (varsayılan: fast)
             
         Returns:
             Hızlı analiz sonucu
@@ -155,14 +169,21 @@ Genel Uyum: [İyi/Orta/Geliştirilmeli]
 ÖNEMLİ: Sadece {language} dilinde cevap ver, kısa ve şık tut. Emoji kullan. Markdown formatı kullanma, sadece düz metin yaz.
 """
             
-            response = self.client.chat.completions.create(
+            response = create_chat_completion(
+                self.client,
                 messages=[{"role": "user", "content": prompt}],
                 model=self.model,
+                deadline=deadline,
+                mode=mode or "fast",
+                stage="CVAnalyzerAgent.get_quick_analysis",
+                prompt_fields={"cv_text": cv_text, "job_text": job_text},
                 temperature=0.6,
                 max_tokens=800
             )
             
             return response.choices[0].message.content
             
+        except (DeadlineExceeded, LLMUnavailableError):
+            raise
         except Exception as e:
             return f"Hızlı analiz sırasında hata oluştu: {str(e)}"
\ No newline at end of file
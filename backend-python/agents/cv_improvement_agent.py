@@ -7,6 +7,9 @@ import os
 import json
 from groq import Groq
 from dotenv import load_dotenv
+from circuit_breaker import LLMUnavailableError
+from deadlines import Deadline, DeadlineExceeded
+from .llm_client import create_chat_completion
 
 # .env dosyasındaki değişkenleri yükle
 load_dotenv('config.env')
@@ -22,7 +25,7 @@ class CVImprovementAgent:
         self.client = Groq(api_key=self.api_key)
         self.model = "llama3-70b-8192"
     
-    def get_suggestions(self, cv_text: str, job_text: str, company_name: str = None, language: str = 'Türkçe') -> str:
+    def get_suggestions(self, cv_text: str, job_text: str, company_name: str = None, language: str = 'Türkçe', deadline: Deadline = None, mode: str = None) -> str:
         """
         CV'yi iş ilanına göre iyileştirme önerileri üretir.
         
@@ -31,6 +34,8 @@ class CVImprovementAgent:
             job_text: İş ilanı metni
             company_name: Şirket adı (opsiyonel)
             language: Dil seçimi
+            deadline: İsteğin son tarihi (opsiyonel)
+            mode: Model modu: auto / fast / quality (opsiyonel)
             
         Returns:
             Detaylı iyileştirme önerileri
@@ -164,9 +169,14 @@ GÖREV: Bu CV'yi iş ilanına göre iyileştirmek için çok detaylı ve pratik
             
             print("✅ Prompt oluşturuldu, API'ye istek gönderiliyor...")
             
-            response = self.client.chat.completions.create(
+            response = create_chat_completion(
+                self.client,
                 messages=[{"role": "user", "content": prompt}],
                 model=self.model,
+                deadline=deadline,
+                mode=mode,
+                stage="CVImprovementAgent.get_suggestions",
+                prompt_fields={"cv_text": cv_text, "job_text": job_text},
                 temperature=0.7,
                 max_tokens=4000
             )
@@ -174,11 +184,13 @@ GÖREV: Bu CV'yi iş ilanına göre iyileştirmek için çok detaylı ve pratik
             print("✅ CV iyileştirme önerileri oluşturuldu!")
             return response.choices[0].message.content
             
+        except (DeadlineExceeded, LLMUnavailableError):
+            raise
         except Exception as e:
             print(f"❌ HATA: {type(e).__name__} - {e}")
             return f"CV iyileştirme önerileri oluşturulurken hata oluştu: {str(e)}"
 
-    def get_quick_tips(self, cv_text: str, job_text: str, language: str = 'Türkçe') -> str:
+    def get_quick_tips(self, cv_text: str, job_text: str, language: str = 'Türkçe', deadline: Deadline = None, mode: str = None) -> str:
         """
         Hızlı CV iyileştirme ipuçları üretir.
         
@@ -186,6 +198,8 @@ GÖREV: Bu CV'yi iş ilanına göre iyileştirmek için çok detaylı ve pratik
             cv_text: CV metni
             job_text: İş ilanı metni
             language: Dil seçimi
+            deadline: İsteğin son tarihi (opsiyonel)
+            mode: Model modu: auto / fast / quality (varsayılan: fast)
             
         Returns:
             Hızlı ipuçları
@@ -223,14 +237,21 @@ Fayda: [Beklenen fayda]
 ÖNEMLİ: Sadece {language} dilinde cevap ver ve pratik, uygulanabilir öneriler sun. Markdown formatı kullanma, sadece düz metin yaz.
 """
             
-            response = self.client.chat.completions.create(
+            response = create_chat_completion(
+                self.client,
                 messages=[{"role": "user", "content": prompt}],
                 model=self.model,
+                deadline=deadline,
+                mode=mode or "fast",
+                stage="CVImprovementAgent.get_quick_tips",
+                prompt_fields={"cv_text": cv_text, "job_text": job_text},
                 temperature=0.6,
                 max_tokens=1500
             )
             
             return response.choices[0].message.content
             
+        except (DeadlineExceeded, LLMUnavailableError):
+            raise
         except Exception as e:
             return f"Hızlı ipuçları oluşturulurken hata oluştu: {str(e)}"
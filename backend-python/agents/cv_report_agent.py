@@ -0,0 +1,112 @@
+"""
+CV Report Agent
+Analiz, iyileştirme önerileri ve mülakat sorularını tek bir istekte üreten ajan.
+"""
+
+import json
+import os
+from typing import Dict, Optional
+from groq import Groq
+from dotenv import load_dotenv
+from circuit_breaker import LLMUnavailableError
+from deadlines import Deadline, DeadlineExceeded
+from .llm_client import create_chat_completion
+
+# .env dosyasındaki değişkenleri yükle
+load_dotenv('config.env')
+
+REPORT_SECTIONS = ("analysis", "suggestions", "questions")
+
+class CVReportAgent:
+    """CV ve iş ilanı için üç bölümlük raporu tek bir JSON çıktılı istekte üreten ajan"""
+
+    def __init__(self):
+        self.api_key = os.getenv("GROQ_API_KEY")
+        if not self.api_key:
+            raise ValueError("GROQ_API_KEY bulunamadı!")
+
+        self.client = Groq(api_key=self.api_key)
+        self.model = "llama3-70b-8192"
+
+    def generate_report(self, cv_text: str, job_text: str, company_name: str = None,
+                        language: str = 'Türkçe', deadline: Deadline = None, mode: str = None) -> Optional[Dict[str, str]]:
+        """
+        CV ve iş ilanı için analiz, öneriler ve mülakat sorularını tek istekte üretir.
+
+        CV ve ilan metni üç ayrı istek yerine bir kez gönderilir; çıktı
+        JSON modunda alınıp bölümlere ayrılır.
+
+        Args:
+            cv_text: CV metni
+            job_text: İş ilanı metni
+            company_name: Şirket adı (opsiyonel)
+            language: Dil seçimi
+            deadline: İsteğin son tarihi (opsiyonel)
+            mode: Model modu: auto / fast / quality (opsiyonel)
+
+        Returns:
+            {"analysis", "suggestions", "questions"} sözlüğü veya hata durumunda None
+        """
+        print("\n--- CV REPORT AGENT ÇALIŞIYOR ---")
+
+        try:
+            prompt = f"""
+Sen bir uzman CV analisti, CV danışmanı ve mülakat uzmanısın. Aşağıdaki CV ve iş ilanı için üç bölümlük bir rapor hazırla.
+
+CV METNİ:
+{cv_text}
+
+İŞ İLANI METNİ:
+{job_text}
+
+ŞİRKET: {company_name if company_name else 'Belirtilmemiş'}
+
+GÖREV: Sadece aşağıdaki anahtarlara sahip geçerli bir JSON nesnesi döndür. Her değer düz metin (string) olmalı:
+
+{{
+  "analysis": "📊 KARİYER ANALİZ RAPORU: genel uyum değerlendirmesi (2-3 cümle), en önemli 3 güçlü yön, en kritik 3 geliştirme alanı, 3 hızlı öneri, uyum skoru (Mükemmel/İyi/Orta/Geliştirilmeli) ve 1-2 cümlelik sonuç",
+  "suggestions": "🎯 CV GELİŞTİRME ÖNERİLERİ: genel değerlendirme, önceki/sonraki örnekleriyle 2 öncelikli iyileştirme, iş deneyimi / eğitim / teknik yetenek bölümleri için öneriler, şirkete özel öneriler, önerilen sertifikalar ve 5 maddelik hızlı eylem listesi",
+  "questions": "🎯 MÜLAKAT SORULARI VE CEVAPLARI: teknik, deneyim, davranışsal, motivasyon ve şirket uyumu başlıklarında 5 soru ve her biri için kısa cevap"
+}}
+
+ÖNEMLİ KURALLAR:
+- Sadece {language} dilinde cevap ver
+- JSON dışında hiçbir metin yazma
+- Bölüm içlerinde emojili, şık kart formatı kullan; satırları \\n ile ayır
+- CV'deki gerçek içeriğe ve iş ilanındaki gereksinimlere dayan
+- Kısa, pratik ve motivasyonel ol
+"""
+
+            print("✅ Prompt oluşturuldu, API'ye istek gönderiliyor...")
+
+            response = create_chat_completion(
+                self.client,
+                messages=[{"role": "user", "content": prompt}],
+                model=self.model,
+                deadline=deadline,
+                mode=mode,
+                stage="CVReportAgent.generate_report",
+                prompt_fields={"cv_text": cv_text, "job_text": job_text},
+                temperature=0.7,
+                max_tokens=4000,
+                response_format={"type": "json_object"}
+            )
+
+            report = json.loads(response.choices[0].message.content)
+            missing = [section for section in REPORT_SECTIONS if not isinstance(report.get(section), str) or not report[section].strip()]
+            if missing:
+                print(f"❌ Rapor eksik bölüm içeriyor: {missing}")
+                return None
+
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                print(f"✅ Birleşik rapor oluşturuldu! (girdi: {usage.prompt_tokens} token, çıktı: {usage.completion_tokens} token)")
+            else:
+                print("✅ Birleşik rapor oluşturuldu!")
+            return {section: report[section] for section in REPORT_SECTIONS}
+
+        except (DeadlineExceeded, LLMUnavailableError):
+            raise
+        except Exception as e:
+            print(f"❌ HATA: {type(e).__name__} - {e}")
+            return None
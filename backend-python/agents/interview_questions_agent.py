@@ -6,6 +6,9 @@ CV ve iş ilanına göre mülakat soruları üreten ajan.
 import os
 from groq import Groq
 from dotenv import load_dotenv
+from circuit_breaker import LLMUnavailableError
+from deadlines import Deadline, DeadlineExceeded
+from .llm_client import create_chat_completion
 
 # .env dosyasındaki değişkenleri yükle
 load_dotenv('config.env')
@@ -21,13 +24,17 @@ class InterviewQuestionsAgent:
         self.client = Groq(api_key=self.api_key)
         self.model = "llama3-70b-8192"
     
-    def generate_questions(self, cv_text: str, job_text: str) -> str:
+    def generate_questions(self, cv_text: str, job_text: str, company_name: str = None, language: str = 'Türkçe', deadline: Deadline = None, mode: str = None) -> str:
         """
         CV ve iş ilanına göre mülakat soruları üretir.
         
         Args:
             cv_text: CV metni
             job_text: İş ilanı metni
+            company_name: Şirket adı (opsiyonel)
+            language: Dil seçimi
+            deadline: İsteğin son tarihi (opsiyonel)
+            mode: Model modu: auto / fast / quality (opsiyonel)
             
         Returns:
             Mülakat soruları metni
@@ -44,6 +51,8 @@ CV METNİ:
 İŞ İLANI METNİ:
 {job_text}
 
+ŞİRKET: {company_name if company_name else 'Belirtilmemiş'}
+
 GÖREV: 5 adet mülakat sorusu ve her soru için kısa cevap hazırla. Her seferinde farklı ve yaratıcı sorular üret:
 
 🎯 MÜLAKAT SORULARI VE CEVAPLARI
@@ -72,16 +81,21 @@ GÖREV: 5 adet mülakat sorusu ve her soru için kısa cevap hazırla. Her sefer
 - Her seferinde tamamen farklı sorular üret
 - Her soru CV ve iş ilanına uygun olsun
 - Cevaplar kısa ve pratik olsun
-- Türkçe dilinde yaz
+- Sadece {language} dilinde yaz
 - Emoji kullanarak görsel çekicilik kat
 - Markdown formatı kullanma, sadece düz metin yaz
 - Yaratıcı ve çeşitli sorular sor"""
             
             print("✅ Prompt oluşturuldu, API'ye istek gönderiliyor...")
             
-            response = self.client.chat.completions.create(
+            response = create_chat_completion(
+                self.client,
                 messages=[{"role": "user", "content": prompt}],
                 model=self.model,
+                deadline=deadline,
+                mode=mode,
+                stage="InterviewQuestionsAgent.generate_questions",
+                prompt_fields={"cv_text": cv_text, "job_text": job_text},
                 temperature=0.9,
                 max_tokens=1200
             )
@@ -89,6 +103,8 @@ GÖREV: 5 adet mülakat sorusu ve her soru için kısa cevap hazırla. Her sefer
             print("✅ Mülakat soruları oluşturuldu!")
             return response.choices[0].message.content
             
+        except (DeadlineExceeded, LLMUnavailableError):
+            raise
         except Exception as e:
             print(f"❌ HATA: {type(e).__name__} - {e}")
             return f"Mülakat soruları oluşturulurken hata oluştu: {str(e)}"
@@ -0,0 +1,90 @@
+"""
+Ajanların ortak Groq chat completion çağrısı
+
+Tüm ajanlar LLM'i bu fonksiyon üzerinden çağırır; istek deadline'ı
+verildiyse süresi dolmuş çağrılar başlatılmaz ve kalan süre istemci
+zaman aşımı olarak kullanılır. Model her çağrıda model_router ile seçilir
+ve her model bir devre kesicinin arkasındadır: Groq'a ulaşılamıyorsa çağrı
+beklemeden LLMUnavailableError fırlatır. Prompt bağlam penceresine
+sığdırılır, max_tokens token_accounting ile belirlenir ve kullanım isteğin
+token hesabına yazılır.
+"""
+
+import time
+
+from groq import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+from circuit_breaker import LLMUnavailableError, get_circuit_breaker
+from deadlines import Deadline, DeadlineExceeded
+from model_router import model_router
+from token_accounting import estimate_prompt_tokens, fit_prompt, plan_max_tokens, record_usage
+
+# Groq'un kullanılamadığını gösteren hatalar (devre kesicide hatalı sayılır)
+UNAVAILABLE_ERRORS = (APIConnectionError, InternalServerError, RateLimitError)
+
+
+def create_chat_completion(client, model: str, messages: list, deadline: Deadline = None,
+                           stage: str = "LLM", mode: str = None, prompt_fields: dict = None, **kwargs):
+    """
+    Groq chat completion isteği gönderir
+
+    Args:
+        client: Groq istemcisi
+        model: Ajanın tercih ettiği model (model_router son kararı verir)
+        messages: Sohbet mesajları
+        deadline: İsteğin son tarihi (opsiyonel)
+        stage: Log ve hata mesajı için aşama adı
+        mode: Model modu: auto / fast / quality (opsiyonel)
+        prompt_fields: Prompt'a gömülü alanlar (cv_text, job_text ...); prompt sığmazsa sadece bunlar kısaltılır
+        **kwargs: temperature vb. ek parametreler; max_tokens üst sınır olarak kullanılır
+
+    Returns:
+        Groq ChatCompletion yanıtı
+
+    Raises:
+        DeadlineExceeded: Süre çağrıdan önce veya çağrı sırasında dolarsa
+        LLMUnavailableError: Modelin devresi açıksa veya Groq bağlantı / sunucu hatası verirse
+        PromptTooLargeError: Prompt alanlar kısaltılarak da bağlam penceresine sığmıyorsa (LLMUnavailableError)
+    """
+    if deadline is not None:
+        deadline.check(stage)
+        kwargs["timeout"] = deadline.timeout()
+        # Her yeniden deneme yine kalan sürenin tamamını bekleyeceğinden deadline'lı çağrılar yeniden denenmez
+        client = client.with_options(max_retries=0)
+
+    input_tokens = estimate_prompt_tokens(messages)
+    # Üst sınır verilmeyen çağrılarda yönlendirme tahmini için bağlamda kalan yer kullanılır
+    output_cap = kwargs.get("max_tokens") or plan_max_tokens(model, input_tokens)
+    model, _ = model_router.route(model, input_tokens, output_cap, mode, deadline, stage)
+    messages, input_tokens = fit_prompt(messages, input_tokens, model, stage, kwargs.get("max_tokens"),
+                                       prompt_fields)
+    kwargs["max_tokens"] = plan_max_tokens(model, input_tokens, kwargs.get("max_tokens"))
+
+    breaker = get_circuit_breaker(model)
+    probe = breaker.before_call(stage)
+    started = time.monotonic()
+    # None: sonuç Groq'un durumunu göstermiyor (4xx, bozuk yanıt, deadline), devre kesicide nötr
+    failed = None
+    try:
+        response = client.chat.completions.create(messages=messages, model=model, **kwargs)
+        usage = getattr(response, "usage", None)
+        record_usage(input_tokens, usage)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        total_tokens = getattr(usage, "total_tokens", None) or input_tokens + (completion_tokens or kwargs["max_tokens"])
+        model_router.observe(model, time.monotonic() - started, total_tokens, stage, completion_tokens)
+        failed = False
+        return response
+    except UNAVAILABLE_ERRORS as e:
+        if isinstance(e, APITimeoutError) and deadline is not None and deadline.expired():
+            # İstemcinin kısa tuttuğu süre Groq hatası sayılmaz; süre yeterince uzunsa yavaş çağrı olarak kaydedilir
+            if time.monotonic() - started >= breaker.slow_call_seconds:
+                failed = False
+            raise DeadlineExceeded(f"İstek süresi LLM çağrısı sırasında doldu: {stage}") from e
+        failed = True
+        raise LLMUnavailableError(f"{model} kullanılamıyor: {type(e).__name__}",
+                                  model=model, stage=stage) from e
+    finally:
+        if failed is None:
+            breaker.release(probe)
+        else:
+            breaker.record(time.monotonic() - started, failed, probe)
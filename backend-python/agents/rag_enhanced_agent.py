@@ -6,9 +6,12 @@ Belge tabanlı bilgi ile geliştirilmiş CV analiz ajanı.
 import os
 import glob
 from groq import Groq
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
 from dotenv import load_dotenv
+from circuit_breaker import LLMUnavailableError
+from deadlines import Deadline, DeadlineExceeded
+from .llm_client import create_chat_completion
+from matching_engine import (VECTOR_BACKEND, get_embeddings, get_index_version, load_vectorstore,
+                             retrieve_documents)
 
 load_dotenv('config.env')
 
@@ -21,13 +24,14 @@ class RAGEnhancedAgent:
         self.model = "llama3-8b-8192"
         self.documents_path = "documents/"
         
-        # ChromaDB ve Embedding modelini hazırla
+        # Vektör deposu (ChromaDB veya düz indeks) ve Embedding modelini hazırla
         try:
-            self.embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-            self.vectordb = Chroma(persist_directory="./chroma_db", embedding_function=self.embeddings)
-            print("✅ RAG Agent: ChromaDB ve Embedding modeli hazır")
+            self.embeddings = get_embeddings()
+            self.index_version = get_index_version()
+            self.vectordb = load_vectorstore(self.embeddings)
+            print(f"✅ RAG Agent: Vektör deposu ({VECTOR_BACKEND}) ve Embedding modeli hazır")
         except Exception as e:
-            print(f"❌ RAG Agent: ChromaDB yüklenirken hata: {e}")
+            print(f"❌ RAG Agent: Vektör deposu yüklenirken hata: {e}")
             self.vectordb = None
         
     def _load_documents(self):
@@ -46,17 +50,20 @@ class RAGEnhancedAgent:
                 
         return "\n\n".join(documents)
     
-    def retrieve_context(self, job_text: str, k: int = 5) -> str:
+    def retrieve_context(self, job_text: str, k: int = 5, deadline: Deadline = None) -> str:
         """
         ChromaDB'den iş ilanına en yakın belge parçalarını getirir
         
         Args:
             job_text: İş ilanı metni
             k: Kaç adet belge parçası getirileceği (varsayılan: 5)
+            deadline: İsteğin son tarihi (opsiyonel)
             
         Returns:
             En alakalı belge parçalarının birleştirilmiş metni
         """
+        if deadline is not None:
+            deadline.check("RAGEnhancedAgent.retrieve_context")
         try:
             if not self.vectordb:
                 print("❌ ChromaDB kullanılamıyor, eski yöntem kullanılıyor...")
@@ -64,8 +71,15 @@ class RAGEnhancedAgent:
             
             print(f"🔍 ChromaDB'den en alakalı {k} belge parçası aranıyor...")
             
-            # İş ilanı metnini embedding'e çevir ve en alakalı belgeleri bul
-            relevant_docs = self.vectordb.similarity_search(job_text, k=k)
+            # Depo yeniden oluşturulduysa yeni versiyonu yükle
+            index_version = get_index_version()
+            if index_version != self.index_version:
+                print(f"🔄 Vektör deposu güncellenmiş ({index_version}), yeniden yükleniyor...")
+                self.vectordb = load_vectorstore(self.embeddings)
+                self.index_version = index_version
+            
+            # İş ilanı metnini embedding'e çevir ve en alakalı belgeleri bul (önbellek destekli)
+            relevant_docs = retrieve_documents(self.vectordb, job_text, k, index_version)
             
             # Bulunan belgeleri birleştir
             context_parts = []
@@ -83,11 +97,11 @@ class RAGEnhancedAgent:
             # Hata durumunda eski yöntemi kullan
             return self._load_documents()
     
-    def analyze_with_rag(self, cv_text: str, job_text: str, company_name: str = None, language: str = 'Türkçe') -> str:
+    def analyze_with_rag(self, cv_text: str, job_text: str, company_name: str = None, language: str = 'Türkçe', deadline: Deadline = None, mode: str = None) -> str:
         """RAG destekli CV analizi yapar"""
         try:
             # ChromaDB'den en alakalı belgeleri getir
-            knowledge_base = self.retrieve_context(job_text, k=5)
+            knowledge_base = self.retrieve_context(job_text, k=5, deadline=deadline)
             
             # Çok güçlü dil direktifi
             if company_name:
@@ -170,7 +184,8 @@ GÖREV: Bu CV'nin iş ilanına ne kadar uygun olduğunu analiz et ve şu formatt
 """
 
             # Groq API'ye istek gönder
-            chat_completion = self.client.chat.completions.create(
+            chat_completion = create_chat_completion(
+                self.client,
                 messages=[
                     {
                         "role": "user",
@@ -178,20 +193,26 @@ GÖREV: Bu CV'nin iş ilanına ne kadar uygun olduğunu analiz et ve şu formatt
                     }
                 ],
                 model=self.model,
+                deadline=deadline,
+                mode=mode,
+                stage="RAGEnhancedAgent.analyze_with_rag",
+                prompt_fields={"cv_text": cv_text, "job_text": job_text, "knowledge_base": knowledge_base},
             )
             
             # Gerçek analizi döndür
             return chat_completion.choices[0].message.content
             
+        except (DeadlineExceeded, LLMUnavailableError):
+            raise
         except Exception as e:
             print(f"❌ RAG Analiz hatası: {e}")
             return f"RAG analizi sırasında bir hata oluştu: {str(e)}"
     
-    def generate_questions_with_rag(self, cv_text: str, job_text: str) -> str:
+    def generate_questions_with_rag(self, cv_text: str, job_text: str, deadline: Deadline = None, mode: str = None) -> str:
         """RAG destekli mülakat soruları üretir"""
         try:
             # ChromaDB'den mülakat konularıyla ilgili belgeleri getir
-            knowledge_base = self.retrieve_context(f"mülakat soruları {job_text}", k=3)
+            knowledge_base = self.retrieve_context(f"mülakat soruları {job_text}", k=3, deadline=deadline)
             
             enhanced_prompt = f"""
 ÖNEMLİ: SEN SADECE TÜRKÇE DİLİNDE CEVAP VERİRSİN!
@@ -228,7 +249,8 @@ Aşağıdaki kategorilerde sorular üret:
 TEKRAR: SADECE TÜRKÇE DİLİNDE CEVAP VER!
 """
 
-            chat_completion = self.client.chat.completions.create(
+            chat_completion = create_chat_completion(
+                self.client,
                 messages=[
                     {
                         "role": "user",
@@ -236,19 +258,25 @@ TEKRAR: SADECE TÜRKÇE DİLİNDE CEVAP VER!
                     }
                 ],
                 model=self.model,
+                deadline=deadline,
+                mode=mode,
+                stage="RAGEnhancedAgent.generate_questions_with_rag",
+                prompt_fields={"cv_text": cv_text, "job_text": job_text, "knowledge_base": knowledge_base},
             )
             
             return chat_completion.choices[0].message.content
             
+        except (DeadlineExceeded, LLMUnavailableError):
+            raise
         except Exception as e:
             print(f"❌ RAG Soru üretme hatası: {e}")
             return f"Mülakat soruları üretilirken bir hata oluştu: {str(e)}"
     
-    def get_improvement_suggestions_with_rag(self, cv_text: str, job_text: str) -> str:
+    def get_improvement_suggestions_with_rag(self, cv_text: str, job_text: str, deadline: Deadline = None, mode: str = None) -> str:
         """RAG destekli CV iyileştirme önerileri üretir"""
         try:
             # ChromaDB'den CV iyileştirme konularıyla ilgili belgeleri getir
-            knowledge_base = self.retrieve_context(f"CV yazma ipuçları {job_text}", k=3)
+            knowledge_base = self.retrieve_context(f"CV yazma ipuçları {job_text}", k=3, deadline=deadline)
             
             enhanced_prompt = f"""
 SEN SADECE TÜRKÇE DİLİNDE CEVAP VERİRSİN!
@@ -290,7 +318,8 @@ Aşağıdaki kategorilerde öneriler üret:
 TEKRAR: SADECE TÜRKÇE DİLİNDE CEVAP VER!
 """
 
-            chat_completion = self.client.chat.completions.create(
+            chat_completion = create_chat_completion(
+                self.client,
                 messages=[
                     {
                         "role": "user",
@@ -298,10 +327,16 @@ TEKRAR: SADECE TÜRKÇE DİLİNDE CEVAP VER!
                     }
                 ],
                 model=self.model,
+                deadline=deadline,
+                mode=mode,
+                stage="RAGEnhancedAgent.get_improvement_suggestions_with_rag",
+                prompt_fields={"cv_text": cv_text, "job_text": job_text, "knowledge_base": knowledge_base},
             )
             
             return chat_completion.choices[0].message.content
             
+        except (DeadlineExceeded, LLMUnavailableError):
+            raise
         except Exception as e:
             print(f"❌ RAG İyileştirme hatası: {e}")
             return f"CV iyileştirme önerileri üretilirken bir hata oluştu: {str(e)}"
@@ -1,54 +1,301 @@
-from flask import Flask, request, jsonify
+from flask import Flask, g, request, jsonify
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException, RequestEntityTooLarge, ServiceUnavailable
 from datetime import datetime
+from functools import wraps
 import os
+import time
 from dotenv import load_dotenv
 from groq import Groq
 from agents.rag_enhanced_agent import RAGEnhancedAgent
 from agents.cv_analyzer_agent import CVAnalyzerAgent
 from agents.cv_improvement_agent import CVImprovementAgent
 from agents.interview_questions_agent import InterviewQuestionsAgent
-from matching_engine import calculate_final_score
-from utils import extract_text_from_file, clean_text
-import langdetect
-from deep_translator import GoogleTranslator
+from agents.cv_report_agent import CVReportAgent
+from matching_engine import calculate_final_score, embedding_cache_stats, retrieval_cache, warm_up_embeddings
+from utils import clean_text
+from parse_pool import PARSE_TIMEOUT_SECONDS, DocumentParseError, parse_document
+from uploads import MAX_FORM_OVERHEAD_BYTES, MAX_UPLOAD_BYTES, MAX_UPLOAD_MB, SpoolingRequest, receive_upload
+from language_detection import language_detector
+from translation import get_translation_service
+from cv_compression import CV_COMPRESSION, CV_EXTRACT_CHARS, CV_TOKEN_BUDGET, compress_cv
+from report_cache import ReportCache, report_key
+from single_flight import SingleFlight, flight_key
+from admission import AdmissionController, ServerOverloadedError, parse_limits
+from deadlines import REQUEST_DEADLINE_HEADER, DeadlineExceeded, deadline_for_request
+from circuit_breaker import LLMUnavailableError, circuit_breaker_stats
+from model_router import model_router, resolve_model_mode
+from token_accounting import finish_request, start_request, token_ledger
 
 # Load environment variables
 load_dotenv('config.env')
 
 app = Flask(__name__)
+# Büyük yüklemeler diske alınır; sınırı aşan istekler gövde okunmadan reddedilir
+app.request_class = SpoolingRequest
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_BYTES + MAX_FORM_OVERHEAD_BYTES
 # CORS configuration for development - allow all origins
 CORS(app, origins="*")
 
 # AI Agents'ları başlat
-try:
-    groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-    rag_agent = RAGEnhancedAgent()
-    cv_analyzer_agent = CVAnalyzerAgent()
-    cv_improvement_agent = CVImprovementAgent()
-    interview_questions_agent = InterviewQuestionsAgent()
-    translator = GoogleTranslator()
-    print("✅ Tüm AI Agents başarıyla yüklendi!")
-    print("   - Groq AI Client")
-    print("   - RAG Enhanced Agent")
-    print("   - CV Analyzer Agent")
-    print("   - CV Improvement Agent")
-    print("   - Interview Questions Agent")
-    print("   - Google Translator")
-except Exception as e:
-    print(f"❌ AI yüklenirken hata: {e}")
-    groq_client = None
-    rag_agent = None
-    cv_analyzer_agent = None
-    cv_improvement_agent = None
-    interview_questions_agent = None
-    translator = None
+# (spawn ile açılan worker process'ler bu modülü __mp_main__ olarak yeniden import eder;
+# orada modelleri ve istemcileri yüklemeye gerek yok)
+groq_client = None
+rag_agent = None
+cv_analyzer_agent = None
+cv_improvement_agent = None
+interview_questions_agent = None
+cv_report_agent = None
+
+if __name__ != '__mp_main__':
+    try:
+        groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+        rag_agent = RAGEnhancedAgent()
+        cv_analyzer_agent = CVAnalyzerAgent()
+        cv_improvement_agent = CVImprovementAgent()
+        interview_questions_agent = InterviewQuestionsAgent()
+        cv_report_agent = CVReportAgent()
+        print("✅ Tüm AI Agents başarıyla yüklendi!")
+        print("   - Groq AI Client")
+        print("   - RAG Enhanced Agent")
+        print("   - CV Analyzer Agent")
+        print("   - CV Improvement Agent")
+        print("   - Interview Questions Agent")
+        print("   - CV Report Agent")
+    except Exception as e:
+        print(f"❌ AI yüklenirken hata: {e}")
+        groq_client = None
+        rag_agent = None
+        cv_analyzer_agent = None
+        cv_improvement_agent = None
+        interview_questions_agent = None
+        cv_report_agent = None
+
+    # /score gecikmesi için embedding modelini istek gelmeden yükle
+    try:
+        warm_up_embeddings()
+    except Exception as e:
+        print(f"⚠️ Embedding modeli ısıtılamadı: {e}")
+
+# Prompt'a gönderilecek en fazla CV karakter sayısı (AI token limiti için)
+MAX_CV_CHARS = 4000
+
+# Birleşik rapor: analiz, öneriler ve mülakat soruları tek LLM çağrısıyla üretilip önbelleklenir
+COMBINED_REPORT = os.getenv("COMBINED_REPORT", "1").lower() not in ("0", "false", "no")
+# Model modu başına önbellekten kabul edilen raporlar: quality isteğine auto modunda
+# (hızlı modele yönlenmiş olabilecek) rapor verilmez; fast modu rapor üretmez
+REPORT_CACHE_MODES = {"auto": ("auto", "quality"), "quality": ("quality",), "fast": ("auto", "quality")}
+report_cache = ReportCache(max_entries=int(os.getenv("REPORT_CACHE_SIZE", "256")),
+                           ttl_seconds=float(os.getenv("REPORT_CACHE_TTL_SECONDS", "3600")))
+
+# Aynı girdili eşzamanlı istekler (tarayıcı yeniden denemesi, aynı adayı açan ekip) tek hesaplamada birleştirilir
+REQUEST_COALESCING = os.getenv("REQUEST_COALESCING", "1").lower() not in ("0", "false", "no")
+request_flights = SingleFlight()
+
+def request_flight_key():
+    """Endpoint, form alanları, yüklenen dosyaların SHA-256 özeti ve (form yoksa) gövdeden birleştirme anahtarı üretir"""
+    parts = [request.endpoint]
+    for field, value in sorted(request.form.items(multi=True)):
+        parts += [field, value]
+    for field, file_storage in sorted(request.files.items(multi=True), key=lambda item: item[0]):
+        parts += [field, receive_upload(file_storage).sha256]
+    if not request.form and not request.files:
+        parts.append(request.get_data(cache=True))
+    return flight_key(*parts)
+
+class LeaderOnlyResponse(Exception):
+    """Yük veya isteğin kendi deadline'ı nedeniyle düşürülmüş, bekleyen isteklerle paylaşılmayan yanıt"""
+
+    def __init__(self, response):
+        super().__init__("leader-only response")
+        self.response = response
+
+def shared_flight_error(error):
+    """Birleştirilen isteklerde liderin hatası bekleyenlere iletilsin mi"""
+    # Deadline, yük nedeniyle ret (503) ve düşürülmüş yanıtlar lidere özgüdür
+    return not isinstance(error, (DeadlineExceeded, ServiceUnavailable, LeaderOnlyResponse))
+
+def coalesce_requests(view):
+    """Aynı anahtarlı eşzamanlı istekleri ilk isteğin yanıtını paylaşacak şekilde birleştirir"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not REQUEST_COALESCING:
+            return view(*args, **kwargs)
+
+        def run():
+            # Yanıt nesnesi isteğe özgü olduğundan gövde, durum kodu ve başlıklar paylaşılır
+            response = app.make_response(view(*args, **kwargs))
+            result = response.get_data(), response.status_code, list(response.headers.items())
+            if response.status_code in (503, 504) or g.get("load_tier", "full") != "full":
+                raise LeaderOnlyResponse(result)
+            return result
+
+        # Bekleyen istek liderin değil kendi deadline'ına uyar; lidere özgü sonuçlarda kendisi yeniden hesaplar
+        try:
+            (body, status, headers), shared = request_flights.do(request_flight_key(), run, g.get("deadline"),
+                                                                 share_error=shared_flight_error)
+        except LeaderOnlyResponse as leader_only:
+            (body, status, headers), shared = leader_only.response, False
+        if shared:
+            print(f"🔗 Aynı girdili eşzamanlı istek birleştirildi: {request.endpoint}")
+        return app.response_class(body, status=status, headers=headers)
+    return wrapper
+
+# Endpoint başına eşzamanlı istek sınırı, sınırlı kuyruk ve kuyruk derinliğine göre hizmet düşürme
+admission = AdmissionController(
+    limits=parse_limits(os.getenv("ADMISSION_LIMITS", "analyze=4,score=16")),
+    default_limit=int(os.getenv("ADMISSION_DEFAULT_LIMIT", "8")),
+    max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "16")),
+    queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "30")),
+    tier_depths=tuple(int(depth) for depth in os.getenv("DEGRADE_QUEUE_DEPTHS", "1,3,6").split(","))
+)
+
+def request_deadline(view):
+    """İstek için deadline oluşturur (X-Request-Timeout başlığı veya endpoint varsayılanı) ve g.deadline olarak verir"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.deadline = deadline_for_request(request.endpoint, request.headers.get(REQUEST_DEADLINE_HEADER))
+        return view(*args, **kwargs)
+    return wrapper
+
+def track_tokens(view):
+    """İsteğin LLM token kullanımını toplar; X-Prompt-Tokens / X-Completion-Tokens başlıklarıyla döndürür"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = start_request(request.endpoint)
+        try:
+            response = app.make_response(view(*args, **kwargs))
+        finally:
+            account = finish_request(token)
+        response.headers["X-Prompt-Tokens"] = str(account.prompt_tokens)
+        response.headers["X-Completion-Tokens"] = str(account.completion_tokens)
+        return response
+    return wrapper
+
+def request_model_mode():
+    """İstekteki mode alanını (auto / fast / quality) veya endpoint varsayılanını döndürür"""
+    return resolve_model_mode(request.endpoint, request.form.get('mode'))
+
+def admission_control(view):
+    """İsteği endpoint kuyruğundan geçirir; yük kademesini g.load_tier olarak verir"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        # Kuyrukta bekleme de isteğin süresinden düşer
+        deadline = g.get("deadline")
+        with admission.admit(request.endpoint, deadline.remaining() if deadline else None) as tier:
+            g.load_tier = tier
+            if tier != "full":
+                print(f"🚦 Yük kademesi ({request.endpoint}): {tier}")
+            return view(*args, **kwargs)
+    return wrapper
+
+def read_cv_text(upload, job_text=None, deadline=None):
+    """
+    Yüklenen CV dosyasını karakter bütçesi dahilinde okuyup temizler
+
+    Bütçe dolduğunda kalan sayfalar/paragraflar hiç okunmaz. Okuma, yapılandırmaya
+    göre zaman ve bellek sınırlı izole bir worker process'te yapılır. İş ilanı
+    verilirse metin baştan kesilmek yerine bölüm bazında, ilana en uygun içerik
+    korunarak CV_TOKEN_BUDGET token'a sıkıştırılır.
+
+    Args:
+        upload: receive_upload ile alınmış UploadedDocument
+        job_text: İş ilanı metni (sıkıştırma için, opsiyonel)
+        deadline: İsteğin son tarihi; okuma zaman sınırı kalan süreyle sınırlanır (opsiyonel)
+
+    Returns:
+        (Temizlenmiş CV metni veya None, metin kısaltıldı mı, hata mesajı veya None)
+    """
+    compress = CV_COMPRESSION and bool(job_text)
+    max_chars = CV_EXTRACT_CHARS if compress else MAX_CV_CHARS
+    timeout = None
+    if deadline is not None:
+        deadline.check("belge okuma")
+        timeout = deadline.timeout(PARSE_TIMEOUT_SECONDS)
+    try:
+        cv_text, truncated = parse_document(upload.source, upload.extension, max_chars=max_chars, timeout=timeout)
+    except DocumentParseError as e:
+        print(f"❌ Belge okuma durduruldu: {e}")
+        return None, False, f"{upload.filename}: {e}"
+    if not cv_text:
+        return None, False, f"Dosya okunamadı: {upload.filename}"
+
+    if compress:
+        if deadline is not None:
+            deadline.check("CV sıkıştırma")
+        try:
+            cv_text, compression = compress_cv(cv_text, job_text, CV_TOKEN_BUDGET)
+            truncated = truncated or compression["dropped_units"] > 0
+            return clean_text(cv_text), truncated, None
+        except Exception as e:
+            print(f"❌ CV sıkıştırma hatası, karakter sınırına dönülüyor: {e}")
+
+    cv_text = clean_text(cv_text)
+
+    # Çok uzun metinleri kısalt
+    if truncated or len(cv_text) > MAX_CV_CHARS:
+        cv_text = cv_text[:MAX_CV_CHARS] + "..."
+        truncated = True
+        print(f"⚠️ Metin kısaltıldı: {MAX_CV_CHARS} karakter")
+
+    return cv_text, truncated, None
+
+def get_cv_report(cv_text, job_description, company_name, language_name, cached_only=False, deadline=None,
+                  mode=None):
+    """
+    Birleşik raporu (analysis, suggestions, questions) önbellekten veya tek bir LLM çağrısıyla döndürür
+
+    Analiz, öneri ve soru endpoint'leri aynı CV ve ilan için aynı üretimi paylaşır.
+
+    Args:
+        cached_only: True ise LLM çağrısı yapılmaz, sadece önbellekteki rapor döner (yük altında)
+        deadline: İsteğin son tarihi (opsiyonel)
+        mode: Model modu; rapor mod başına önbelleklenir, fast modunda rapor üretilmez,
+            sadece önbellekteki döner
+
+    Returns:
+        Rapor sözlüğü veya (kapalıysa / üretilemediyse) None
+    """
+    if not COMBINED_REPORT or cv_report_agent is None:
+        return None
+    mode = mode or "auto"
+    if cached_only or mode == "fast":
+        for cached_mode in REPORT_CACHE_MODES[mode]:
+            report = report_cache.get(report_key(cv_text, job_description, company_name, language_name, cached_mode))
+            if report is not None:
+                return report
+        return None
+    key = report_key(cv_text, job_description, company_name, language_name, mode)
+    return report_cache.get_or_generate(
+        key, lambda: cv_report_agent.generate_report(cv_text, job_description, company_name or None, language_name,
+                                                deadline=deadline, mode=mode),
+        deadline
+    )
+
+def llm_unavailable_response(error, cv_text, job_description, **empty_fields):
+    """
+    Groq kullanılamadığında LLM çıktısı yerine yerel skoru döndürür
+
+    Args:
+        error: LLMUnavailableError
+        empty_fields: Endpoint'in normalde döndürdüğü LLM alanları (boş değerlerle)
+    """
+    print(f"🔌 LLM kullanılamıyor, yerel skor döndürülüyor: {error}")
+    return jsonify({
+        "success": True,
+        **empty_fields,
+        "score": calculate_final_score(cv_text, job_description, deadline=g.deadline),
+        "ai_available": False,
+        "degraded": True,
+        "llm_unavailable": [error.as_dict()],
+        "timestamp": datetime.now().isoformat()
+    })
 
 def detect_language(text):
-    """Metnin dilini algıla"""
+    """Metnin dilini algıla (sınırlı önek, sabit seed, önbellekli)"""
     try:
         print(f"🔍 Dil algılama: {text[:50]}...")
-        detected = langdetect.detect(text)
+        detected = language_detector.detect(text)
         print(f"✅ Algılanan dil: {detected}")
         return detected
     except Exception as e:
@@ -56,13 +303,13 @@ def detect_language(text):
         return 'en'  # Varsayılan olarak İngilizce
 
 def translate_text(text, target_language):
-    """Metni hedef dile çevir"""
+    """Metni hedef dile çevir (önbellekli, uzun metinlerde parçalı ve paralel)"""
     try:
         print(f"🔄 Çeviri başlıyor: {target_language}")
         if target_language == 'tr':
-            result = GoogleTranslator(source='auto', target='tr').translate(text)
+            result = get_translation_service().translate(text, target='tr')
         else:
-            result = GoogleTranslator(source='auto', target='en').translate(text)
+            result = get_translation_service().translate(text, target='en')
         print(f"✅ Çeviri tamamlandı: {result[:50]}...")
         return result
     except Exception as e:
@@ -90,6 +337,39 @@ def process_job_description(job_description, page_language):
         print(f"   ✅ Çeviri gerekmiyor")
         return job_description
 
+@app.before_request
+def reject_oversized_request():
+    """Content-Length sınırı aşan istekleri gövdeyi okumadan reddeder"""
+    if request.content_length is not None and request.content_length > app.config['MAX_CONTENT_LENGTH']:
+        raise RequestEntityTooLarge()
+
+@app.errorhandler(DeadlineExceeded)
+def deadline_exceeded(e):
+    return jsonify({
+        "success": False,
+        "error": e.description,
+        "timestamp": datetime.now().isoformat()
+    }), 504
+
+@app.errorhandler(ServerOverloadedError)
+def server_overloaded(e):
+    response = jsonify({
+        "success": False,
+        "error": e.description,
+        "retry_after": e.retry_after,
+        "timestamp": datetime.now().isoformat()
+    })
+    response.headers["Retry-After"] = str(e.retry_after)
+    return response, 503
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_entity_too_large(e):
+    return jsonify({
+        "success": False,
+        "error": f"Dosya çok büyük (en fazla {MAX_UPLOAD_MB:g} MB)",
+        "timestamp": datetime.now().isoformat()
+    }), 413
+
 @app.route('/')
 def home():
     return jsonify({
@@ -110,6 +390,92 @@ def health():
         "ai_available": groq_client is not None
     })
 
+@app.route('/api/metrics')
+def metrics():
+    """Önbellek ve performans metrikleri"""
+    return jsonify({
+        "retrieval_cache": retrieval_cache.stats(),
+        "language_detection": language_detector.stats(),
+        "translation": get_translation_service().stats(),
+        "report_cache": report_cache.stats(),
+        "request_coalescing": request_flights.stats(),
+        "admission": admission.stats(),
+        "circuit_breakers": circuit_breaker_stats(),
+        "model_routing": model_router.stats(),
+        "token_usage": token_ledger.stats(),
+        "embedding_cache": embedding_cache_stats(),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route('/score', methods=['POST'])
+@request_deadline
+@coalesce_requests
+@track_tokens
+@admission_control
+def score():
+    """Sadece sayısal skor endpoint'i - LLM çağrısı yapmaz (yerel embedding + beceri çıkarımı)"""
+    print("\n=== SCORE ENDPOINT ÇAĞRILDI ===")
+    started = time.perf_counter()
+    try:
+        # JSON ({cv_text, job_description}) veya form (cv_file, job_description) kabul edilir
+        data = request.get_json(silent=True) or {}
+        cv_text = data.get('cv_text')
+        job_description = data.get('job_description') or request.form.get('job_description')
+        # explain: gereksinim bazında kanıt cümleleri ve kapsama oranı da döndürülür
+        explain = data.get('explain') is True or request.values.get('explain', '').lower() in ('1', 'true', 'yes')
+        
+        if not cv_text and request.files.get('cv_file'):
+            # Diğer endpoint'lerle aynı (ilana göre sıkıştırılmış) CV metni skorlanır
+            cv_text, _, read_error = read_cv_text(receive_upload(request.files['cv_file']), job_description,
+                                                  deadline=g.deadline)
+            if not cv_text:
+                return jsonify({
+                    "success": False,
+                    "error": read_error
+                }), 400
+        
+        if not cv_text or not job_description:
+            return jsonify({
+                "success": False,
+                "error": "CV (dosya veya metin) ve iş ilanı metni gerekli"
+            }), 400
+        
+        result = calculate_final_score(cv_text, job_description, explain=explain, deadline=g.deadline)
+        if "error" in result:
+            return jsonify({
+                "success": False,
+                "error": result["error"],
+                "timestamp": datetime.now().isoformat()
+            }), 500
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"⚡ Skor hesaplandı: {result['final_score']:.1f}/100 ({elapsed_ms:.1f} ms)")
+        response_data = {
+            "success": True,
+            "final_score": result["final_score"],
+            "text_similarity": result["text_similarity"],
+            "skill_match": result["skill_match"],
+            "cv_skills": result["cv_skills"],
+            "job_skills": result["job_skills"],
+            "common_skills": result["common_skills"],
+            "missing_skills": result["missing_skills"],
+            "elapsed_ms": round(elapsed_ms, 1),
+            "timestamp": datetime.now().isoformat()
+        }
+        if explain:
+            response_data["requirements"] = result.get("requirements", [])
+            response_data["requirement_coverage"] = result.get("requirement_coverage")
+        return jsonify(response_data)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        }), 500
+
 @app.route('/test-language', methods=['POST'])
 def test_language():
     """Dil algılama ve çeviri test endpoint'i"""
@@ -146,6 +512,10 @@ def test_language():
         }), 500
 
 @app.route('/analyze', methods=['POST'])
+@request_deadline
+@coalesce_requests
+@track_tokens
+@admission_control
 def analyze():
     """CV ve iş ilanı analizi endpoint'i"""
     print("\n=== ANALYZE ENDPOINT ÇAĞRILDI ===")
@@ -174,30 +544,21 @@ def analyze():
                 "error": "CV dosyası ve iş ilanı metni gerekli"
             }), 400
         
-        # Dosya bilgilerini al
-        file_content = cv_file.read()
-        file_info = {
-            "filename": cv_file.filename,
-            "content_type": cv_file.content_type,
-            "size": len(file_content)
-        }
+        # Dosyayı akış halinde al (boyut ve özet tek geçişte)
+        upload = receive_upload(cv_file)
+        file_info = upload.file_info()
         
-        # Dosya uzantısını al
-        file_extension = os.path.splitext(cv_file.filename)[1]
-        
-        # Gerçek dosya okuma fonksiyonunu kullan
-        print(f"📄 Dosya okunuyor: {cv_file.filename} ({file_extension})")
-        cv_text = extract_text_from_file(file_content, file_extension)
+        # Gerçek dosya okuma fonksiyonunu kullan (karakter bütçesi dahilinde)
+        print(f"📄 Dosya okunuyor: {cv_file.filename}")
+        cv_text, cv_text_truncated, read_error = read_cv_text(upload, job_description, deadline=g.deadline)
         
         if not cv_text:
             print(f"❌ Dosya okunamadı: {cv_file.filename}")
             return jsonify({
                 "success": False,
-                "error": f"Dosya okunamadı: {cv_file.filename}"
+                "error": read_error
             }), 400
         
-        # Metni temizle
-        cv_text = clean_text(cv_text)
         print(f"✅ Dosya okundu: {len(cv_text)} karakter")
         
         # AI'ya gönderilecek metni logla
@@ -206,14 +567,32 @@ def analyze():
         print(cv_text[:500])
         print(f"--- BİTİŞ ---")
         
-        # Çok uzun metinleri kısalt (AI token limiti için)
-        if len(cv_text) > 4000:
-            cv_text = cv_text[:4000] + "..."
-            print(f"⚠️ Metin kısaltıldı: 4000 karakter")
-        
         # Dil direktifi ekle (artık gerek yok çünkü AI agent'a direkt dil adını gönderiyoruz)
         original_job = job_description
         
+        # Yük kademesi: kuyruk derinleştikçe pahalı aşamalar atlanır
+        load_tier = g.get("load_tier", "full")
+        # Model modu: fast modunda hızlı analiz (8B) kullanılır
+        model_mode = request_model_mode()
+        if load_tier == "score_only":
+            print("🚦 Yoğunluk nedeniyle sadece yerel skor hesaplanıyor")
+            score_info = calculate_final_score(cv_text, job_description, explain=True, deadline=g.deadline)
+            return jsonify({
+                "success": True,
+                "analysis": "",
+                "analysis_source": "Matching Engine",
+                "score": score_info,
+                "rag_context_used": 0,
+                "file_info": file_info,
+                "cv_text_length": len(cv_text),
+                "cv_text_truncated": cv_text_truncated,
+                "job_description_length": len(job_description),
+                "ai_available": False,
+                "load_tier": load_tier,
+                "degraded": True,
+                "timestamp": datetime.now().isoformat()
+            })
+        
         # Üç aşamalı analiz sistemi başlatılıyor
         print("🤖 ÜÇ AŞAMALI ANALİZ SİSTEMİ BAŞLIYOR...")
         print("=" * 60)
@@ -222,17 +601,45 @@ def analyze():
         print("📊 1. AŞAMA: CV Analyzer Agent (Temel Puan)")
         basic_analysis = ""
         basic_score = 0
-        if cv_analyzer_agent:
+        skip_analyzer = load_tier == "no_analyzer"
+        # Groq'a ulaşılamayan aşamalar (yanıtta yapılandırılmış olarak döner)
+        llm_unavailable = []
+        try:
+            report = get_cv_report(cv_text, job_description, company_name, language_name,
+                                   cached_only=skip_analyzer, deadline=g.deadline, mode=model_mode)
+        except LLMUnavailableError as e:
+            print(f"🔌 Birleşik rapor atlandı: {e}")
+            llm_unavailable.append(e.as_dict())
+            report = None
+            skip_analyzer = True
+        if report:
+            # Birleşik rapor önbelleğe alınır; öneri ve soru endpoint'leri aynı üretimi kullanır
+            basic_analysis = report["analysis"]
+            basic_score = 50.0
+            print(f"✅ Temel analiz birleşik rapordan alındı: {basic_score:.1f}/100")
+        elif skip_analyzer:
+            print("⏭️ CV Analyzer aşaması atlandı")
+        elif cv_analyzer_agent:
             try:
                 # Şirket adı varsa analizi geliştir
-                if company_name:
+                if model_mode == "fast":
+                    print("⚡ Hızlı analiz kullanılıyor")
+                    basic_analysis = cv_analyzer_agent.get_quick_analysis(cv_text, job_description, language_name, deadline=g.deadline)
+                elif company_name:
                     print(f"🏢 Şirket adı tespit edildi: {company_name}")
-                    basic_analysis = cv_analyzer_agent.analyze(cv_text, job_description, company_name, language_name)
+                    basic_analysis = cv_analyzer_agent.analyze(cv_text, job_description, company_name, language_name,
+                                                               deadline=g.deadline, mode=model_mode)
                 else:
-                    basic_analysis = cv_analyzer_agent.analyze(cv_text, job_description, None, language_name)
+                    basic_analysis = cv_analyzer_agent.analyze(cv_text, job_description, None, language_name,
+                                                               deadline=g.deadline, mode=model_mode)
                 # Temel analiz tamamlandı - skor hesaplama için sabit değer
                 basic_score = 50.0
                 print(f"✅ Temel analiz tamamlandı: {basic_score:.1f}/100")
+            except HTTPException:
+                raise
+            except LLMUnavailableError as e:
+                print(f"🔌 CV Analyzer atlandı: {e}")
+                llm_unavailable.append(e.as_dict())
             except Exception as e:
                 print(f"❌ CV Analyzer hatası: {e}")
                 basic_analysis = "Temel analiz yapılamadı"
@@ -247,23 +654,34 @@ def analyze():
         rag_analysis = ""
         rag_context = ""
         rag_context_count = 0
-        if rag_agent:
+        if load_tier != "full":
+            print("⏭️ Yoğunluk nedeniyle RAG aşaması atlandı")
+        elif rag_agent:
             try:
                 # RAG context'i al
-                rag_context = rag_agent.retrieve_context(job_description, k=3)
+                rag_context = rag_agent.retrieve_context(job_description, k=3, deadline=g.deadline)
                 rag_context_count = len(rag_context.split("--- BELGE"))
                 
                 # RAG analizi yap (şirket adı ile)
                 if company_name:
-                    rag_result = rag_agent.analyze_with_rag(cv_text, job_description, company_name, language_name)
+                    rag_result = rag_agent.analyze_with_rag(cv_text, job_description, company_name, language_name,
+                                                          deadline=g.deadline, mode=model_mode)
                 else:
-                    rag_result = rag_agent.analyze_with_rag(cv_text, job_description, None, language_name)
+                    rag_result = rag_agent.analyze_with_rag(cv_text, job_description, None, language_name,
+                                                          deadline=g.deadline, mode=model_mode)
                 if isinstance(rag_result, dict):
                     rag_analysis = rag_result.get('analysis', 'RAG analizi yapılamadı')
                 else:
                     rag_analysis = rag_result
                 
                 print(f"✅ RAG analizi tamamlandı: {rag_context_count} belge kullanıldı")
+            except HTTPException:
+                raise
+            except LLMUnavailableError as e:
+                print(f"🔌 RAG analizi atlandı: {e}")
+                llm_unavailable.append(e.as_dict())
+                rag_context = ""
+                rag_context_count = 0
             except Exception as e:
                 print(f"❌ RAG analizi hatası: {e}")
                 rag_analysis = "RAG analizi yapılamadı"
@@ -281,7 +699,7 @@ def analyze():
         if groq_client:
             try:
                 # Nihai skor hesaplama
-                final_score_result = calculate_final_score(cv_text, job_description, rag_context)
+                final_score_result = calculate_final_score(cv_text, job_description, rag_context, explain=True, deadline=g.deadline)
                 
                 # Skorları birleştir
                 final_score = final_score_result.get('final_score', 0)
@@ -294,6 +712,8 @@ def analyze():
                 print(f"   - Beceri Uyumu: {skill_match:.1f}")
                 print(f"   - RAG Bonus: {rag_bonus:.1f}")
                 
+            except HTTPException:
+                raise
             except Exception as e:
                 print(f"❌ Nihai skor hesaplama hatası: {e}")
                 final_score_result = {
@@ -322,9 +742,13 @@ def analyze():
         if rag_analysis and "yapılamadı" not in rag_analysis and "yüklenemedi" not in rag_analysis:
             ai_analysis = rag_analysis
             analysis_source = "RAG Enhanced Agent"
-        else:
+        elif basic_analysis or not llm_unavailable:
             ai_analysis = basic_analysis
             analysis_source = "CV Analyzer Agent"
+        else:
+            # Hiçbir LLM aşaması çalışamadı: sadece yerel skor
+            ai_analysis = ""
+            analysis_source = "Matching Engine"
         
         score_info = final_score_result
         
@@ -343,8 +767,13 @@ def analyze():
             "rag_analysis": rag_analysis,
             "file_info": file_info,
             "cv_text_length": len(cv_text),
+            "cv_text_truncated": cv_text_truncated,
             "job_description_length": len(job_description),
-            "ai_available": True,
+            "ai_available": bool(ai_analysis),
+            "load_tier": load_tier,
+            "model_mode": model_mode,
+            "degraded": load_tier != "full" or bool(llm_unavailable),
+            "llm_unavailable": llm_unavailable,
             "timestamp": datetime.now().isoformat()
         }
         
@@ -379,6 +808,8 @@ CV'nizde {len(cv_text)} karakterlik içerik bulunuyor ve iş ilanında {len(job_
 
         return jsonify(response_data)
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"\n❌ HATA YAKALANDI: {type(e).__name__}")
         print(f"❌ HATA DETAYI: {e}")
@@ -391,6 +822,10 @@ CV'nizde {len(cv_text)} karakterlik içerik bulunuyor ve iş ilanında {len(job_
         }), 500
 
 @app.route('/get-analysis-only', methods=['POST'])
+@request_deadline
+@coalesce_requests
+@track_tokens
+@admission_control
 def get_analysis_only():
     """Sadece AI Analysis için endpoint - skor hesaplamaz"""
     print("\n=== GET ANALYSIS ONLY ENDPOINT ÇAĞRILDI ===")
@@ -418,34 +853,39 @@ def get_analysis_only():
                 "error": "CV dosyası ve iş ilanı metni gerekli"
             }), 400
         
-        # Dosya uzantısını al
-        file_extension = os.path.splitext(cv_file.filename)[1]
-        
-        # Gerçek dosya okuma fonksiyonunu kullan
+        # Gerçek dosya okuma fonksiyonunu kullan (karakter bütçesi dahilinde)
         print(f"📄 Analysis için dosya okunuyor: {cv_file.filename}")
-        cv_text = extract_text_from_file(cv_file.read(), file_extension)
+        cv_text, _, read_error = read_cv_text(receive_upload(cv_file), job_description, deadline=g.deadline)
         
         if not cv_text:
             return jsonify({
                 "success": False,
-                "error": f"Dosya okunamadı: {cv_file.filename}"
+                "error": read_error
             }), 400
         
-        # Metni temizle
-        cv_text = clean_text(cv_text)
-        
-        # Çok uzun metinleri kısalt
-        if len(cv_text) > 4000:
-            cv_text = cv_text[:4000] + "..."
+        # Birleşik rapor (önbellekteyse LLM çağrısı yapılmaz)
+        model_mode = request_model_mode()
+        report = get_cv_report(cv_text, job_description, company_name, language_name, deadline=g.deadline,
+                               mode=model_mode)
+        if report:
+            return jsonify({
+                "success": True,
+                "analysis": report["analysis"],
+                "timestamp": datetime.now().isoformat()
+            })
         
         # Sadece AI Analysis - skor hesaplamaz
         if cv_analyzer_agent:
             try:
                 print("🤖 CV Analyzer Agent (Analysis Only) kullanılıyor...")
-                if company_name:
-                    analysis = cv_analyzer_agent.analyze(cv_text, job_description, company_name, language_name)
+                if model_mode == "fast":
+                    analysis = cv_analyzer_agent.get_quick_analysis(cv_text, job_description, language_name, deadline=g.deadline)
+                elif company_name:
+                    analysis = cv_analyzer_agent.analyze(cv_text, job_description, company_name, language_name,
+                                                         deadline=g.deadline, mode=model_mode)
                 else:
-                    analysis = cv_analyzer_agent.analyze(cv_text, job_description, None, language_name)
+                    analysis = cv_analyzer_agent.analyze(cv_text, job_description, None, language_name,
+                                                         deadline=g.deadline, mode=model_mode)
                 
                 return jsonify({
                     "success": True,
@@ -453,6 +893,8 @@ def get_analysis_only():
                     "timestamp": datetime.now().isoformat()
                 })
                 
+            except (HTTPException, LLMUnavailableError):
+                raise
             except Exception as e:
                 print(f"❌ Analysis hatası: {e}")
                 return jsonify({
@@ -467,6 +909,10 @@ def get_analysis_only():
                 "timestamp": datetime.now().isoformat()
             }), 500
             
+    except LLMUnavailableError as e:
+        return llm_unavailable_response(e, cv_text, job_description, analysis="")
+    except HTTPException:
+        raise
     except Exception as e:
         return jsonify({
             "success": False,
@@ -475,6 +921,10 @@ def get_analysis_only():
         }), 500
 
 @app.route('/generate-questions', methods=['POST'])
+@request_deadline
+@coalesce_requests
+@track_tokens
+@admission_control
 def generate_questions():
     """Mülakat soruları üretimi endpoint'i"""
     print("\n=== GENERATE QUESTIONS ENDPOINT ÇAĞRILDI ===")
@@ -502,31 +952,33 @@ def generate_questions():
                 "error": "CV dosyası ve iş ilanı metni gerekli"
             }), 400
         
-        # Dosya uzantısını al
-        file_extension = os.path.splitext(cv_file.filename)[1]
-        
-        # Gerçek dosya okuma fonksiyonunu kullan
+        # Gerçek dosya okuma fonksiyonunu kullan (karakter bütçesi dahilinde)
         print(f"📄 Mülakat için dosya okunuyor: {cv_file.filename}")
-        cv_text = extract_text_from_file(cv_file.read(), file_extension)
+        cv_text, _, read_error = read_cv_text(receive_upload(cv_file), job_description, deadline=g.deadline)
         
         if not cv_text:
             return jsonify({
                 "success": False,
-                "error": f"Dosya okunamadı: {cv_file.filename}"
+                "error": read_error
             }), 400
         
-        # Metni temizle
-        cv_text = clean_text(cv_text)
-        
-        # Çok uzun metinleri kısalt
-        if len(cv_text) > 4000:
-            cv_text = cv_text[:4000] + "..."
+        # Birleşik rapor (önbellekteyse LLM çağrısı yapılmaz)
+        model_mode = request_model_mode()
+        report = get_cv_report(cv_text, job_description, company_name, language_name, deadline=g.deadline,
+                               mode=model_mode)
+        if report:
+            return jsonify({
+                "success": True,
+                "interview_questions": report["questions"],
+                "timestamp": datetime.now().isoformat()
+            })
         
         # Mülakat soruları üretimi - Yeni Smart Agent kullan
         if interview_questions_agent:
             try:
                 print("🤖 Interview Questions Agent kullanılıyor...")
-                questions = interview_questions_agent.generate_questions(cv_text, job_description)
+                questions = interview_questions_agent.generate_questions(cv_text, job_description, deadline=g.deadline,
+                                                                     mode=model_mode)
                 
                 return jsonify({
                     "success": True,
@@ -534,6 +986,8 @@ def generate_questions():
                     "timestamp": datetime.now().isoformat()
                 })
                 
+            except (HTTPException, LLMUnavailableError):
+                raise
             except Exception as e:
                 print(f"❌ Mülakat soruları hatası: {e}")
                 return jsonify({
@@ -548,6 +1002,10 @@ def generate_questions():
                 "timestamp": datetime.now().isoformat()
             }), 500
             
+    except LLMUnavailableError as e:
+        return llm_unavailable_response(e, cv_text, job_description, interview_questions="")
+    except HTTPException:
+        raise
     except Exception as e:
         return jsonify({
             "success": False,
@@ -556,6 +1014,10 @@ def generate_questions():
         }), 500
 
 @app.route('/get-suggestions', methods=['POST'])
+@request_deadline
+@coalesce_requests
+@track_tokens
+@admission_control
 def get_suggestions():
     """CV iyileştirme önerileri endpoint'i"""
     print("\n=== GET SUGGESTIONS ENDPOINT ÇAĞRILDI ===")
@@ -583,25 +1045,26 @@ def get_suggestions():
                 "error": "CV dosyası ve iş ilanı metni gerekli"
             }), 400
         
-        # Dosya uzantısını al
-        file_extension = os.path.splitext(cv_file.filename)[1]
-        
-        # Gerçek dosya okuma fonksiyonunu kullan
+        # Gerçek dosya okuma fonksiyonunu kullan (karakter bütçesi dahilinde)
         print(f"📄 CV iyileştirme için dosya okunuyor: {cv_file.filename}")
-        cv_text = extract_text_from_file(cv_file.read(), file_extension)
+        cv_text, _, read_error = read_cv_text(receive_upload(cv_file), job_description, deadline=g.deadline)
         
         if not cv_text:
             return jsonify({
                 "success": False,
-                "error": f"Dosya okunamadı: {cv_file.filename}"
+                "error": read_error
             }), 400
         
-        # Metni temizle
-        cv_text = clean_text(cv_text)
-        
-        # Çok uzun metinleri kısalt
-        if len(cv_text) > 4000:
-            cv_text = cv_text[:4000] + "..."
+        # Birleşik rapor (önbellekteyse LLM çağrısı yapılmaz)
+        model_mode = request_model_mode()
+        report = get_cv_report(cv_text, job_description, company_name, language_name, deadline=g.deadline,
+                               mode=model_mode)
+        if report:
+            return jsonify({
+                "success": True,
+                "suggestions": report["suggestions"],
+                "timestamp": datetime.now().isoformat()
+            })
         
         # CV iyileştirme önerileri - Yeni Smart Agent kullan
         if cv_improvement_agent:
@@ -612,12 +1075,23 @@ def get_suggestions():
                 print(f"   🏢 Şirket Adı: {company_name}")
                 print(f"   🌍 Dil: {language_name}")
                 
-                suggestions = cv_improvement_agent.get_suggestions(
-                    cv_text=cv_text, 
-                    job_text=job_description, 
-                    company_name=company_name, 
-                    language=language_name
-                )
+                if model_mode == "fast":
+                    print("⚡ Hızlı ipuçları kullanılıyor")
+                    suggestions = cv_improvement_agent.get_quick_tips(
+                        cv_text=cv_text,
+                        job_text=job_description,
+                        language=language_name,
+                        deadline=g.deadline
+                    )
+                else:
+                    suggestions = cv_improvement_agent.get_suggestions(
+                        cv_text=cv_text, 
+                        job_text=job_description, 
+                        company_name=company_name, 
+                        language=language_name,
+                        deadline=g.deadline,
+                        mode=model_mode
+                    )
                 
                 print(f"✅ CV önerileri oluşturuldu! Uzunluk: {len(suggestions)} karakter")
                 
@@ -627,6 +1101,8 @@ def get_suggestions():
                     "timestamp": datetime.now().isoformat()
                 })
                 
+            except (HTTPException, LLMUnavailableError):
+                raise
             except Exception as e:
                 print(f"❌ CV önerileri hatası: {e}")
                 return jsonify({
@@ -641,6 +1117,10 @@ def get_suggestions():
                 "timestamp": datetime.now().isoformat()
             }), 500
             
+    except LLMUnavailableError as e:
+        return llm_unavailable_response(e, cv_text, job_description, suggestions="")
+    except HTTPException:
+        raise
     except Exception as e:
         return jsonify({
             "success": False,
@@ -649,6 +1129,10 @@ def get_suggestions():
         }), 500
 
 @app.route('/get-questions', methods=['POST'])
+@request_deadline
+@coalesce_requests
+@track_tokens
+@admission_control
 def get_questions():
     """Mülakat soruları endpoint'i"""
     print("\n=== GET QUESTIONS ENDPOINT ÇAĞRILDI ===")
@@ -676,25 +1160,26 @@ def get_questions():
                 "error": "CV dosyası ve iş ilanı metni gerekli"
             }), 400
         
-        # Dosya uzantısını al
-        file_extension = os.path.splitext(cv_file.filename)[1]
-        
-        # Gerçek dosya okuma fonksiyonunu kullan
+        # Gerçek dosya okuma fonksiyonunu kullan (karakter bütçesi dahilinde)
         print(f"📄 Mülakat soruları için dosya okunuyor: {cv_file.filename}")
-        cv_text = extract_text_from_file(cv_file.read(), file_extension)
+        cv_text, _, read_error = read_cv_text(receive_upload(cv_file), job_description, deadline=g.deadline)
         
         if not cv_text:
             return jsonify({
                 "success": False,
-                "error": f"Dosya okunamadı: {cv_file.filename}"
+                "error": read_error
             }), 400
         
-        # Metni temizle
-        cv_text = clean_text(cv_text)
-        
-        # Çok uzun metinleri kısalt
-        if len(cv_text) > 4000:
-            cv_text = cv_text[:4000] + "..."
+        # Birleşik rapor (önbellekteyse LLM çağrısı yapılmaz)
+        model_mode = request_model_mode()
+        report = get_cv_report(cv_text, job_description, company_name, language_name, deadline=g.deadline,
+                               mode=model_mode)
+        if report:
+            return jsonify({
+                "success": True,
+                "questions": report["questions"],
+                "timestamp": datetime.now().isoformat()
+            })
         
         # Mülakat soruları - Interview Questions Agent kullan
         if interview_questions_agent:
@@ -709,7 +1194,9 @@ def get_questions():
                     cv_text=cv_text, 
                     job_text=job_description, 
                     company_name=company_name, 
-                    language=language_name
+                    language=language_name,
+                    deadline=g.deadline,
+                    mode=model_mode
                 )
                 
                 print(f"✅ Mülakat soruları oluşturuldu! Uzunluk: {len(questions)} karakter")
@@ -720,6 +1207,8 @@ def get_questions():
                     "timestamp": datetime.now().isoformat()
                 })
                 
+            except (HTTPException, LLMUnavailableError):
+                raise
             except Exception as e:
                 print(f"❌ Mülakat soruları hatası: {e}")
                 return jsonify({
@@ -734,6 +1223,10 @@ def get_questions():
                 "timestamp": datetime.now().isoformat()
             }), 500
             
+    except LLMUnavailableError as e:
+        return llm_unavailable_response(e, cv_text, job_description, questions="")
+    except HTTPException:
+        raise
     except Exception as e:
         return jsonify({
             "success": False,
@@ -747,5 +1240,6 @@ if __name__ == '__main__':
     print("📖 Analyze: http://localhost:5000/analyze")
     print("🤖 Get Questions: http://localhost:5000/get-questions")
     print("🤖 Get Suggestions: http://localhost:5000/get-suggestions")
+    print("⚡ Score: http://localhost:5000/score")
     print("🤖 AI Durumu: ✅ Aktif")
     app.run(debug=True, use_reloader=False, port=5000, host='0.0.0.0')
@@ -0,0 +1,146 @@
+"""
+BM25 ters indeksi (inverted index) ve hibrit sıralama yardımcıları
+
+İndeks ingestion sırasında vektör deposunun yanına `bm25.json` olarak yazılır.
+Dense aramanın kaçırdığı tam araç/teknoloji adlarını (ör. "Kubernetes",
+"C#") yakalamak için kullanılır; sonuçlar reciprocal rank fusion ile
+birleştirilir veya dense yeniden skorlama öncesinde aday kümesini daraltır.
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+BM25_FILE = "bm25.json"
+
+# "c++", "c#", "node.js", "ci/cd" gibi teknoloji adlarını bölmeden yakalar
+_TOKEN_PATTERN = re.compile(r"[\w][\w+#./-]*[\w+#]|[\w]", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Metni küçük harfe çevirip BM25 terimlerine ayırır"""
+    # Python 'İ'.lower() sonucuna birleşik nokta ekler; Türkçe için önce 'i'ye çevir
+    return _TOKEN_PATTERN.findall((text or '').replace('İ', 'i').lower())
+
+
+class BM25Index:
+    """Önceden hesaplanmış BM25 istatistiklerine sahip ters indeks"""
+
+    def __init__(self, chunk_ids: List[object], postings: Dict[str, List[Tuple[int, int]]],
+                 doc_lengths: List[int], k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            chunk_ids: Belge sırasına göre vektör deposundaki chunk id'leri
+            postings: terim -> [(belge sırası, terim frekansı)] listesi
+            doc_lengths: Her belgenin terim sayısı
+            k1: BM25 terim frekansı doygunluk parametresi
+            b: BM25 uzunluk normalizasyonu parametresi
+        """
+        self.chunk_ids = chunk_ids
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+
+        total = len(doc_lengths)
+        self.avg_doc_length = (sum(doc_lengths) / total) if total else 0.0
+        self.idf = {
+            term: math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in postings.items()
+        }
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["BM25Index"]:
+        """Klasördeki indeksi yükler, yoksa None döndürür"""
+        path = os.path.join(directory, BM25_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        postings = {term: [tuple(entry) for entry in docs] for term, docs in data["postings"].items()}
+        return cls(data["chunk_ids"], postings, data["doc_lengths"], k1=data["k1"], b=data["b"])
+
+    def persist(self, directory: str) -> None:
+        """İndeksi geçici dosyaya yazıp atomik olarak yerine taşır"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, BM25_FILE)
+        with open(path + ".tmp", 'w', encoding='utf-8') as file:
+            json.dump({
+                "chunk_ids": self.chunk_ids,
+                "postings": self.postings,
+                "doc_lengths": self.doc_lengths,
+                "k1": self.k1,
+                "b": self.b,
+            }, file, ensure_ascii=False)
+        os.replace(path + ".tmp", path)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[object, float]]:
+        """
+        Sorgu terimleri için BM25 skorlarını hesaplar
+
+        Args:
+            query: Sorgu metni
+            k: Getirilecek chunk sayısı
+
+        Returns:
+            (chunk id, BM25 skoru) listesi, skora göre azalan
+        """
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for doc_index, frequency in self.postings[term]:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[doc_index] / self.avg_doc_length
+                scores[doc_index] += idf * frequency * (self.k1 + 1) / (frequency + self.k1 * length_norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.chunk_ids[doc_index], score) for doc_index, score in ranked]
+
+
+class BM25IndexWriter:
+    """Ingestion sırasında BM25 istatistiklerini artımlı olarak biriktiren yardımcı sınıf"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._chunk_ids: List[object] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._doc_lengths: List[int] = []
+
+    def add(self, chunk_ids: Iterable[object], texts: Iterable[str]) -> None:
+        """Chunk'ları (vektör deposundaki id'leriyle birlikte) indekse ekler"""
+        for chunk_id, text in zip(chunk_ids, texts):
+            doc_index = len(self._chunk_ids)
+            terms = tokenize(text)
+            self._chunk_ids.append(chunk_id)
+            self._doc_lengths.append(len(terms))
+            for term, frequency in Counter(terms).items():
+                self._postings[term].append((doc_index, frequency))
+
+    def build(self) -> BM25Index:
+        """Biriktirilen istatistiklerden indeksi oluşturur"""
+        return BM25Index(self._chunk_ids, dict(self._postings), self._doc_lengths, k1=self.k1, b=self.b)
+
+
+def reciprocal_rank_fusion(rankings: List[List[Tuple[object, float]]], k: int,
+                           rrf_k: int = 60) -> List[Tuple[object, float]]:
+    """
+    Birden fazla sıralamayı reciprocal rank fusion ile birleştirir
+
+    Args:
+        rankings: Her biri (chunk id, skor) listesi olan sıralamalar
+        k: Döndürülecek chunk sayısı
+        rrf_k: RRF sabit terimi (yüksek değer alt sıraların etkisini artırır)
+
+    Returns:
+        (chunk id, RRF skoru) listesi, skora göre azalan
+    """
+    fused: Dict[object, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, (chunk_id, _) in enumerate(ranking, 1):
+            fused[chunk_id] += 1.0 / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)[:k]
@@ -0,0 +1,239 @@
+"""
+Groq modelleri için devre kesici (circuit breaker)
+
+Groq yavaşladığında veya çöktüğünde her ajan çağrısı istemci zaman aşımı
+kadar bekler. Model başına bir devre kesici son çağrıların sonuçlarını
+izler; pencere içindeki hatalı veya yavaş çağrı oranı eşiği aşarsa devre
+açılır ve çağrılar beklemeden LLMUnavailableError ile reddedilir.
+Açık kalma süresi dolunca tek bir deneme çağrısına izin verilir (half-open);
+başarılıysa devre kapanır, başarısızsa yeniden açılır. Groq'un durumu
+hakkında bilgi vermeyen sonuçlar (4xx, bozuk yanıt, deadline nedeniyle
+kesilen çağrı) nötrdür: pencereye eklenmez, deneme çağrısını serbest bırakır
+ama devreyi kapatmaz. Deneme çağrısına bir jeton verilir; yarı açık durumu
+yalnızca bu jetonla yapılan record/release değiştirir, devre açılmadan önce
+başlamış eski çağrıların sonuçları devreyi kapatamaz.
+
+    closed    -> çağrılar normal yapılır, sonuçlar izlenir
+    open      -> çağrılar hemen reddedilir
+    half_open -> tek bir deneme çağrısı yapılır
+"""
+
+import itertools
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv('config.env')
+
+# Sonuçların değerlendirildiği kayan pencere (saniye)
+CIRCUIT_WINDOW_SECONDS = float(os.getenv("CIRCUIT_WINDOW_SECONDS", "60"))
+# Pencerede bu kadar çağrı olmadan devre açılmaz
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+# Hatalı + yavaş çağrı oranı bu eşiği aşarsa devre açılır
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+# Bu süreden uzun süren başarılı çağrılar da yavaş (hatalı) sayılır
+CIRCUIT_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "20"))
+# Devrenin deneme çağrısından önce açık kaldığı süre
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+
+CIRCUIT_STATES = ("closed", "open", "half_open")
+
+
+class LLMUnavailableError(Exception):
+    """Groq çağrısı yapılamadığında (devre açık, bağlantı / sunucu hatası veya zaman aşımı)"""
+
+    def __init__(self, message: str, model: str, stage: str, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.model = model
+        self.stage = stage
+        self.retry_after = retry_after
+
+    def as_dict(self) -> dict:
+        """Yanıtlarda kullanılan yapılandırılmış hata bilgisi"""
+        return {
+            "model": self.model,
+            "stage": self.stage,
+            "reason": str(self),
+            "retry_after": self.retry_after,
+        }
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Devre açıkken çağrı beklemeden reddedildiğinde"""
+
+
+class CircuitBreaker:
+    """Tek bir model için thread-safe devre kesici"""
+
+    def __init__(self, name: str, window_seconds: float = CIRCUIT_WINDOW_SECONDS,
+                 min_calls: int = CIRCUIT_MIN_CALLS, failure_rate: float = CIRCUIT_FAILURE_RATE,
+                 slow_call_seconds: float = CIRCUIT_SLOW_CALL_SECONDS,
+                 open_seconds: float = CIRCUIT_OPEN_SECONDS):
+        """
+        Args:
+            name: Model adı
+            window_seconds: Sonuçların değerlendirildiği pencere
+            min_calls: Devrenin açılabilmesi için pencerede gereken en az çağrı
+            failure_rate: Devreyi açan hatalı + yavaş çağrı oranı
+            slow_call_seconds: Yavaş sayılan çağrı süresi
+            open_seconds: Deneme çağrısından önce açık kalma süresi
+        """
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.state = "closed"
+        self._opened_at = 0.0
+        # Süren deneme çağrısının jetonu (yoksa None)
+        self._probe_token: Optional[int] = None
+        self._probe_tokens = itertools.count(1)
+        # (zaman, hatalı_veya_yavaş) çiftleri
+        self._outcomes = deque()
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.neutral_calls = 0
+        self.trips = 0
+
+    def _retry_after(self, now: float) -> int:
+        return max(1, math.ceil(self._opened_at + self.open_seconds - now))
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and self._outcomes[0][0] < now - self.window_seconds:
+            self._outcomes.popleft()
+
+    def _open(self, now: float, reason: str) -> None:
+        self.state = "open"
+        self._opened_at = now
+        self.trips += 1
+        print(f"🔌 Devre açıldı ({self.name}): {reason}, {self.open_seconds:g} sn çağrı yapılmayacak")
+
+    def before_call(self, stage: str) -> Optional[int]:
+        """
+        Çağrıya izin verilip verilmediğini kontrol eder; half-open durumda deneme çağrısını ayırır
+
+        Returns:
+            Deneme çağrısının jetonu (record/release'e verilmeli) veya normal çağrıda None
+
+        Raises:
+            CircuitOpenError: Devre açıksa veya deneme çağrısı zaten sürüyorsa
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == "open" and now - self._opened_at >= self.open_seconds:
+                self.state = "half_open"
+                print(f"🔌 Devre yarı açık ({self.name}): deneme çağrısı yapılacak")
+            if self.state == "closed":
+                return None
+            if self.state == "half_open" and self._probe_token is None:
+                self._probe_token = next(self._probe_tokens)
+                return self._probe_token
+            self.rejected += 1
+            retry_after = self._retry_after(now) if self.state == "open" else 1
+            raise CircuitOpenError(f"{self.name} devresi açık, LLM çağrısı yapılmadı",
+                                   model=self.name, stage=stage, retry_after=retry_after)
+
+    def is_open(self) -> bool:
+        """Devre açık ve deneme çağrısı zamanı henüz gelmemişse True"""
+        with self._lock:
+            return self.state == "open" and time.monotonic() - self._opened_at < self.open_seconds
+
+    def record(self, elapsed: float, failed: bool, token: Optional[int] = None) -> None:
+        """
+        Tamamlanan çağrının sonucunu kaydeder
+
+        Args:
+            elapsed: Çağrı süresi (saniye)
+            failed: Bağlantı / sunucu hatası veya zaman aşımı oldu mu
+            token: before_call'ın döndürdüğü deneme jetonu
+        """
+        with self._lock:
+            now = time.monotonic()
+            slow = not failed and elapsed >= self.slow_call_seconds
+            self.calls += 1
+            self.failures += failed
+            self.slow_calls += slow
+
+            if token is not None and token == self._probe_token:
+                self._probe_token = None
+                if failed or slow:
+                    self._open(now, "deneme çağrısı başarısız" if failed else f"deneme çağrısı yavaş ({elapsed:.1f} sn)")
+                else:
+                    self.state = "closed"
+                    self._outcomes.clear()
+                    print(f"🔌 Devre kapandı ({self.name}): deneme çağrısı başarılı")
+                return
+
+            if self.state != "closed":
+                return
+            self._outcomes.append((now, failed or slow))
+            self._trim(now)
+            if len(self._outcomes) >= self.min_calls:
+                bad = sum(1 for _, is_bad in self._outcomes if is_bad)
+                rate = bad / len(self._outcomes)
+                if rate >= self.failure_rate:
+                    self._open(now, f"hatalı/yavaş çağrı oranı {rate:.0%} ({bad}/{len(self._outcomes)})")
+
+    def release(self, token: Optional[int] = None) -> None:
+        """
+        Sonucu Groq'un durumunu göstermeyen çağrıyı kaydeder
+
+        Pencereye eklenmez; jeton süren deneme çağrısınınsa yalnızca deneme
+        hakkı serbest bırakılır, devre bir sonraki deneme için yarı açık kalır.
+
+        Args:
+            token: before_call'ın döndürdüğü deneme jetonu
+        """
+        with self._lock:
+            self.calls += 1
+            self.neutral_calls += 1
+            if token is not None and token == self._probe_token:
+                self._probe_token = None
+
+    def stats(self) -> dict:
+        """Devre durumu ve sayaçları döndürür"""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            window_bad = sum(1 for _, is_bad in self._outcomes if is_bad)
+            return {
+                "state": self.state,
+                "window_calls": len(self._outcomes),
+                "window_failure_rate": round(window_bad / len(self._outcomes), 4) if self._outcomes else 0.0,
+                "retry_after": self._retry_after(now) if self.state == "open" else None,
+                "calls": self.calls,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "rejected": self.rejected,
+                "neutral_calls": self.neutral_calls,
+                "trips": self.trips,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(model: str) -> CircuitBreaker:
+    """Model için devre kesiciyi döndürür (lazy)"""
+    with _breakers_lock:
+        breaker = _breakers.get(model)
+        if breaker is None:
+            breaker = _breakers[model] = CircuitBreaker(model)
+        return breaker
+
+
+def circuit_breaker_stats() -> Dict[str, dict]:
+    """Tüm modellerin devre durumlarını döndürür"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
@@ -0,0 +1,199 @@
+"""
+Bölüm farkındalıklı CV sıkıştırma
+
+CV metnini baştan kesmek sona doğru yer alan beceri ve proje bölümlerini
+atarken başlık ve iletişim bloklarını korur. Bu modül:
+
+1. Temizlenmemiş (satır sonları korunmuş) metni bölümlere ayırır
+2. Her bölümü satır/cümle birimlerine böler
+3. Birimleri MiniLM embedding'leri ile iş ilanına benzerliğine, bölüm
+   ağırlığına ve içerdiği ilan becerilerine göre puanlar
+4. En değerli birimleri gerçek tokenizer ile ölçülen token bütçesine
+   yerleştirir ve belge sırasıyla, bölüm başlıklarıyla birlikte döndürür
+"""
+
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from prompt_tokens import count_tokens, count_tokens_batch
+
+load_dotenv('config.env')
+
+CV_COMPRESSION = os.getenv("CV_COMPRESSION", "1").lower() not in ("0", "false", "no")
+CV_TOKEN_BUDGET = int(os.getenv("CV_TOKEN_BUDGET", "1200"))
+# Sıkıştırma açıkken seçim yapılabilmesi için belgeden okunacak karakter bütçesi
+CV_EXTRACT_CHARS = int(os.getenv("CV_EXTRACT_CHARS", "16000"))
+
+# Bölüm adı -> başlık kalıbı (Türkçe / İngilizce)
+SECTION_PATTERNS = {
+    "summary": r"özet|profil|hakkımda|kariyer hedefi|summary|profile|about me|objective",
+    "experience": r"(?:iş |profesyonel )?deneyim(?:ler|leri|i)?|tecrübeler|tecrübe|work history|(?:work |professional )?experience|employment",
+    "projects": r"projeler|projects?",
+    "skills": r"beceriler|yetenekler|yetkinlikler|teknik (?:beceriler|bilgiler)|skills|technical skills|competencies|technologies",
+    "education": r"eğitim(?: bilgileri)?|education",
+    "certifications": r"sertifikalar|sertifika|kurslar|certifications?|courses|licenses",
+    "languages": r"yabancı dil(?:ler)?|diller|languages",
+    "contact": r"iletişim(?: bilgileri)?|kişisel bilgiler|contact|personal (?:details|information)",
+    "references": r"referanslar|references",
+    "interests": r"hobiler|ilgi alanları|interests|hobbies",
+}
+_SECTION_HEADING = re.compile(
+    r"^\s*(?:" + "|".join(f"(?P<{name}>{pattern})" for name, pattern in SECTION_PATTERNS.items()) + r")\s*:?\s*$",
+    re.IGNORECASE
+)
+
+# Bölümlerin puan çarpanları: iş ilanıyla eşleşme açısından değerli bölümler öne çıkar
+SECTION_WEIGHTS = {
+    "skills": 1.25,
+    "experience": 1.2,
+    "projects": 1.2,
+    "summary": 1.0,
+    "certifications": 1.0,
+    "education": 0.9,
+    "languages": 0.9,
+    "header": 0.6,
+    "contact": 0.4,
+    "references": 0.3,
+    "interests": 0.5,
+}
+SKILL_BONUS = 0.08
+MAX_SKILL_BONUS = 0.24
+UNIT_MAX_CHARS = 400
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def segment_sections(text: str) -> List[Tuple[str, str, List[str]]]:
+    """
+    Metni bölümlere ve birimlere (satır veya uzun satırlarda cümle) ayırır
+
+    Args:
+        text: Satır sonları korunmuş CV metni
+
+    Returns:
+        (bölüm adı, başlık satırı, birim listesi) listesi; ilk başlıktan önceki kısım "header"
+    """
+    sections = [("header", "", [])]
+    for line in (text or "").splitlines():
+        line = " ".join(line.split())
+        if not line:
+            continue
+        # Python 'İ'.lower() birleşik nokta ürettiğinden eşleştirmeden önce 'i'ye çevrilir
+        match = _SECTION_HEADING.match(line.replace('İ', 'i')) if len(line) <= 40 else None
+        if match:
+            sections.append((match.lastgroup, line.rstrip(":"), []))
+            continue
+        units = sections[-1][2]
+        if len(line) <= UNIT_MAX_CHARS:
+            units.append(line)
+        else:
+            units.extend(sentence for sentence in _SENTENCE_SPLIT.split(line) if sentence)
+    return [section for section in sections if section[2]]
+
+
+def _skill_pattern(skills: List[str]) -> Optional[re.Pattern]:
+    if not skills:
+        return None
+    return re.compile(r"(?<!\w)(?:" + "|".join(re.escape(skill.lower()) for skill in skills) + r")(?!\w)")
+
+
+def compress_cv(text: str, job_text: str, token_budget: int = CV_TOKEN_BUDGET,
+                embeddings=None, job_skills: Optional[List[str]] = None) -> Tuple[str, Dict]:
+    """
+    CV metnini iş ilanına göre en değerli içerikle token bütçesine sığdırır
+
+    Args:
+        text: Satır sonları korunmuş (clean_text uygulanmamış) CV metni
+        job_text: İş ilanı metni
+        token_budget: Çıktı için en fazla token
+        embeddings: LangChain embedding nesnesi (varsayılan: paylaşılan MiniLM modeli)
+        job_skills: İlandaki beceriler (varsayılan: extract_skills ile çıkarılır)
+
+    Returns:
+        (sıkıştırılmış metin, istatistikler)
+    """
+    started = time.perf_counter()
+    original_tokens = count_tokens(text)
+    stats = {
+        "original_tokens": original_tokens,
+        "compressed_tokens": original_tokens,
+        "token_budget": token_budget,
+        "total_units": 0,
+        "kept_units": 0,
+        "dropped_units": 0,
+        "sections": [],
+    }
+    if original_tokens <= token_budget:
+        return text, stats
+
+    sections = segment_sections(text)
+    units = [(index, unit) for index, (_, _, section_units) in enumerate(sections) for unit in section_units]
+    stats["total_units"] = len(units)
+    if not units:
+        return text, stats
+
+    if embeddings is None or job_skills is None:
+        from matching_engine import extract_skills, get_embeddings
+        embeddings = embeddings or get_embeddings()
+        job_skills = job_skills if job_skills is not None else extract_skills(job_text)
+
+    # İlan bir kez, birimler tek bir batch halinde embed edilir
+    job_vector = np.asarray(embeddings.embed_query(job_text), dtype=np.float32)
+    unit_vectors = np.asarray(embeddings.embed_documents([unit for _, unit in units]), dtype=np.float32)
+    job_vector /= np.linalg.norm(job_vector) or 1.0
+    unit_vectors /= np.maximum(np.linalg.norm(unit_vectors, axis=1, keepdims=True), 1e-12)
+    similarities = unit_vectors @ job_vector
+
+    skill_pattern = _skill_pattern(job_skills)
+    scores = []
+    for (section_index, unit), similarity in zip(units, similarities):
+        score = float(similarity) * SECTION_WEIGHTS.get(sections[section_index][0], 1.0)
+        if skill_pattern is not None:
+            score += min(MAX_SKILL_BONUS, SKILL_BONUS * len(set(skill_pattern.findall(unit.lower()))))
+        scores.append(score)
+
+    unit_tokens = count_tokens_batch([unit for _, unit in units])
+    heading_tokens = count_tokens_batch([f"{heading}:" if heading else "" for _, heading, _ in sections])
+
+    # En yüksek puanlı birimleri bütçeye sığdıkça seç (bölüm başlığı ilk birimle birlikte sayılır)
+    selected = set()
+    used_sections = set()
+    used_tokens = 0
+    for unit_index in sorted(range(len(units)), key=lambda i: scores[i], reverse=True):
+        section_index = units[unit_index][0]
+        cost = unit_tokens[unit_index] + 1
+        if section_index not in used_sections:
+            cost += heading_tokens[section_index] + 1
+        if used_tokens + cost > token_budget:
+            continue
+        selected.add(unit_index)
+        used_sections.add(section_index)
+        used_tokens += cost
+
+    lines = []
+    current_section = None
+    for unit_index, (section_index, unit) in enumerate(units):
+        if unit_index not in selected:
+            continue
+        if section_index != current_section:
+            current_section = section_index
+            heading = sections[section_index][1]
+            if heading:
+                lines.append(f"{heading}:")
+        lines.append(unit)
+    compressed = "\n".join(lines)
+
+    stats.update({
+        "compressed_tokens": count_tokens(compressed),
+        "kept_units": len(selected),
+        "dropped_units": len(units) - len(selected),
+        "sections": [sections[i][0] for i in sorted(used_sections)],
+    })
+    print(f"🗜️ CV sıkıştırıldı: {original_tokens} → {stats['compressed_tokens']} token "
+          f"({len(selected)}/{len(units)} birim, {(time.perf_counter() - started) * 1000:.1f} ms)")
+    return compressed, stats
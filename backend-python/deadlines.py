@@ -0,0 +1,99 @@
+"""
+İstek bazında son tarih (deadline)
+
+Her istek için istemcinin bildirdiği (X-Request-Timeout başlığı, saniye) veya
+endpoint'in varsayılan süresinden bir Deadline oluşturulur ve belge okuma,
+retrieval, embedding ve LLM çağrılarına geçirilir. Her aşama kalan süreyi
+zaman aşımı olarak kullanır; süresi dolmuş bir isteğin işi başlatılmaz.
+"""
+
+import os
+import time
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from werkzeug.exceptions import GatewayTimeout
+
+load_dotenv('config.env')
+
+REQUEST_DEADLINE_HEADER = "X-Request-Timeout"
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("DEFAULT_DEADLINE_SECONDS", "30"))
+# İstemci başlığı bu süreyi aşamaz
+MAX_DEADLINE_SECONDS = float(os.getenv("MAX_DEADLINE_SECONDS", "120"))
+
+
+class DeadlineExceeded(GatewayTimeout):
+    """İsteğin süresi bir aşama başlamadan veya sürerken dolduğunda"""
+
+
+def parse_deadlines(spec: str) -> Dict[str, float]:
+    """
+    "analyze=60,score=5" biçimindeki endpoint sürelerini okur
+
+    Returns:
+        endpoint adı -> saniye
+    """
+    deadlines = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            deadlines[name.strip()] = float(value)
+    return deadlines
+
+
+ENDPOINT_DEADLINES = parse_deadlines(os.getenv("ENDPOINT_DEADLINES", "analyze=60,score=5"))
+
+
+class Deadline:
+    """Monoton saate göre bitiş zamanı olan süre bütçesi"""
+
+    def __init__(self, seconds: float):
+        """
+        Args:
+            seconds: Şu andan itibaren kullanılabilecek süre
+        """
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Kalan süre (saniye, en az 0)"""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, stage: str) -> None:
+        """
+        Süre dolduysa aşamayı başlatmadan durdurur
+
+        Raises:
+            DeadlineExceeded: Süre dolmuşsa
+        """
+        if self.expired():
+            print(f"⏰ İstek süresi doldu ({self.seconds:g} sn), aşama atlandı: {stage}")
+            raise DeadlineExceeded(f"İstek süresi doldu ({self.seconds:g} sn): {stage}")
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Aşamanın kullanacağı zaman aşımı: kalan süre (cap ile sınırlı)"""
+        remaining = self.remaining()
+        return min(remaining, cap) if cap is not None else remaining
+
+
+def deadline_for_request(endpoint: str, header_value: Optional[str] = None) -> Deadline:
+    """
+    İstek için Deadline oluşturur
+
+    Args:
+        endpoint: Flask endpoint adı (varsayılan süre için)
+        header_value: X-Request-Timeout başlığının değeri (saniye, opsiyonel)
+
+    Returns:
+        Deadline
+    """
+    seconds = ENDPOINT_DEADLINES.get(endpoint, DEFAULT_DEADLINE_SECONDS)
+    if header_value:
+        try:
+            seconds = float(header_value)
+        except ValueError:
+            print(f"⚠️ Geçersiz {REQUEST_DEADLINE_HEADER} değeri: {header_value}")
+    return Deadline(max(0.0, min(seconds, MAX_DEADLINE_SECONDS)))
@@ -0,0 +1,155 @@
+"""
+Önbellekli ve deterministik dil algılama
+
+langdetect olasılıksal bir algoritma kullanır; seed verilmezse aynı metin
+için farklı çağrılarda farklı sonuç dönebilir ve süre metin uzunluğuyla
+artar. Bu modül:
+
+- Metnin sadece sınırlı bir önekini (LANGUAGE_SAMPLE_CHARS) örnekler
+- langdetect'i sabit seed ile çalıştırır
+- Sonuçları örneklenen metnin özetine (hash) göre LRU önbellekte tutar
+- Toplu (batch) algılama sunar
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import List
+
+from dotenv import load_dotenv
+from langdetect import DetectorFactory, LangDetectException, detect
+
+load_dotenv('config.env')
+
+LANGUAGE_SAMPLE_CHARS = int(os.getenv("LANGUAGE_SAMPLE_CHARS", "1000"))
+LANGUAGE_CACHE_SIZE = int(os.getenv("LANGUAGE_CACHE_SIZE", "2048"))
+LANGUAGE_DETECT_SEED = int(os.getenv("LANGUAGE_DETECT_SEED", "0"))
+DEFAULT_LANGUAGE = 'en'
+
+# langdetect her çağrıda bu seed ile yeni bir rastgele üreteç oluşturur
+DetectorFactory.seed = LANGUAGE_DETECT_SEED
+
+
+def sample_text(text: str, max_chars: int = LANGUAGE_SAMPLE_CHARS) -> str:
+    """Metnin boşlukları birleştirilmiş, en fazla max_chars karakterlik önekini döndürür"""
+    # Boşluk yoğun metinlerde örnek kısalmasın diye önce biraz fazlası alınır
+    return ' '.join((text or '')[:max_chars * 2].split())[:max_chars]
+
+
+class LanguageDetector:
+    """Thread-safe, LRU önbellekli dil algılayıcı"""
+
+    def __init__(self, sample_chars: int = LANGUAGE_SAMPLE_CHARS, max_entries: int = LANGUAGE_CACHE_SIZE):
+        """
+        Args:
+            sample_chars: Algılamada kullanılacak en fazla karakter sayısı
+            max_entries: Önbellekte tutulacak en fazla sonuç sayısı
+        """
+        self.sample_chars = sample_chars
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, sample: str) -> str:
+        return hashlib.sha1(sample.encode('utf-8')).hexdigest()
+
+    def _lookup(self, key: str):
+        with self._lock:
+            language = self._entries.get(key)
+            if language is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return language
+
+    def _store(self, key: str, language: str) -> None:
+        with self._lock:
+            self._entries[key] = language
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _detect_sample(self, sample: str) -> str:
+        try:
+            return detect(sample)
+        except LangDetectException as e:
+            print(f"⚠️ Dil algılanamadı ({e}), varsayılan: {DEFAULT_LANGUAGE}")
+            return DEFAULT_LANGUAGE
+
+    def detect(self, text: str) -> str:
+        """
+        Metnin dilini algılar
+
+        Args:
+            text: Dil kodu algılanacak metin
+
+        Returns:
+            ISO 639-1 dil kodu (algılanamazsa DEFAULT_LANGUAGE)
+        """
+        sample = sample_text(text, self.sample_chars)
+        key = self._key(sample)
+        language = self._lookup(key)
+        if language is None:
+            language = self._detect_sample(sample)
+            self._store(key, language)
+        return language
+
+    def detect_batch(self, texts: List[str]) -> List[str]:
+        """
+        Birden fazla metnin dilini algılar; aynı örneğe sahip metinler bir kez algılanır
+
+        Args:
+            texts: Metin listesi
+
+        Returns:
+            Giriş sırasıyla dil kodları
+        """
+        keys = []
+        results = {}
+        for text in texts:
+            sample = sample_text(text, self.sample_chars)
+            key = self._key(sample)
+            keys.append(key)
+            if key in results:
+                continue
+            language = self._lookup(key)
+            if language is None:
+                language = self._detect_sample(sample)
+                self._store(key, language)
+            results[key] = language
+        return [results[key] for key in keys]
+
+    def clear(self) -> None:
+        """Önbelleği ve sayaçları sıfırlar"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Önbellek isabet metriklerini döndürür"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+language_detector = LanguageDetector()
+
+
+def detect_language(text: str) -> str:
+    """Paylaşılan algılayıcı ile metnin dil kodunu döndürür"""
+    return language_detector.detect(text)
+
+
+def detect_languages(texts: List[str]) -> List[str]:
+    """Paylaşılan algılayıcı ile metinlerin dil kodlarını toplu olarak döndürür"""
+    return language_detector.detect_batch(texts)
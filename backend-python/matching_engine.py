@@ -3,69 +3,549 @@
 
 import os
 import glob
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 from langchain_community.vectorstores import Chroma
 from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from groq import Groq
 from dotenv import load_dotenv
+from vector_index import FlatVectorIndex, FlatVectorIndexWriter, fetch_documents, score_candidates, search_ranked_ids
+from retrieval_cache import RetrievalCache
+from bm25_index import BM25Index, BM25IndexWriter, reciprocal_rank_fusion
+from deadlines import DeadlineExceeded
 
 load_dotenv('config.env')
 
-def build_vectorstore():
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+CHROMA_PERSIST_DIRECTORY = "./chroma_db"
+FLAT_INDEX_DIRECTORY = os.getenv("FLAT_INDEX_DIRECTORY", "./flat_index")
+# Düz indeksin vektör saklama tipi: "float32" (varsayılan), "float16" veya "int8" (vektör başına ölçekli)
+FLAT_INDEX_DTYPE = os.getenv("FLAT_INDEX_DTYPE", "float32").lower()
+
+# Retrieval backend'i: "chroma" (varsayılan) veya "flat" (mmap .npy indeks)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma").lower()
+
+# Retrieval modu: "dense" (varsayılan), "hybrid" (BM25 + dense, RRF) veya
+# "prune" (BM25 adayları daraltır, dense yeniden skorlar)
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "dense").lower()
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))
+PRUNE_CANDIDATES = int(os.getenv("PRUNE_CANDIDATES", "50"))
+
+# Her yeniden oluşturmada değişen indeks versiyonu (retrieval önbelleğini geçersiz kılar)
+INDEX_VERSION_FILE = "INDEX_VERSION"
+retrieval_cache = RetrievalCache(max_entries=int(os.getenv("RETRIEVAL_CACHE_SIZE", "1024")))
+
+# Ingestion ayarları (config.env üzerinden değiştirilebilir)
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 150
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "0")) or (os.cpu_count() or 1)
+INGEST_EMBED_BATCH_SIZE = int(os.getenv("INGEST_EMBED_BATCH_SIZE", "64"))
+INGEST_WRITE_BATCH_SIZE = int(os.getenv("INGEST_WRITE_BATCH_SIZE", "512"))
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "0")) or (os.cpu_count() or 1)
+
+# "torch": HuggingFaceEmbeddings (PyTorch), "onnx": int8 quantize ONNX modeli (onnx_embeddings.py)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+
+_embeddings = None
+_embeddings_lock = threading.Lock()
+
+def create_embeddings(backend=EMBEDDING_BACKEND):
+    """
+    Seçilen backend için yeni bir embedding nesnesi oluşturur
+
+    ONNX modeli bulunamazsa PyTorch modeline geri düşülür.
+    """
+    if backend == "onnx":
+        from onnx_embeddings import ONNX_MODEL_DIR, ONNX_MODEL_FILE, OnnxEmbeddings
+        if OnnxEmbeddings.exists():
+            print(f"✅ ONNX embedding modeli kullanılıyor: {os.path.join(ONNX_MODEL_DIR, ONNX_MODEL_FILE)}")
+            return OnnxEmbeddings()
+        print(f"⚠️ ONNX modeli bulunamadı ({ONNX_MODEL_DIR}), PyTorch modeli kullanılacak. "
+              "Oluşturmak için: python onnx_embeddings.py export")
+    return HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL_NAME)
+
+def get_embeddings():
+    """
+    Paylaşılan embedding modelini döndürür (ilk kullanımda yüklenir)
+
+    Model yüklemesi saniyeler sürdüğünden istek başına yeni örnek oluşturulmaz.
+    """
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            _embeddings = create_embeddings()
+        return _embeddings
+
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "512"))
+
+@lru_cache(maxsize=EMBEDDING_CACHE_SIZE)
+def embed_text_cached(text):
+    """
+    Metnin embedding'ini paylaşılan modelle hesaplar; aynı metin (ör. tekrar
+    eden iş ilanları) için sonuç bellekten döner
+
+    Returns:
+        Embedding vektörü (değiştirilemez tuple)
+    """
+    return tuple(get_embeddings().embed_query(text))
+
+# Uzun metin benzerliği: "off" (tek embedding, MiniLM 256 word piece'ten sonrasını keser),
+# "mean" / "max" (pencere vektörlerinin ortalaması / en büyüğü) veya
+# "matrix" (her ilan penceresinin CV'deki en iyi eşleşmesinin ortalaması)
+LONG_DOCUMENT_MODE = os.getenv("LONG_DOCUMENT_MODE", "mean").lower()
+EMBEDDING_WINDOW_TOKENS = int(os.getenv("EMBEDDING_WINDOW_TOKENS", "240"))
+EMBEDDING_WINDOW_OVERLAP = int(os.getenv("EMBEDDING_WINDOW_OVERLAP", "48"))
+
+# Pencere başına vektör önbelleği: metin önbelleğini kaçıran metinlerin (ör. farklı ilana göre
+# sıkıştırılmış aynı CV) daha önce görülmüş pencereleri yeniden embed edilmez
+EMBEDDING_WINDOW_CACHE_SIZE = int(os.getenv("EMBEDDING_WINDOW_CACHE_SIZE", "4096"))
+
+_window_cache = OrderedDict()
+_window_vector_cache = OrderedDict()
+_window_cache_lock = threading.Lock()
+_window_cache_stats = {"hits": 0, "misses": 0, "window_hits": 0, "window_misses": 0}
+
+def embedding_token_spans(text, embeddings=None):
     """
-    Documents klasöründeki tüm belgeleri yükleyip ChromaDB'ye ekler
+    Metindeki token'ların karakter aralıklarını embedding modelinin kendi tokenizer'ıyla döndürür
+
+    Pencere sınırı modelin gördüğü word piece'lere göre belirlenir; LLM
+    tokenizer'ı veya yaklaşık sayım pencereleri modelin sınırından taşırabilir.
+
+    Args:
+        text: Metin
+        embeddings: Embedding nesnesi (varsayılan: paylaşılan model)
+
+    Returns:
+        (başlangıç, bitiş) karakter indeksleri listesi
+    """
+    embeddings = embeddings or get_embeddings()
+    if not isinstance(embeddings, HuggingFaceEmbeddings):
+        # OnnxEmbeddings: tokenizers (Rust) tokenizer'ı
+        return embeddings.token_spans(text)
+    tokenizer = embeddings.client.tokenizer
+    offsets = tokenizer(text or '', add_special_tokens=False, return_offsets_mapping=True,
+                        verbose=False)["offset_mapping"]
+    return [tuple(offset) for offset in offsets]
+
+def split_windows(text, window_tokens=None, overlap_tokens=None, embeddings=None):
+    """
+    Metni embedding modelinin token sınırına göre örtüşen pencerelere böler
+
+    Args:
+        text: Metin
+        window_tokens: Pencere başına en fazla token (varsayılan: EMBEDDING_WINDOW_TOKENS)
+        overlap_tokens: Ardışık pencerelerin ortak token sayısı (varsayılan: EMBEDDING_WINDOW_OVERLAP)
+        embeddings: Tokenizer'ı kullanılacak embedding nesnesi (varsayılan: paylaşılan model)
+
+    Returns:
+        Pencere metinleri listesi (kısa metinler için tek eleman)
+    """
+    window_tokens = window_tokens or EMBEDDING_WINDOW_TOKENS
+    overlap_tokens = EMBEDDING_WINDOW_OVERLAP if overlap_tokens is None else overlap_tokens
+    spans = embedding_token_spans(text, embeddings)
+    if len(spans) <= window_tokens:
+        return [text]
+
+    step = max(1, window_tokens - overlap_tokens)
+    windows = []
+    for start in range(0, len(spans), step):
+        end = min(start + window_tokens, len(spans))
+        windows.append(text[spans[start][0]:spans[end - 1][1]])
+        if end == len(spans):
+            break
+    return windows
+
+def embed_windows(texts, embeddings=None):
+    """
+    Metinlerin pencere embedding'lerini tek bir batch çağrısıyla hesaplar
+
+    Önceden hesaplanmış metinler bellekten döner. Kalan metinler pencerelere
+    bölünür; pencere önbelleğinde olmayan pencereler tek bir embed_documents
+    çağrısında embed edilir.
+
+    Args:
+        texts: Metin listesi
+        embeddings: Embedding nesnesi (varsayılan: paylaşılan model)
+
+    Returns:
+        Her metin için (pencere sayısı, boyut) normalize float32 matris
+    """
+    with _window_cache_lock:
+        results = {text: _window_cache[text] for text in texts if text in _window_cache}
+        for text in results:
+            _window_cache.move_to_end(text)
+        missing = [text for text in dict.fromkeys(texts) if text not in results]
+        _window_cache_stats["hits"] += len(results)
+        _window_cache_stats["misses"] += len(missing)
+
+    if missing:
+        windows = [split_windows(text, embeddings=embeddings) for text in missing]
+        with _window_cache_lock:
+            cached = {window: _window_vector_cache[window] for text_windows in windows
+                      for window in text_windows if window in _window_vector_cache}
+            for window in cached:
+                _window_vector_cache.move_to_end(window)
+        new_windows = list(dict.fromkeys(window for text_windows in windows
+                                         for window in text_windows if window not in cached))
+        if new_windows:
+            vectors = np.asarray((embeddings or get_embeddings()).embed_documents(new_windows), dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            cached.update(zip(new_windows, vectors))
+
+        with _window_cache_lock:
+            _window_cache_stats["window_hits"] += sum(len(text_windows) for text_windows in windows) - len(new_windows)
+            _window_cache_stats["window_misses"] += len(new_windows)
+            for window in new_windows:
+                _window_vector_cache[window] = cached[window]
+            while len(_window_vector_cache) > EMBEDDING_WINDOW_CACHE_SIZE:
+                _window_vector_cache.popitem(last=False)
+            for text, text_windows in zip(missing, windows):
+                matrix = np.stack([cached[window] for window in text_windows])
+                matrix.setflags(write=False)
+                results[text] = _window_cache[text] = matrix
+            while len(_window_cache) > EMBEDDING_CACHE_SIZE:
+                _window_cache.popitem(last=False)
+
+    return [results[text] for text in texts]
+
+def long_text_similarity(cv_text, job_text, mode=None):
+    """
+    Uzun CV ve ilan metinleri için kesmesiz benzerlik hesaplar
+
+    Args:
+        cv_text: CV metni
+        job_text: İş ilanı metni
+        mode: "mean", "max" veya "matrix" (varsayılan: LONG_DOCUMENT_MODE)
+
+    Returns:
+        Cosine benzerliği
+    """
+    mode = (mode or LONG_DOCUMENT_MODE).lower()
+    cv_windows, job_windows = embed_windows([cv_text, job_text])
+
+    if mode == "matrix":
+        # Pencere x pencere benzerlik matrisi: her ilan parçası CV'deki en iyi karşılığıyla puanlanır
+        return float((job_windows @ cv_windows.T).max(axis=1).mean())
+
+    pool = np.max if mode == "max" else np.mean
+    cv_vector = pool(cv_windows, axis=0)
+    job_vector = pool(job_windows, axis=0)
+    norm = np.linalg.norm(cv_vector) * np.linalg.norm(job_vector)
+    return float(cv_vector @ job_vector / norm) if norm else 0.0
+
+def embedding_cache_stats():
+    """Metin ve pencere embedding önbelleklerinin durumunu döndürür"""
+    with _window_cache_lock:
+        windows = dict(_window_cache_stats, entries=len(_window_cache), max_entries=EMBEDDING_CACHE_SIZE,
+                       window_entries=len(_window_vector_cache), max_window_entries=EMBEDDING_WINDOW_CACHE_SIZE)
+    return {"texts": embed_text_cached.cache_info()._asdict(), "windows": windows}
+
+def clear_embedding_caches():
+    """Metin ve pencere embedding önbelleklerini temizler"""
+    embed_text_cached.cache_clear()
+    with _window_cache_lock:
+        _window_cache.clear()
+        _window_vector_cache.clear()
+        _window_cache_stats.update(hits=0, misses=0, window_hits=0, window_misses=0)
+
+def warm_up_embeddings():
+    """Modeli yükleyip ilk çağrı maliyetini (lazy init, thread havuzları) başlangıçta öder"""
+    started = time.perf_counter()
+    get_embeddings().embed_query("warm-up")
+    # Pencere bölmede kullanılan tokenizer yolu da ilk istekten önce ısınır
+    split_windows("warm-up")
+    print(f"🔥 Embedding modeli ısındı: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+def _configure_torch_threads(num_threads):
+    """
+    Embedding hesaplaması için torch thread sayısını ayarlar
+
+    Args:
+        num_threads: Kullanılacak intra-op thread sayısı
+    """
+    try:
+        import torch
+        torch.set_num_threads(num_threads)
+        print(f"🧵 Torch thread sayısı: {torch.get_num_threads()}")
+    except Exception as e:
+        print(f"⚠️ Torch thread ayarı yapılamadı: {e}")
+
+def _iter_document_files(documents_dir):
+    """
+    Documents klasöründeki .txt dosyalarını tek tek okuyarak (content, source) üretir
+
+    Args:
+        documents_dir: Belgelerin bulunduğu klasör
+
+    Yields:
+        (dosya içeriği, dosya adı) ikilisi
+    """
+    for file_path in sorted(glob.glob(os.path.join(documents_dir, '*.txt'))):
+        try:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                yield file.read(), os.path.basename(file_path)
+        except Exception as e:
+            print(f"❌ {file_path} yüklenirken hata: {e}")
+
+def _split_document(item):
+    """
+    Tek bir belgeyi chunk'lara böler (process pool içinde çalışır)
+
+    Args:
+        item: (dosya içeriği, dosya adı) ikilisi
+
+    Returns:
+        (chunk metni, metadata) listesi
+    """
+    content, source = item
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    return [(chunk, {"source": source}) for chunk in text_splitter.split_text(content)]
+
+def _iter_chunks(documents_dir, workers):
+    """
+    Belgeleri akış halinde okuyup process pool ile paralel böler
+
+    Args:
+        documents_dir: Belgelerin bulunduğu klasör
+        workers: Bölme için kullanılacak process sayısı
+
+    Yields:
+        (chunk metni, metadata) ikilisi
+    """
+    files = _iter_document_files(documents_dir)
+
+    if workers <= 1:
+        for item in files:
+            yield from _split_document(item)
+        return
+
+    # Tüm dosyaları belleğe almadan, pencere pencere işle
+    window_size = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            window = list(islice(files, window_size))
+            if not window:
+                break
+            for chunks in pool.map(_split_document, window):
+                yield from chunks
+
+def _iter_batches(iterable, batch_size):
+    """Iterable'ı sabit boyutlu listelere böler"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+def _store_directory(backend=None):
+    """Backend'e göre vektör deposu klasörünü döndürür"""
+    backend = (backend or VECTOR_BACKEND).lower()
+    return FLAT_INDEX_DIRECTORY if backend == "flat" else CHROMA_PERSIST_DIRECTORY
+
+def get_index_version(backend=None):
+    """
+    Vektör deposunun güncel versiyonunu okur
+
+    Args:
+        backend: "chroma" veya "flat" (varsayılan: VECTOR_BACKEND)
+
+    Returns:
+        Versiyon metni (depo hiç oluşturulmadıysa "0")
+    """
+    try:
+        with open(os.path.join(_store_directory(backend), INDEX_VERSION_FILE), 'r', encoding='utf-8') as file:
+            return file.read().strip() or "0"
+    except OSError:
+        return "0"
+
+def _write_index_version(directory):
+    """Depo klasörüne yeni bir indeks versiyonu yazar"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, INDEX_VERSION_FILE), 'w', encoding='utf-8') as file:
+        file.write(str(time.time_ns()))
+
+_bm25_indexes = {}
+
+def load_bm25_index(index_version, backend=None):
+    """
+    Vektör deposunun yanındaki BM25 indeksini yükler (versiyon başına bir kez)
+
+    Args:
+        index_version: Deponun versiyonu
+        backend: "chroma" veya "flat" (varsayılan: VECTOR_BACKEND)
+
+    Returns:
+        BM25Index veya None
+    """
+    directory = _store_directory(backend)
+    key = (directory, index_version)
+    if key not in _bm25_indexes:
+        _bm25_indexes.clear()
+        _bm25_indexes[key] = BM25Index.load(directory)
+    return _bm25_indexes[key]
+
+def rank_chunks(vectordb, query, k, mode=None, lexical_query=None, index_version=None):
+    """
+    Seçilen retrieval moduna göre sıralı (chunk id, skor) listesi üretir
+
+    Args:
+        vectordb: load_vectorstore ile yüklenmiş vektör deposu
+        query: Dense arama sorgusu
+        k: Getirilecek belge parçası sayısı
+        mode: "dense", "hybrid" veya "prune" (varsayılan: RETRIEVAL_MODE)
+        lexical_query: BM25 sorgusu (varsayılan: query)
+        index_version: Deponun versiyonu (varsayılan: diskteki güncel versiyon)
+
+    Returns:
+        (chunk id, skor) listesi
+    """
+    mode = (mode or RETRIEVAL_MODE).lower()
+    if mode == "dense":
+        return search_ranked_ids(vectordb, query, k)
+
+    bm25 = load_bm25_index(index_version or get_index_version())
+    if bm25 is None:
+        print("⚠️ BM25 indeksi bulunamadı, dense arama kullanılıyor")
+        return search_ranked_ids(vectordb, query, k)
+
+    if mode == "prune":
+        candidates = bm25.search(lexical_query or query, k=PRUNE_CANDIDATES)
+        if not candidates:
+            return search_ranked_ids(vectordb, query, k)
+        return score_candidates(vectordb, query, [chunk_id for chunk_id, _ in candidates], k)
+
+    dense = search_ranked_ids(vectordb, query, max(k, HYBRID_CANDIDATES))
+    lexical = bm25.search(lexical_query or query, k=max(k, HYBRID_CANDIDATES))
+    return reciprocal_rank_fusion([dense, lexical], k)
+
+def retrieve_documents(vectordb, query, k, index_version=None, lexical_query=None, mode=None):
+    """
+    Önbellek destekli retrieval: sıralı chunk id'lerini önbellekten veya depodan alır
+
+    Args:
+        vectordb: load_vectorstore ile yüklenmiş vektör deposu
+        query: Sorgu metni
+        k: Getirilecek belge parçası sayısı
+        index_version: Deponun versiyonu (varsayılan: diskteki güncel versiyon)
+        lexical_query: Hibrit modlarda BM25 için kullanılacak (kısaltılmamış) sorgu
+        mode: "dense", "hybrid" veya "prune" (varsayılan: RETRIEVAL_MODE)
+
+    Returns:
+        En alakalı belge parçaları (Document listesi)
+    """
+    index_version = index_version or get_index_version()
+    mode = (mode or RETRIEVAL_MODE).lower()
+    cache_query = f"{query}\n{lexical_query}" if lexical_query and mode != "dense" else query
+    ranked = retrieval_cache.get_or_compute(
+        cache_query, k, index_version,
+        lambda: rank_chunks(vectordb, query, k, mode, lexical_query, index_version),
+        mode=mode
+    )
+    return fetch_documents(vectordb, [chunk_id for chunk_id, _ in ranked])
+
+def load_vectorstore(embeddings, backend=None):
+    """
+    Yapılandırılmış retrieval backend'ini yükler
+
+    Args:
+        embeddings: Sorguları embed etmek için embedding modeli
+        backend: "chroma" veya "flat" (varsayılan: VECTOR_BACKEND)
+
+    Returns:
+        similarity_search(query, k) arayüzüne sahip vektör deposu
+    """
+    backend = (backend or VECTOR_BACKEND).lower()
+    if backend == "flat":
+        return FlatVectorIndex(FLAT_INDEX_DIRECTORY, embedding_function=embeddings)
+    return Chroma(persist_directory=CHROMA_PERSIST_DIRECTORY, embedding_function=embeddings)
+
+def build_vectorstore(documents_dir='documents', persist_directory=None,
+                      workers=None, embed_batch_size=None, write_batch_size=None, backend=None,
+                      index_dtype=None):
+    """
+    Documents klasöründeki tüm belgeleri yükleyip vektör deposuna (ChromaDB veya düz indeks) ekler
+
+    Belgeler akış halinde okunur, process pool ile paralel bölünür,
+    ayarlanabilir batch boyutlarıyla embed edilip toplu halde yazılır.
+
+    Args:
+        documents_dir: Belgelerin bulunduğu klasör
+        persist_directory: Depo klasörü (varsayılan: backend'e göre CHROMA_PERSIST_DIRECTORY / FLAT_INDEX_DIRECTORY)
+        workers: Bölme için process sayısı (varsayılan: INGEST_WORKERS)
+        embed_batch_size: Embedding batch boyutu (varsayılan: INGEST_EMBED_BATCH_SIZE)
+        write_batch_size: Veritabanına tek seferde yazılacak chunk sayısı (varsayılan: INGEST_WRITE_BATCH_SIZE)
+        backend: "chroma" veya "flat" (varsayılan: VECTOR_BACKEND)
+        index_dtype: Düz indeks vektör tipi (varsayılan: FLAT_INDEX_DTYPE)
+
+    Returns:
+        Vektör deposu veya None
     """
     print("🎓 UZMAN EĞİTİM PROGRAMI BAŞLIYOR...")
     print("=" * 50)
 
+    workers = workers or INGEST_WORKERS
+    embed_batch_size = embed_batch_size or INGEST_EMBED_BATCH_SIZE
+    write_batch_size = write_batch_size or INGEST_WRITE_BATCH_SIZE
+    backend = (backend or VECTOR_BACKEND).lower()
+    if not persist_directory:
+        persist_directory = _store_directory(backend)
+
     try:
         # 1. Embedding modelini hazırla
         print("🔍 Embedding modeli hazırlanıyor...")
-        embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-        print("✅ Embedding modeli hazır.")
-
-        # 2. Documents klasöründeki belgeleri yükle
-        print("\n📚 Belgeler yükleniyor...")
-        documents = []
-        txt_files = glob.glob('documents/*.txt')
-
-        for file_path in txt_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    content = file.read()
-                    filename = os.path.basename(file_path)
-                    doc = Document(page_content=content, metadata={"source": filename})
-                    documents.append(doc)
-                    print(f"✅ {filename} yüklendi")
-            except Exception as e:
-                print(f"❌ {file_path} yüklenirken hata: {e}")
-
-        print(f"✅ {len(documents)} adet belge yüklendi.")
-
-        # 3. Belgeleri chunk'lara böl
-        print("\n✂️ Belgeler küçük parçalara bölünüyor...")
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=150)
-        texts = text_splitter.split_documents(documents)
-        print(f"✅ Belgeler {len(texts)} adet parçaya bölündü.")
-
-        # 4. ChromaDB'ye ekle
-        print("\n🧠 Vektör veritabanına kaydediliyor...")
-        vectordb = Chroma.from_documents(
-            documents=texts,
-            embedding=embeddings,
-            persist_directory="./chroma_db"
+        _configure_torch_threads(TORCH_NUM_THREADS)
+        embeddings = HuggingFaceEmbeddings(
+            model_name=EMBEDDING_MODEL_NAME,
+            encode_kwargs={"batch_size": embed_batch_size}
         )
-        
+        if backend == "flat":
+            vectordb = FlatVectorIndexWriter(persist_directory, embeddings)
+        else:
+            vectordb = Chroma(persist_directory=persist_directory, embedding_function=embeddings)
+        print(f"✅ Embedding modeli hazır. (backend: {backend})")
+
+        # 2. Belgeleri akış halinde oku, paralel böl ve toplu yaz
+        print(f"\n📚 Belgeler işleniyor ({workers} process, embed batch: {embed_batch_size}, yazma batch: {write_batch_size})...")
+        started = time.perf_counter()
+        total_chunks = 0
+        bm25_writer = BM25IndexWriter()
+        for batch in _iter_batches(_iter_chunks(documents_dir, workers), write_batch_size):
+            texts = [chunk for chunk, _ in batch]
+            metadatas = [metadata for _, metadata in batch]
+            ids = vectordb.add_texts(texts=texts, metadatas=metadatas)
+            bm25_writer.add(ids, texts)
+            total_chunks += len(batch)
+            elapsed = time.perf_counter() - started
+            print(f"🧠 {total_chunks} parça yazıldı ({total_chunks / elapsed:.1f} parça/sn)")
+
+        if backend == "flat":
+            vectordb.persist(dtype=index_dtype or FLAT_INDEX_DTYPE)
+            vectordb = FlatVectorIndex(persist_directory, embedding_function=embeddings)
+            print(f"💾 Düz indeks: {vectordb.dtype}, {vectordb.nbytes / 1024 / 1024:.2f} MB vektör belleği")
+        bm25_writer.build().persist(persist_directory)
+        _write_index_version(persist_directory)
+
+        elapsed = time.perf_counter() - started
+        chunks_per_second = total_chunks / elapsed if elapsed > 0 else 0.0
+
         print("\n" + "=" * 50)
         print("🎉 UZMAN EĞİTİMİ TAMAMLANDI!")
-        print(f"🧠 Vektör veritabanı '{len(texts)}' adet parça ile oluşturuldu.")
+        print(f"🧠 Vektör veritabanı '{total_chunks}' adet parça ile oluşturuldu.")
+        print(f"⏱️ Süre: {elapsed:.2f} sn | Hız: {chunks_per_second:.1f} parça/sn")
         print("=" * 50)
-        
+
         return vectordb
-        
+
     except Exception as e:
         print(f"❌ Vektör veritabanı oluşturma hatası: {e}")
         return None
@@ -176,7 +656,81 @@ def calculate_skill_match(cv_skills, job_skills):
         print(f"❌ Beceri uyum hesaplama hatası: {e}")
         return 0.0
 
-def calculate_final_score(cv_text, job_text, rag_context=""):
+# Gereksinim -> kanıt eşleştirmesi: bu benzerliğin üstündeki en iyi CV cümlesi gereksinimi "karşılar"
+EVIDENCE_THRESHOLD = float(os.getenv("EVIDENCE_THRESHOLD", "0.5"))
+MAX_REQUIREMENTS = int(os.getenv("MAX_REQUIREMENTS", "40"))
+MAX_EVIDENCE_SENTENCES = int(os.getenv("MAX_EVIDENCE_SENTENCES", "200"))
+_SEGMENT_SPLIT = re.compile(r"[\r\n]+|(?<=[.!?;])\s+|\s[-•*·▪|]\s")
+_LIST_MARKER = re.compile(r"^(?:[-•*·▪]|\d+[.)])\s*")
+
+def split_segments(text, min_chars=12, limit=None):
+    """
+    Metni satır, madde ve cümle sınırlarından kısa parçalara böler
+
+    Başlık gibi ':' ile biten satırlar ve min_chars'tan kısa parçalar atlanır,
+    tekrar eden parçalar bir kez alınır.
+
+    Args:
+        text: İş ilanı veya CV metni (temizlenmiş ya da satır sonlu)
+        min_chars: Parçanın en az karakter sayısı
+        limit: En fazla parça sayısı
+
+    Returns:
+        Metindeki sırasıyla parça listesi
+    """
+    segments = []
+    for part in _SEGMENT_SPLIT.split(text or ""):
+        part = _LIST_MARKER.sub("", " ".join(part.split()))
+        if len(part) < min_chars or part.endswith(":"):
+            continue
+        segments.append(part)
+    segments = list(dict.fromkeys(segments))
+    return segments[:limit] if limit else segments
+
+def match_requirements(cv_text, job_text, threshold=None, embeddings=None):
+    """
+    İlan gereksinimlerini CV'deki en iyi kanıt cümlesiyle eşleştirir
+
+    Gereksinimler ve CV cümleleri tek bir batch'te embed edilir, benzerlik
+    matrisi tek bir matris çarpımıyla hesaplanır.
+
+    Args:
+        cv_text: CV metni
+        job_text: İş ilanı metni
+        threshold: Karşılanma eşiği (varsayılan: EVIDENCE_THRESHOLD)
+        embeddings: Embedding nesnesi (varsayılan: paylaşılan model)
+
+    Returns:
+        {"requirements": [{requirement, evidence, similarity, covered}], "coverage", "threshold"}
+    """
+    threshold = EVIDENCE_THRESHOLD if threshold is None else threshold
+    requirements = split_segments(job_text, limit=MAX_REQUIREMENTS)
+    sentences = split_segments(cv_text, limit=MAX_EVIDENCE_SENTENCES)
+    if not requirements or not sentences:
+        return {"requirements": [], "coverage": 0.0, "threshold": threshold}
+
+    vectors = np.asarray((embeddings or get_embeddings()).embed_documents(requirements + sentences), dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    similarity = vectors[:len(requirements)] @ vectors[len(requirements):].T
+
+    best = similarity.argmax(axis=1)
+    best_scores = similarity[np.arange(len(requirements)), best]
+    covered = best_scores >= threshold
+    return {
+        "requirements": [
+            {
+                "requirement": requirement,
+                "evidence": sentences[index],
+                "similarity": round(float(score), 3),
+                "covered": bool(is_covered),
+            }
+            for requirement, index, score, is_covered in zip(requirements, best, best_scores, covered)
+        ],
+        "coverage": round(float(covered.mean()) * 100, 1),
+        "threshold": threshold,
+    }
+
+def calculate_final_score(cv_text, job_text, rag_context="", explain=False, deadline=None):
     """
     CV ve iş ilanı arasındaki final skoru hesaplar
     
@@ -184,6 +738,8 @@ def calculate_final_score(cv_text, job_text, rag_context=""):
         cv_text: CV metni
         job_text: İş ilanı metni
         rag_context: RAG'den gelen ek bağlam
+        explain: Gereksinim bazında kanıt ve kapsama oranı da hesaplansın mı
+        deadline: İsteğin son tarihi (opsiyonel); süre dolduysa embedding başlatılmaz
         
     Returns:
         Final skor (0-100 arası) ve detaylar
@@ -191,17 +747,17 @@ def calculate_final_score(cv_text, job_text, rag_context=""):
     try:
         print("🎯 SKOR HESAPLAMA BAŞLIYOR...")
         
-        # 1. Embedding modelini hazırla
-        embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-        
-        # 2. CV ve iş ilanı embedding'lerini hesapla
+        # 1-3. CV ve iş ilanı embedding'lerini paylaşılan (sıcak) modelle hesapla ve karşılaştır
         print("🔍 Embedding'ler hesaplanıyor...")
-        cv_embedding = embeddings.embed_query(cv_text)
-        job_embedding = embeddings.embed_query(job_text)
-        
-        # 3. Cosine similarity hesapla
-        print("📊 Cosine similarity hesaplanıyor...")
-        text_similarity = calculate_cosine_similarity(cv_embedding, job_embedding)
+        if deadline is not None:
+            deadline.check("embedding")
+        if LONG_DOCUMENT_MODE == "off":
+            cv_embedding = embed_text_cached(cv_text)
+            job_embedding = embed_text_cached(job_text)
+            text_similarity = calculate_cosine_similarity(cv_embedding, job_embedding)
+        else:
+            # Uzun metinler kesilmeden örtüşen pencerelerle, tek batch'te embed edilir
+            text_similarity = long_text_similarity(cv_text, job_text)
         text_score = text_similarity * 100  # 0-100 arasına çevir
         
         # 4. Becerileri çıkar ve karşılaştır
@@ -236,9 +792,20 @@ def calculate_final_score(cv_text, job_text, rag_context=""):
             "missing_skills": list(set(job_skills) - set(cv_skills))
         }
         
+        # 8. Açıklama: hangi gereksinim CV'nin hangi cümlesiyle karşılanıyor
+        if explain and (deadline is None or not deadline.expired()):
+            started = time.perf_counter()
+            explanation = match_requirements(cv_text, job_text)
+            result["requirements"] = explanation["requirements"]
+            result["requirement_coverage"] = explanation["coverage"]
+            print(f"🧾 Gereksinim kapsamı: %{explanation['coverage']:.0f} "
+                  f"({len(explanation['requirements'])} gereksinim, {(time.perf_counter() - started) * 1000:.1f} ms)")
+        
         print(f"✅ Skor hesaplama tamamlandı: {final_score:.1f}/100")
         return result
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         print(f"❌ Skor hesaplama hatası: {e}")
         return {
@@ -253,6 +820,22 @@ def calculate_final_score(cv_text, job_text, rag_context=""):
             "error": str(e)
         }
 
+def _rag_chat_completion(prompt, stage, max_tokens, prompt_fields):
+    """RAG yardımcılarının LLM çağrısı: ajanlarla aynı yönlendirme, token hesabı ve devre kesici"""
+    from agents.llm_client import create_chat_completion
+    from model_router import FAST_MODEL
+
+    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    chat_completion = create_chat_completion(
+        client,
+        messages=[{"role": "user", "content": prompt}],
+        model=FAST_MODEL,
+        stage=stage,
+        prompt_fields=prompt_fields,
+        max_tokens=max_tokens
+    )
+    return chat_completion.choices[0].message.content
+
 def get_rag_analysis(cv_text, job_text, language='Türkçe'):
     """
     RAG destekli uzman analizi yapar
@@ -263,14 +846,13 @@ def get_rag_analysis(cv_text, job_text, language='Türkçe'):
     try:
         # 1. Uzmanın "gözlüğünü" ve "beynini" hazırla
         print("🔍 Uzmanın gözlüğü ve beyni hazırlanıyor...")
-        embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-        vectordb = Chroma(persist_directory="./chroma_db", embedding_function=embeddings)
+        vectordb = load_vectorstore(get_embeddings())
         print("✅ Uzmanın beyni yüklendi.")
 
         # 2. Beyinden konuyla ilgili notları bul ve getir
         print("🧠 Uzmanın beyninden ilgili notlar aranıyor...")
         query = f"CV analizi ve iş ilanı: {job_text[:200]}..."  # İlana göre en alakalı notları bul
-        relevant_docs = vectordb.similarity_search(query, k=3)  # En alakalı 3 notu getir
+        relevant_docs = retrieve_documents(vectordb, query, k=3, lexical_query=job_text)  # En alakalı 3 notu getir
         context = "\n\n".join(doc.page_content for doc in relevant_docs)
         print(f"✅ Uzmanın beyninden {len(relevant_docs)} adet ilgili not bulundu.")
 
@@ -320,13 +902,8 @@ ASLA İNGİLİZCE VEYA BAŞKA DİL KULLANMA!
         
         # 5. Uzmandan cevap al (Groq)
         print("🤖 Uzman analizi yapılıyor...")
-        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        chat_completion = client.chat.completions.create(
-            messages=[{"role": "user", "content": enhanced_prompt}],
-            model="llama3-8b-8192"
-        )
-        
-        ai_analysis = chat_completion.choices[0].message.content
+        ai_analysis = _rag_chat_completion(enhanced_prompt, "matching_engine.get_rag_analysis", 1500,
+                                           {"cv_text": cv_text, "job_text": job_text, "knowledge_base": context})
         
         # 6. Sonuçları birleştir
         result = {
@@ -350,12 +927,11 @@ def get_rag_interview_questions(cv_text, job_text):
 
     try:
         # 1. Uzmanın beynini hazırla
-        embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-        vectordb = Chroma(persist_directory="./chroma_db", embedding_function=embeddings)
+        vectordb = load_vectorstore(get_embeddings())
 
         # 2. Mülakat konularıyla ilgili notları bul
         query = f"Mülakat soruları ve teknik sorular: {job_text[:200]}..."
-        relevant_docs = vectordb.similarity_search(query, k=2)
+        relevant_docs = retrieve_documents(vectordb, query, k=2, lexical_query=job_text)
         context = "\n\n".join(doc.page_content for doc in relevant_docs)
 
         # 3. Mülakat soruları prompt'u hazırla
@@ -391,13 +967,8 @@ def get_rag_interview_questions(cv_text, job_text):
         """
 
         # 4. Soruları üret
-        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        chat_completion = client.chat.completions.create(
-            messages=[{"role": "user", "content": enhanced_prompt}],
-            model="llama3-8b-8192"
-        )
-        
-        return chat_completion.choices[0].message.content
+        return _rag_chat_completion(enhanced_prompt, "matching_engine.get_rag_interview_questions", 1200,
+                                    {"cv_text": cv_text, "job_text": job_text, "knowledge_base": context})
         
     except Exception as e:
         print(f"❌ RAG Mülakat soruları hatası: {e}")
@@ -411,12 +982,11 @@ def get_rag_cv_improvements(cv_text, job_text):
 
     try:
         # 1. Uzmanın beynini hazırla
-        embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-        vectordb = Chroma(persist_directory="./chroma_db", embedding_function=embeddings)
+        vectordb = load_vectorstore(get_embeddings())
 
         # 2. CV iyileştirme konularıyla ilgili notları bul
         query = f"CV yazma ipuçları ve iyileştirme: {job_text[:200]}..."
-        relevant_docs = vectordb.similarity_search(query, k=2)
+        relevant_docs = retrieve_documents(vectordb, query, k=2, lexical_query=job_text)
         context = "\n\n".join(doc.page_content for doc in relevant_docs)
 
         # 3. CV iyileştirme prompt'u hazırla
@@ -458,14 +1028,12 @@ def get_rag_cv_improvements(cv_text, job_text):
         """
 
         # 4. Önerileri üret
-        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        chat_completion = client.chat.completions.create(
-            messages=[{"role": "user", "content": enhanced_prompt}],
-            model="llama3-8b-8192"
-        )
-        
-        return chat_completion.choices[0].message.content
+        return _rag_chat_completion(enhanced_prompt, "matching_engine.get_rag_cv_improvements", 1500,
+                                    {"cv_text": cv_text, "job_text": job_text, "knowledge_base": context})
         
     except Exception as e:
         print(f"❌ RAG CV iyileştirme hatası: {e}")
         return f"CV iyileştirme önerileri üretilirken bir hata oluştu: {str(e)}"
+
+if __name__ == '__main__':
+    build_vectorstore()
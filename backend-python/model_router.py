@@ -0,0 +1,204 @@
+"""
+8B / 70B modelleri arasında gecikmeye duyarlı yönlendirme
+
+Ajanlar tercih ettikleri modeli bildirir (analiz, öneri ve soru ajanları
+70B, RAG yolları 8B); her çağrıda kullanılacak model şunlara göre seçilir:
+
+    mode=fast     -> hızlı model (8B)
+    mode=quality  -> kaliteli model (70B)
+    mode=auto     -> tercih edilen model; tahmini süresi gecikme bütçesini
+                     (kalan deadline veya ROUTING_LATENCY_BUDGET_SECONDS) aşıyorsa hızlı model
+
+Tahmini süre, modelin gözlenen saniye / 1000 token hızının (üstel hareketli
+ortalama) giriş token sayısı + beklenen çıkış token sayısı ile çarpımıdır.
+Beklenen çıkış, aşamanın (stage) gözlenen completion token ortalamasıdır;
+gözlem yoksa max_tokens'ın COMPLETION_PRIOR_FRACTION kadarı kullanılır
+(max_tokens bir üst sınırdır, yanıtlar genelde çok daha kısadır). Seçilen
+modelin devresi açıksa ve diğer modelinki kapalıysa diğer model kullanılır.
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from circuit_breaker import get_circuit_breaker
+from deadlines import Deadline
+
+load_dotenv('config.env')
+
+FAST_MODEL = os.getenv("FAST_MODEL", "llama3-8b-8192")
+QUALITY_MODEL = os.getenv("QUALITY_MODEL", "llama3-70b-8192")
+MODEL_MODES = ("auto", "fast", "quality")
+# false ise ajanların kendi modeli her zaman kullanılır
+MODEL_ROUTING = os.getenv("MODEL_ROUTING", "1").lower() not in ("0", "false", "no")
+# Deadline yoksa auto modunda tek bir LLM çağrısı için gecikme bütçesi (saniye)
+ROUTING_LATENCY_BUDGET_SECONDS = float(os.getenv("ROUTING_LATENCY_BUDGET_SECONDS", "20"))
+# Gözlem olmadan kullanılan başlangıç hızları (saniye / 1000 token)
+MODEL_LATENCY_PRIORS = os.getenv("MODEL_LATENCY_PRIORS", f"{FAST_MODEL}=0.5,{QUALITY_MODEL}=2.0")
+# İstekte mode verilmediğinde endpoint varsayılanları, örn. "get_questions=fast"
+ENDPOINT_MODEL_MODES = os.getenv("ENDPOINT_MODEL_MODES", "")
+# Gözlem olmadan beklenen çıkış token'ı: max_tokens'ın bu oranı
+COMPLETION_PRIOR_FRACTION = float(os.getenv("COMPLETION_PRIOR_FRACTION", "0.5"))
+# Hız ve çıkış ortalamalarında yeni gözlemin ağırlığı
+LATENCY_EWMA_ALPHA = 0.2
+
+
+def _ewma(previous: Optional[float], value: float) -> float:
+    return value if previous is None else (1 - LATENCY_EWMA_ALPHA) * previous + LATENCY_EWMA_ALPHA * value
+
+
+def parse_model_settings(spec: str) -> Dict[str, str]:
+    """
+    "ad=değer,ad=değer" biçimindeki ayarları okur
+
+    Returns:
+        ad -> değer
+    """
+    settings = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            settings[name.strip()] = value.strip()
+    return settings
+
+
+_endpoint_modes = parse_model_settings(ENDPOINT_MODEL_MODES)
+
+
+def resolve_model_mode(endpoint: str, requested: Optional[str] = None) -> str:
+    """
+    İstekteki mode değerini veya endpoint varsayılanını döndürür
+
+    Args:
+        endpoint: Flask endpoint adı
+        requested: İstekteki mode alanı (auto/fast/quality, opsiyonel)
+
+    Returns:
+        MODEL_MODES'tan biri
+    """
+    mode = (requested or "").strip().lower()
+    if mode in MODEL_MODES:
+        return mode
+    if mode:
+        print(f"⚠️ Geçersiz model modu: {requested}, varsayılan kullanılıyor")
+    return _endpoint_modes.get(endpoint, "auto")
+
+
+class ModelRouter:
+    """Thread-safe model seçici; modellerin gözlenen hızını izler"""
+
+    def __init__(self, fast_model: str = FAST_MODEL, quality_model: str = QUALITY_MODEL,
+                 priors: Optional[Dict[str, float]] = None,
+                 latency_budget: float = ROUTING_LATENCY_BUDGET_SECONDS):
+        """
+        Args:
+            fast_model: Düşük gecikmeli model
+            quality_model: Yüksek kaliteli model
+            priors: model -> başlangıç hızı (saniye / 1000 token)
+            latency_budget: Deadline yoksa çağrı başına gecikme bütçesi
+        """
+        self.fast_model = fast_model
+        self.quality_model = quality_model
+        self.latency_budget = latency_budget
+        self._rates = dict(priors or {})
+        self._completions: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.routes: Dict[str, int] = {}
+
+    def estimate(self, model: str, tokens: int) -> float:
+        """Modelin verilen token sayısı için tahmini süresi (saniye)"""
+        with self._lock:
+            rate = self._rates.get(model)
+        if rate is None:
+            return 0.0
+        return rate * tokens / 1000
+
+    def expected_completion(self, stage: Optional[str], max_tokens: int) -> int:
+        """Aşamanın beklenen çıkış token sayısı (en fazla max_tokens)"""
+        with self._lock:
+            observed = self._completions.get(stage) if stage else None
+        if observed is None:
+            return int(max_tokens * COMPLETION_PRIOR_FRACTION)
+        return int(min(observed, max_tokens)) if max_tokens else int(observed)
+
+    def observe(self, model: str, elapsed: float, tokens: int, stage: Optional[str] = None,
+                completion_tokens: Optional[int] = None) -> None:
+        """
+        Başarılı bir çağrının süresini hız ortalamasına, çıkışını aşamanın çıkış ortalamasına ekler
+
+        Args:
+            model: Model adı
+            elapsed: Çağrı süresi (saniye)
+            tokens: Çağrının toplam token sayısı (giriş + çıkış)
+            stage: Aşama adı (opsiyonel)
+            completion_tokens: Yanıttaki çıkış token sayısı (opsiyonel)
+        """
+        with self._lock:
+            if stage and completion_tokens is not None:
+                self._completions[stage] = _ewma(self._completions.get(stage), completion_tokens)
+            if tokens > 0:
+                self._rates[model] = _ewma(self._rates.get(model), elapsed * 1000 / tokens)
+
+    def route(self, preferred: str, input_tokens: int, max_tokens: int, mode: Optional[str] = None,
+              deadline: Deadline = None, stage: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Çağrı için model seçer
+
+        Args:
+            preferred: Ajanın tercih ettiği model
+            input_tokens: Prompt token sayısı
+            max_tokens: Çıkış token sınırı
+            mode: auto / fast / quality (None ise auto)
+            deadline: İsteğin son tarihi (opsiyonel, auto modunda bütçe olarak kullanılır)
+            stage: Aşama adı (opsiyonel, beklenen çıkış token'ı için)
+
+        Returns:
+            (model, seçim nedeni)
+        """
+        if not MODEL_ROUTING or preferred not in (self.fast_model, self.quality_model):
+            return preferred, "fixed"
+
+        mode = mode or "auto"
+        if mode == "fast":
+            model, reason = self.fast_model, "mode"
+        elif mode == "quality":
+            model, reason = self.quality_model, "mode"
+        else:
+            model, reason = preferred, "preferred"
+            if model == self.quality_model:
+                budget = self.latency_budget
+                if deadline is not None:
+                    budget = min(budget, deadline.remaining())
+                tokens = input_tokens + self.expected_completion(stage, max_tokens)
+                estimated = self.estimate(model, tokens)
+                if estimated > budget and self.estimate(self.fast_model, tokens) < estimated:
+                    model, reason = self.fast_model, "latency"
+                    print(f"🔀 {self.quality_model} tahmini {estimated:.1f} sn > bütçe {budget:.1f} sn, "
+                          f"{self.fast_model} kullanılıyor")
+
+        # Seçilen modelin devresi açıksa diğer model denenir
+        other = self.fast_model if model == self.quality_model else self.quality_model
+        if get_circuit_breaker(model).is_open() and not get_circuit_breaker(other).is_open():
+            print(f"🔀 {model} devresi açık, {other} kullanılıyor")
+            model, reason = other, "circuit"
+
+        with self._lock:
+            route = f"{mode}:{model}:{reason}"
+            self.routes[route] = self.routes.get(route, 0) + 1
+        return model, reason
+
+    def stats(self) -> dict:
+        """Model hızları ve yönlendirme sayaçlarını döndürür"""
+        with self._lock:
+            return {
+                "enabled": MODEL_ROUTING,
+                "seconds_per_1k_tokens": {model: round(rate, 4) for model, rate in self._rates.items()},
+                "expected_completion_tokens": {stage: round(tokens, 1) for stage, tokens in self._completions.items()},
+                "routes": dict(self.routes),
+            }
+
+
+model_router = ModelRouter(priors={model: float(rate)
+                                   for model, rate in parse_model_settings(MODEL_LATENCY_PRIORS).items()})
@@ -0,0 +1,173 @@
+"""
+ONNX Runtime üzerinde int8 quantize edilmiş MiniLM embedding backend'i
+
+PyTorch tabanlı HuggingFaceEmbeddings CPU süresinin büyük kısmını harcar ve
+her worker'a büyük bir torch import'u ekler. Bu modül all-MiniLM-L6-v2'yi
+ONNX'e aktarır, ağırlıkları dinamik int8 quantization ile küçültür ve
+onnxruntime + tokenizers (Rust) ile çalıştırır; çalışma anında torch gerekmez.
+
+Kullanım:
+    python onnx_embeddings.py export [--output ./onnx_model]
+    EMBEDDING_BACKEND=onnx (config.env)
+"""
+
+import argparse
+import os
+import threading
+from typing import List, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv('config.env')
+
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "./onnx_model")
+ONNX_MODEL_FILE = os.getenv("ONNX_MODEL_FILE", "model_int8.onnx")
+ONNX_NUM_THREADS = int(os.getenv("ONNX_NUM_THREADS", "0"))
+ONNX_BATCH_SIZE = int(os.getenv("ONNX_BATCH_SIZE", "32"))
+# sentence-transformers all-MiniLM-L6-v2 ile aynı giriş uzunluğu sınırı
+MAX_SEQ_LENGTH = 256
+
+FP32_MODEL_FILE = "model.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+_INPUT_NAMES = ["input_ids", "attention_mask", "token_type_ids"]
+
+
+class OnnxEmbeddings:
+    """LangChain embedding arayüzüyle (embed_query / embed_documents) ONNX MiniLM modeli"""
+
+    def __init__(self, model_dir: str = ONNX_MODEL_DIR, model_file: str = ONNX_MODEL_FILE,
+                 num_threads: int = ONNX_NUM_THREADS, batch_size: int = ONNX_BATCH_SIZE):
+        """
+        Args:
+            model_dir: export_onnx_model çıktısının bulunduğu klasör
+            model_file: Kullanılacak model dosyası (int8 veya fp32)
+            num_threads: onnxruntime intra-op thread sayısı (0: varsayılan)
+            batch_size: embed_documents için batch boyutu
+        """
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        options = onnxruntime.SessionOptions()
+        if num_threads > 0:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, model_file), sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+        # tokenizers nesnesinin padding/truncation durumu thread'ler arasında paylaşılır
+        self._tokenizer_lock = threading.Lock()
+        self.batch_size = batch_size
+        self.model_file = model_file
+
+    @staticmethod
+    def exists(model_dir: str = ONNX_MODEL_DIR, model_file: str = ONNX_MODEL_FILE) -> bool:
+        """Klasörde kullanılabilir model ve tokenizer olup olmadığını kontrol eder"""
+        return (os.path.exists(os.path.join(model_dir, model_file))
+                and os.path.exists(os.path.join(model_dir, TOKENIZER_FILE)))
+
+    def _embed_batch(self, texts: List[str]) -> np.ndarray:
+        with self._tokenizer_lock:
+            encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.asarray([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.asarray([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        feeds = {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "token_type_ids": np.zeros_like(input_ids),
+        }
+        hidden = self.session.run(None, {name: value for name, value in feeds.items() if name in self._input_names})[0]
+
+        # Mean pooling (padding hariç) + L2 normalizasyon, sentence-transformers ile aynı
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+
+    def token_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Metindeki token'ların karakter aralıklarını modelin tokenizer'ıyla döndürür
+
+        Uzun metinler pencerelere bölünürken kullanılır; MAX_SEQ_LENGTH'te kesilmez.
+
+        Returns:
+            (başlangıç, bitiş) karakter indeksleri listesi
+        """
+        with self._tokenizer_lock:
+            self.tokenizer.no_truncation()
+            try:
+                encoding = self.tokenizer.encode(text or '', add_special_tokens=False)
+            finally:
+                self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        return [offset for offset in encoding.offsets if offset[1] > offset[0]]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Metinleri batch halinde embed eder"""
+        vectors = [self._embed_batch(texts[i:i + self.batch_size]) for i in range(0, len(texts), self.batch_size)]
+        return np.vstack(vectors).tolist() if vectors else []
+
+    def embed_query(self, text: str) -> List[float]:
+        """Tek bir sorgu metnini embed eder"""
+        return self._embed_batch([text])[0].tolist()
+
+
+def export_onnx_model(output_dir: str = ONNX_MODEL_DIR, quantize: bool = True) -> str:
+    """
+    MiniLM modelini ONNX'e aktarır ve (opsiyonel) dinamik int8 quantization uygular
+
+    Sadece export sırasında torch, transformers ve onnx gerekir.
+
+    Args:
+        output_dir: Model ve tokenizer dosyalarının yazılacağı klasör
+        quantize: int8 model de üretilsin mi
+
+    Returns:
+        Üretilen (quantize edildiyse int8) model dosyasının yolu
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+    from matching_engine import EMBEDDING_MODEL_NAME
+
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"📦 Model ONNX'e aktarılıyor: {EMBEDDING_MODEL_NAME}")
+    tokenizer = AutoTokenizer.from_pretrained(EMBEDDING_MODEL_NAME)
+    model = AutoModel.from_pretrained(EMBEDDING_MODEL_NAME).eval()
+    tokenizer.save_pretrained(output_dir)
+
+    dummy = tokenizer(["Python ve Django deneyimli backend geliştirici"], return_tensors="pt")
+    fp32_path = os.path.join(output_dir, FP32_MODEL_FILE)
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in _INPUT_NAMES + ["last_hidden_state"]}
+    with torch.no_grad():
+        torch.onnx.export(
+            model, tuple(dummy[name] for name in _INPUT_NAMES), fp32_path,
+            input_names=_INPUT_NAMES, output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes, opset_version=17
+        )
+    print(f"✅ fp32 model: {fp32_path} ({os.path.getsize(fp32_path) / 1024 / 1024:.1f} MB)")
+    if not quantize:
+        return fp32_path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    int8_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+    print(f"✅ int8 model: {int8_path} ({os.path.getsize(int8_path) / 1024 / 1024:.1f} MB)")
+    return int8_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MiniLM ONNX export aracı")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export = subparsers.add_parser("export", help="Modeli ONNX'e aktarıp int8 quantize eder")
+    export.add_argument("--output", default=ONNX_MODEL_DIR)
+    export.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_onnx_model(args.output, quantize=not args.no_quantize)
+
+
+if __name__ == '__main__':
+    main()
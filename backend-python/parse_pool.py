@@ -0,0 +1,295 @@
+"""
+Belge okuma (PDF/DOCX) için sınırlı, izole worker process havuzu
+
+Bozuk veya kötü niyetli bir PDF, PyPDF2'yi zaman sınırı olmadan %100 CPU'da
+döndürebilir ve okuma GIL'i tutarak diğer istekleri yavaşlatır. Bu modül
+okumayı ayrı process'lerde çalıştırır:
+
+- En fazla PARSE_WORKERS eşzamanlı iş (fazlası sırada bekler)
+- İş başına zaman sınırı: süre aşılırsa worker öldürülür ve yenisi açılır
+- Worker başına bellek sınırı (POSIX RLIMIT_AS, başlangıç kullanımının üzerine eklenen pay)
+- Her worker PARSE_MAX_JOBS_PER_WORKER işten sonra yenilenir
+
+Worker'lar multiprocessing'in spawn yöntemiyle değil, sadece utils'i import
+eden parse_worker modülüyle (`python -m parse_worker`) başlatılır; spawn
+çocukta ana modülü (app.py: matching_engine, torch ...) her açılışta yeniden
+import ederdi. Bağlantı multiprocessing.connection üzerinden, rastgele bir
+kimlik doğrulama anahtarıyla kurulur.
+
+Her worker kendi process grubunda (oturumunda) başlatılır; zaman sınırında
+grubun tamamı öldürülür, böylece paralel PDF okuma için fork edilen çocuklar
+worker öldükten sonra sahipsiz kalıp CPU harcamaya devam etmez.
+
+Bellek sınırı process başınadır: utils'in paralel PDF okuma worker'ları
+(PDF_WORKERS) parse worker'ından fork ile açılır ve aynı sınırı ayrı ayrı
+miras alır. Bir belgenin okunması bu nedenle toplamda en fazla
+(PDF_WORKERS + 1) x PARSE_MEMORY_LIMIT_MB ek bellek kullanabilir.
+
+Diske alınmış yüklemeler worker'a dosya yolu olarak, bellekteki yüklemeler
+pickle edilmeden doğrudan buffer olarak (send_bytes) gönderilir.
+"""
+
+import atexit
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Client
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv('config.env')
+
+PARSE_ISOLATION = os.getenv("PARSE_ISOLATION", "1").lower() not in ("0", "false", "no")
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "2"))
+PARSE_TIMEOUT_SECONDS = float(os.getenv("PARSE_TIMEOUT_SECONDS", "35"))
+PARSE_QUEUE_TIMEOUT_SECONDS = float(os.getenv("PARSE_QUEUE_TIMEOUT_SECONDS", "10"))
+PARSE_MEMORY_LIMIT_MB = int(os.getenv("PARSE_MEMORY_LIMIT_MB", "512"))
+PARSE_MAX_JOBS_PER_WORKER = int(os.getenv("PARSE_MAX_JOBS_PER_WORKER", "50"))
+PARSE_WORKER_START_TIMEOUT_SECONDS = float(os.getenv("PARSE_WORKER_START_TIMEOUT_SECONDS", "10"))
+
+# Worker'lar `python -m parse_worker` ile bu dizinde başlatılır (config.env ve utils buradan bulunur)
+_WORKER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class DocumentParseError(Exception):
+    """Belge okuma işi zaman/bellek sınırı nedeniyle sonlandırıldığında veya havuz dolu olduğunda"""
+
+
+def _send_job(conn, source, file_extension: str, max_chars: Optional[int]) -> None:
+    """İşi worker'a gönderir: dosya yolu olduğu gibi, içerik ise kopyasız buffer olarak"""
+    if isinstance(source, str):
+        conn.send(("path", source, file_extension, max_chars))
+        return
+
+    conn.send(("bytes", None, file_extension, max_chars))
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        conn.send_bytes(source)
+    elif callable(getattr(source, "getbuffer", None)):
+        # BytesIO veya onu saran HashingStream (getbuffer sarılan nesneye iletilir)
+        with source.getbuffer() as view:
+            conn.send_bytes(view)
+    else:
+        source.seek(0)
+        conn.send_bytes(source.read())
+
+
+def _worker_address() -> Tuple[str, Optional[str]]:
+    """Worker bağlantısı için adres ve (AF_UNIX ise) soketin geçici dizini; dizini bağlantıdan sonra worker siler"""
+    if sys.platform == "win32":
+        return rf"\\.\pipe\cv-parse-{os.getpid()}-{os.urandom(8).hex()}", None
+    directory = tempfile.mkdtemp(prefix="cv_parse_")
+    return os.path.join(directory, "worker.sock"), directory
+
+
+class _Worker:
+    """Tek bir parse worker process'i ve ona bağlı bağlantı"""
+
+    def __init__(self, memory_limit_mb: int):
+        address, directory = _worker_address()
+        authkey = os.urandom(32)
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "parse_worker", address, str(memory_limit_mb)],
+            stdin=subprocess.PIPE, cwd=_WORKER_DIR,
+            # POSIX: fork ile açılan paralel PDF worker'ları da aynı gruba girer
+            start_new_session=sys.platform != "win32"
+        )
+        self.jobs = 0
+        try:
+            self.process.stdin.write(authkey.hex().encode() + b"\n")
+            self.process.stdin.close()
+            self.conn = self._connect(address, authkey)
+        except BaseException:
+            self._kill_process_group()
+            self.process.wait()
+            if directory is not None:
+                shutil.rmtree(directory, ignore_errors=True)
+            raise
+
+    def _connect(self, address: str, authkey: bytes):
+        # Worker Listener'ı açana kadar bağlantı denenir; worker açılışta ölürse beklenmez
+        started = time.monotonic()
+        while True:
+            try:
+                return Client(address, authkey=authkey)
+            except (FileNotFoundError, ConnectionRefusedError):
+                if self.process.poll() is not None:
+                    raise DocumentParseError(f"Parse worker başlatılamadı (çıkış kodu {self.process.returncode})")
+                if time.monotonic() - started > PARSE_WORKER_START_TIMEOUT_SECONDS:
+                    raise DocumentParseError("Parse worker zamanında başlatılamadı")
+                time.sleep(0.02)
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _kill_process_group(self) -> None:
+        """Worker'ı ve (POSIX'te) fork ettiği paralel okuma process'lerini öldürür"""
+        if sys.platform == "win32":
+            self.process.kill()
+            return
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def kill(self) -> None:
+        try:
+            self._kill_process_group()
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+        finally:
+            self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+            self.process.wait(timeout=1)
+        except (OSError, EOFError, subprocess.TimeoutExpired):
+            self._kill_process_group()
+        self.conn.close()
+
+
+class ParseWorkerPool:
+    """Zaman sınırı, bellek sınırı ve worker yenileme destekli sınırlı process havuzu"""
+
+    def __init__(self, max_workers: int = PARSE_WORKERS, timeout: float = PARSE_TIMEOUT_SECONDS,
+                 memory_limit_mb: int = PARSE_MEMORY_LIMIT_MB,
+                 max_jobs_per_worker: int = PARSE_MAX_JOBS_PER_WORKER,
+                 queue_timeout: float = PARSE_QUEUE_TIMEOUT_SECONDS):
+        """
+        Args:
+            max_workers: Eşzamanlı en fazla iş / worker sayısı
+            timeout: İş başına saniye cinsinden zaman sınırı
+            memory_limit_mb: Worker başına, başlangıç kullanımına ek bellek sınırı (0: sınırsız)
+            max_jobs_per_worker: Worker yenilenmeden önce yapılacak iş sayısı
+            queue_timeout: Boş worker için en fazla bekleme süresi
+        """
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._idle: List[_Worker] = []
+        self._lock = threading.Lock()
+        self.killed_jobs = 0
+
+    def _count_killed(self) -> None:
+        with self._lock:
+            self.killed_jobs += 1
+
+    def _acquire_worker(self) -> _Worker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.is_alive():
+                    return worker
+                worker.kill()
+        return _Worker(self.memory_limit_mb)
+
+    def _release_worker(self, worker: _Worker) -> None:
+        if worker.jobs >= self.max_jobs_per_worker:
+            worker.stop()
+            return
+        with self._lock:
+            self._idle.append(worker)
+
+    def extract_text(self, source, file_extension: str,
+                     max_chars: Optional[int] = None, timeout: Optional[float] = None) -> Tuple[Optional[str], bool]:
+        """
+        utils.extract_text_from_file'ı izole bir worker'da çalıştırır
+
+        Args:
+            source: Dosya yolu, byte içeriği veya dosya nesnesi
+            file_extension: Dosya uzantısı (.pdf, .docx)
+            max_chars: Temizlenmiş metin için karakter bütçesi (opsiyonel)
+            timeout: Bu iş için sıra beklemesi dahil zaman sınırı (varsayılan: havuz zaman sınırı)
+
+        Returns:
+            (Çıkarılan metin veya None, metin kısaltıldı mı)
+
+        Raises:
+            DocumentParseError: İş sonlandırıldıysa veya havuz doluysa
+        """
+        timeout = self.timeout if timeout is None else timeout
+        # Sırada beklenen süre de işin (isteğin) zaman sınırından düşülür
+        queue_started = time.monotonic()
+        if not self._slots.acquire(timeout=min(self.queue_timeout, timeout)):
+            raise DocumentParseError("Belge okuma kuyruğu dolu, lütfen tekrar deneyin")
+
+        try:
+            timeout = max(0.0, timeout - (time.monotonic() - queue_started))
+            worker = self._acquire_worker()
+            started = time.perf_counter()
+            try:
+                _send_job(worker.conn, source, file_extension, max_chars)
+                if not worker.conn.poll(timeout):
+                    worker.kill()
+                    self._count_killed()
+                    raise DocumentParseError(
+                        f"Belge okuma zaman sınırını aştı ({timeout:.0f} sn) ve durduruldu"
+                    )
+                status, payload = worker.conn.recv()
+            except (EOFError, OSError):
+                worker.kill()
+                self._count_killed()
+                raise DocumentParseError("Belge okuma işlemi beklenmedik şekilde sonlandı (bellek sınırı aşılmış olabilir)")
+
+            worker.jobs += 1
+            self._release_worker(worker)
+            print(f"🧩 Parse worker: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+            if status != "ok":
+                raise DocumentParseError(f"Belge okunamadı: {payload}")
+            return payload
+        finally:
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        """Boştaki tüm worker'ları kapatır"""
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.stop()
+
+
+_pool: Optional[ParseWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ParseWorkerPool:
+    """Paylaşılan parse havuzunu döndürür (ilk kullanımda oluşturulur)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ParseWorkerPool()
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def parse_document(source, file_extension: str, max_chars: Optional[int] = None,
+                   timeout: Optional[float] = None) -> Tuple[Optional[str], bool]:
+    """
+    Belgeyi (yapılandırmaya göre izole havuzda) okur
+
+    Args:
+        source: Dosya yolu, byte içeriği veya dosya nesnesi (utils.DocumentSource)
+        file_extension: Dosya uzantısı (.pdf, .docx)
+        max_chars: Temizlenmiş metin için karakter bütçesi (opsiyonel)
+        timeout: Bu iş için zaman sınırı (varsayılan: PARSE_TIMEOUT_SECONDS; sadece izole modda)
+
+    Returns:
+        (Çıkarılan metin veya None, metin kısaltıldı mı)
+
+    Raises:
+        DocumentParseError: İş sonlandırıldıysa veya havuz doluysa
+    """
+    if not PARSE_ISOLATION:
+        from utils import extract_text_from_file
+        return extract_text_from_file(source, file_extension, max_chars)
+    return get_parse_pool().extract_text(source, file_extension, max_chars, timeout=timeout)
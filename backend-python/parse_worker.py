@@ -0,0 +1,86 @@
+"""
+Belge okuma worker process'inin giriş noktası
+
+parse_pool her worker'ı `python -m parse_worker <adres> <bellek_sınırı_mb>`
+ile ayrı bir yorumlayıcıda başlatır. multiprocessing'in spawn yöntemi
+çocukta ana modülü (app.py: matching_engine, torch ...) yeniden import
+ettiğinden kullanılmaz; bu modül sadece utils'i import eder, böylece
+worker açmak ve yenilemek ucuz kalır.
+
+Worker verilen adreste tek bağlantılık bir Listener açar, parent'ın
+bağlanmasını bekler (kimlik doğrulama anahtarı stdin'den okunur) ve
+işleri bu bağlantı üzerinden alır.
+"""
+
+import os
+import sys
+from multiprocessing.connection import Listener
+
+
+def _current_address_space() -> int:
+    """Process'in mevcut sanal bellek kullanımını byte olarak döndürür (Linux dışında 0)"""
+    try:
+        with open("/proc/self/statm", 'r') as file:
+            return int(file.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+def _apply_memory_limit(limit_mb: int) -> None:
+    """
+    Worker process'in adres alanını mevcut kullanım + limit_mb ile sınırlar (sadece POSIX)
+
+    Sınır process başınadır ve fork ile açılan çocuklara (utils'in paralel PDF
+    okuma worker'ları) aynen miras kalır; her çocuk ayrı ayrı aynı sınıra tabidir.
+    """
+    if limit_mb <= 0:
+        return
+    try:
+        import resource
+    except ImportError:
+        print("⚠️ Parse worker: bu platformda bellek sınırı desteklenmiyor")
+        return
+    limit = _current_address_space() + limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def worker_loop(conn, memory_limit_mb: int) -> None:
+    """Worker döngüsü: işleri bağlantıdan alıp sonucu geri gönderir"""
+    from utils import extract_text_from_file
+    _apply_memory_limit(memory_limit_mb)
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+
+        kind, source, file_extension, max_chars = job
+        try:
+            if kind == "bytes":
+                source = conn.recv_bytes()
+            conn.send(("ok", extract_text_from_file(source, file_extension, max_chars)))
+        except MemoryError:
+            conn.send(("error", f"bellek sınırı aşıldı ({memory_limit_mb} MB)"))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+def main() -> None:
+    address, memory_limit_mb = sys.argv[1], int(sys.argv[2])
+    authkey = bytes.fromhex(sys.stdin.readline().strip())
+    with Listener(address, authkey=authkey) as listener:
+        conn = listener.accept()
+    if sys.platform != "win32":
+        # Soket dosyası Listener kapanırken silindi; parent'ın açtığı geçici dizin de kaldırılır
+        try:
+            os.rmdir(os.path.dirname(address))
+        except OSError:
+            pass
+    with conn:
+        worker_loop(conn, memory_limit_mb)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+PDF metin çıkarma backend'leri
+
+Her backend aynı arayüzü sunar: `open(stream)` ile açılan belge
+`page_count` ve `iter_pages(start, stop)` sağlar. Böylece sayfa limiti,
+karakter bütçesi ve paralel okuma mantığı backend'den bağımsız kalır.
+
+Backend kütüphaneleri opsiyoneldir; kurulu olmayan backend atlanır.
+"""
+
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+
+class PdfBackend(ABC):
+    """PDF backend arayüzü"""
+
+    name = ""
+
+    @abstractmethod
+    def is_available(self) -> bool:
+        """Backend kütüphanesinin kurulu olup olmadığını kontrol eder"""
+
+    @abstractmethod
+    def open(self, stream: BinaryIO) -> "PdfDocumentHandle":
+        """
+        PDF'i açıp sayfa erişimi sağlayan nesneyi döndürür
+
+        Sayfalar tembel (lazy) okunabildiğinden stream, handle kullanıldığı
+        sürece açık kalmalıdır.
+        """
+
+
+class PdfDocumentHandle(ABC):
+    """Açılmış PDF belgesi"""
+
+    page_count = 0
+
+    @abstractmethod
+    def iter_pages(self, start: int, stop: int) -> Iterator[str]:
+        """[start, stop) aralığındaki sayfaların metnini sırayla üretir"""
+
+
+class _PyPDF2Handle(PdfDocumentHandle):
+    def __init__(self, stream: BinaryIO):
+        import PyPDF2
+        self.reader = PyPDF2.PdfReader(stream)
+        self.page_count = len(self.reader.pages)
+
+    def iter_pages(self, start: int, stop: int) -> Iterator[str]:
+        for i in range(start, stop):
+            yield self.reader.pages[i].extract_text() or ""
+
+
+class PyPDF2Backend(PdfBackend):
+    """PyPDF2 (saf Python, varsayılan)"""
+
+    name = "pypdf2"
+
+    def is_available(self) -> bool:
+        try:
+            import PyPDF2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def open(self, stream: BinaryIO) -> PdfDocumentHandle:
+        return _PyPDF2Handle(stream)
+
+
+class _PdfiumHandle(PdfDocumentHandle):
+    def __init__(self, stream: BinaryIO):
+        import pypdfium2
+        self.pdf = pypdfium2.PdfDocument(stream)
+        self.page_count = len(self.pdf)
+
+    def iter_pages(self, start: int, stop: int) -> Iterator[str]:
+        for i in range(start, stop):
+            page = self.pdf[i]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_range() or ""
+            finally:
+                textpage.close()
+                page.close()
+
+
+class PdfiumBackend(PdfBackend):
+    """pypdfium2 (PDFium, hızlı native okuyucu)"""
+
+    name = "pypdfium2"
+
+    def is_available(self) -> bool:
+        try:
+            import pypdfium2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def open(self, stream: BinaryIO) -> PdfDocumentHandle:
+        return _PdfiumHandle(stream)
+
+
+class _PdfminerHandle(PdfDocumentHandle):
+    def __init__(self, stream: BinaryIO):
+        from pdfminer.pdfpage import PDFPage
+        self.stream = stream
+        self.page_count = sum(1 for _ in PDFPage.get_pages(stream))
+
+    def iter_pages(self, start: int, stop: int) -> Iterator[str]:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LAParams, LTTextContainer
+
+        self.stream.seek(0)
+        for page_layout in extract_pages(self.stream,
+                                         page_numbers=range(start, stop), laparams=LAParams()):
+            yield "".join(element.get_text() for element in page_layout
+                          if isinstance(element, LTTextContainer))
+
+
+class PdfminerBackend(PdfBackend):
+    """pdfminer.six (yerleşim/layout analizi ile, yavaş ama sütunlu CV'lerde daha doğru)"""
+
+    name = "pdfminer"
+
+    def is_available(self) -> bool:
+        try:
+            import pdfminer  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def open(self, stream: BinaryIO) -> PdfDocumentHandle:
+        return _PdfminerHandle(stream)
+
+
+PDF_BACKENDS: Dict[str, PdfBackend] = {
+    backend.name: backend for backend in (PyPDF2Backend(), PdfiumBackend(), PdfminerBackend())
+}
+
+
+def get_pdf_backend(name: str) -> Optional[PdfBackend]:
+    """
+    İsme göre kurulu PDF backend'ini döndürür
+
+    Args:
+        name: Backend adı (pypdf2, pypdfium2, pdfminer)
+
+    Returns:
+        PdfBackend veya (bilinmiyor/kurulu değilse) None
+    """
+    backend = PDF_BACKENDS.get(name.strip().lower())
+    if backend is None or not backend.is_available():
+        return None
+    return backend
+
+
+def available_pdf_backends(names: List[str]) -> List[PdfBackend]:
+    """Verilen sıradaki backend'lerden kurulu olanları döndürür"""
+    backends = []
+    for name in names:
+        backend = get_pdf_backend(name)
+        if backend is None:
+            print(f"⚠️ PDF backend kullanılamıyor: {name}")
+            continue
+        backends.append(backend)
+    return backends
@@ -0,0 +1,83 @@
+"""
+Prompt token sayımı
+
+Karakter sayısı Türkçe metinlerde token sayısını iyi tahmin etmez; bu modül
+PROMPT_TOKENIZER ile belirtilen gerçek bir HuggingFace tokenizer'ı kullanır.
+Varsayılan, zaten yerelde bulunan MiniLM tokenizer'ıdır (WordPiece, Llama 3'e
+göre biraz fazla sayar, bütçe için güvenli taraftadır). Birebir sayım için
+Llama 3 uyumlu bir tokenizer deposu verilebilir.
+"""
+
+import os
+import re
+import threading
+from typing import List, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv('config.env')
+
+PROMPT_TOKENIZER = os.getenv("PROMPT_TOKENIZER", "sentence-transformers/all-MiniLM-L6-v2")
+
+_tokenizer = None
+_tokenizer_failed = False
+_tokenizer_lock = threading.Lock()
+_APPROX_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+def get_tokenizer():
+    """Paylaşılan tokenizer'ı döndürür (yüklenemezse None)"""
+    global _tokenizer, _tokenizer_failed
+    with _tokenizer_lock:
+        if _tokenizer is None and not _tokenizer_failed:
+            try:
+                from transformers import AutoTokenizer
+                _tokenizer = AutoTokenizer.from_pretrained(PROMPT_TOKENIZER)
+                # Sadece sayım yapılıyor; model giriş uzunluğu uyarısını kapat
+                _tokenizer.model_max_length = 10 ** 9
+                print(f"✅ Tokenizer yüklendi: {PROMPT_TOKENIZER}")
+            except Exception as e:
+                _tokenizer_failed = True
+                print(f"⚠️ Tokenizer yüklenemedi ({e}), yaklaşık sayım kullanılacak")
+        return _tokenizer
+
+
+def count_tokens_batch(texts: List[str]) -> List[int]:
+    """
+    Metinlerin token sayılarını toplu olarak hesaplar
+
+    Args:
+        texts: Metin listesi
+
+    Returns:
+        Giriş sırasıyla token sayıları
+    """
+    if not texts:
+        return []
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return [len(_APPROX_TOKEN_PATTERN.findall(text or '')) for text in texts]
+    encoded = tokenizer([text or '' for text in texts], add_special_tokens=False)["input_ids"]
+    return [len(ids) for ids in encoded]
+
+
+def count_tokens(text: str) -> int:
+    """Metnin token sayısını döndürür"""
+    return count_tokens_batch([text])[0]
+
+
+def token_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    Metindeki token'ların karakter aralıklarını döndürür
+
+    Uzun metinleri token sınırına göre pencerelere bölmek için kullanılır.
+
+    Returns:
+        (başlangıç, bitiş) karakter indeksleri listesi
+    """
+    text = text or ''
+    tokenizer = get_tokenizer()
+    if tokenizer is not None and getattr(tokenizer, "is_fast", False):
+        offsets = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)["offset_mapping"]
+        return [tuple(offset) for offset in offsets]
+    return [match.span() for match in _APPROX_TOKEN_PATTERN.finditer(text)]
@@ -0,0 +1,133 @@
+"""
+Birleşik CV raporu (analiz + öneriler + mülakat soruları) için sunucu tarafı önbellek
+
+Anahtar: (CV metni, iş ilanı, şirket, dil, model modu) özeti
+Değer: CVReportAgent.generate_report çıktısı
+
+Frontend aynı CV için analiz, öneri ve soru endpoint'lerini art arda veya
+aynı anda çağırır. Aynı anahtar için rapor bir kez üretilir. Eşzamanlı
+istekler üretimin bitmesini (en fazla kendi deadline'larına kadar) bekler ve
+aynı sonucu kullanır. Üretim başarısız olursa (None veya LLMUnavailableError)
+bekleyenler üretimi tek tek yeniden denemez; aynı sonucu veya hatayı alır.
+Üreten isteğe özgü hatalarda (ör. kendi kısa deadline'ı) süresi kalan
+bekleyen üretimi kendisi yeniden başlatır.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from circuit_breaker import LLMUnavailableError
+from deadlines import Deadline
+from single_flight import SingleFlight
+
+
+def report_key(cv_text: str, job_text: str, company_name: Optional[str], language: str,
+               mode: str = "auto") -> str:
+    """Rapor girdilerinden ve raporu üreten model modundan önbellek anahtarı üretir"""
+    digest = hashlib.sha256()
+    for part in (cv_text, job_text, company_name or "", language, mode):
+        digest.update((part or "").encode('utf-8'))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ReportCache:
+    """Thread-safe, TTL'li LRU rapor önbelleği (anahtar başına tek üretim)"""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600):
+        """
+        Args:
+            max_entries: Önbellekte tutulacak en fazla rapor sayısı
+            ttl_seconds: Raporun geçerlilik süresi
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Anahtar başına tek üretim; hata ve başarısız sonuç bekleyenlerle paylaşılır
+        self._flights = SingleFlight()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.generations = 0
+
+    def _get(self, key: str) -> Optional[Dict[str, str]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        report, stored_at = entry
+        if time.monotonic() - stored_at > self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return report
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        """Önbellekteki raporu döndürür; yoksa üretmeden None döner"""
+        with self._lock:
+            report = self._get(key)
+            if report is not None:
+                self.hits += 1
+            return report
+
+    def get_or_generate(self, key: str, generate: Callable[[], Optional[Dict[str, str]]],
+                        deadline: Deadline = None) -> Optional[Dict[str, str]]:
+        """
+        Önbellekteki raporu döndürür, yoksa üretip saklar
+
+        Args:
+            key: report_key ile üretilmiş anahtar
+            generate: Rapor üreten fonksiyon (başarısızlıkta None döndürür)
+            deadline: Başka bir isteğin üretimini beklerken uyulacak son tarih (opsiyonel)
+
+        Returns:
+            Rapor sözlüğü veya üretim başarısızsa None (başarısız sonuçlar saklanmaz)
+
+        Raises:
+            generate'in fırlattığı istisna (sadece LLMUnavailableError bekleyen isteklere de iletilir)
+            DeadlineExceeded: Üretim beklenirken süre dolarsa
+        """
+        with self._lock:
+            report = self._get(key)
+            if report is not None:
+                self.hits += 1
+                return report
+
+        def produce():
+            # Önceki üretim tam bu arada bitmiş olabilir
+            with self._lock:
+                report = self._get(key)
+                if report is not None:
+                    self.hits += 1
+                    return report
+                self.misses += 1
+            try:
+                report = generate()
+            finally:
+                with self._lock:
+                    self.generations += 1
+            if report is not None:
+                with self._lock:
+                    self._entries[key] = (report, time.monotonic())
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return report
+
+        report, _ = self._flights.do(key, produce, deadline,
+                                     share_error=lambda error: isinstance(error, LLMUnavailableError))
+        return report
+
+    def stats(self) -> dict:
+        """İsabet oranı ve üretim sayısını döndürür"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "generations": self.generations,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,106 @@
+"""
+RAG bağlamı için sorgu seviyesinde retrieval önbelleği
+
+Anahtar: (normalize edilmiş sorgu metni, k, retrieval modu, indeks versiyonu)
+Değer: sıralı chunk id'leri ve skorları
+
+Vektör deposu yeniden oluşturulduğunda indeks versiyonu değişir ve eski
+kayıtlar otomatik olarak geçersiz olur.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+RankedIds = List[Tuple[object, float]]
+
+
+def normalize_query(text: str) -> str:
+    """Sorgu metnini önbellek anahtarı için normalize eder (küçük harf, tek boşluk)"""
+    return re.sub(r'\s+', ' ', text or '').strip().lower()
+
+
+class RetrievalCache:
+    """Thread-safe LRU retrieval önbelleği"""
+
+    def __init__(self, max_entries: int = 1024):
+        """
+        Args:
+            max_entries: Önbellekte tutulacak en fazla sorgu sayısı
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[RankedIds, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    def _check_version(self, index_version: str) -> None:
+        # Yeni bir indeks versiyonu görüldüğünde eski kayıtları at
+        if index_version != self._version:
+            self._entries.clear()
+            self._version = index_version
+
+    def get_or_compute(self, query: str, k: int, index_version: str,
+                       compute: Callable[[], RankedIds], mode: str = "dense") -> RankedIds:
+        """
+        Önbellekte varsa sıralı id'leri döndürür, yoksa hesaplayıp saklar
+
+        Args:
+            query: Sorgu metni
+            k: Getirilecek chunk sayısı
+            index_version: Vektör deposunun versiyonu
+            compute: Önbellek ıskalamasında çağrılacak retrieval fonksiyonu
+            mode: Retrieval modu (dense/hybrid/prune)
+
+        Returns:
+            (chunk id, skor) listesi
+        """
+        key = (normalize_query(query), k, mode, index_version)
+
+        with self._lock:
+            self._check_version(index_version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += entry[1]
+                return entry[0]
+            self.misses += 1
+
+        started = time.perf_counter()
+        ranked = compute()
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            if index_version == self._version:
+                self._entries[key] = (ranked, elapsed)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        return ranked
+
+    def clear(self) -> None:
+        """Önbelleği ve sayaçları sıfırlar"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.saved_seconds = 0.0
+
+    def stats(self) -> dict:
+        """İsabet oranı ve kazanılan gecikme metriklerini döndürür"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "index_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "saved_latency_ms": round(self.saved_seconds * 1000, 1),
+            }
@@ -0,0 +1,123 @@
+"""
+Aynı girdili eşzamanlı isteklerin birleştirilmesi (single-flight)
+
+Tarayıcı yeniden denemeleri veya aynı adayı aynı anda açan bir ekip,
+byte byte aynı girdilerle birden fazla eşzamanlı istek üretir. Aynı anahtar
+için devam eden bir hesaplama varsa sonraki istekler yeni bir hesaplama
+başlatmaz; ilk hesaplamanın bitmesini bekleyip sonucunu (veya hatasını)
+paylaşır. Bekleyen istekler kendi deadline'ları dolunca beklemeyi bırakır.
+
+Hesaplamanın hatası sadece share_error kabul ederse paylaşılır. İlk isteğe
+özgü hatalar (ör. kendi kısa deadline'ı) bekleyenlere iletilmez; süresi
+kalan bekleyen hesaplamayı kendisi yeniden başlatır (veya o sırada başlamış
+yeni hesaplamayı bekler). Tamamlanan sonuçlar saklanmaz; bu bir önbellek değildir.
+"""
+
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from deadlines import Deadline, DeadlineExceeded
+
+
+def flight_key(*parts) -> str:
+    """Girdi parçalarından birleştirme anahtarı üretir"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part if part is not None else "").encode('utf-8')
+        digest.update(part)
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class _Flight:
+    """Devam eden tek bir hesaplama"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Aynı anahtarlı eşzamanlı çağrıları tek bir hesaplamada birleştiren thread-safe yardımcı"""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.shared = 0
+        self.timeouts = 0
+        self.retries = 0
+
+    def do(self, key: str, func: Callable[[], Any], deadline: Deadline = None,
+           share_error: Optional[Callable[[BaseException], bool]] = None) -> Tuple[Any, bool]:
+        """
+        Anahtar için devam eden hesaplama varsa onu bekler, yoksa func'ı çalıştırır
+
+        Args:
+            key: flight_key ile üretilmiş anahtar
+            func: Sonucu üreten fonksiyon
+            deadline: Bekleyen çağrının son tarihi (opsiyonel; yoksa hesaplama bitene kadar beklenir)
+            share_error: Hesaplamanın hatası bekleyenlere iletilsin mi (varsayılan: tüm hatalar iletilir);
+                iletilmeyen hatada bekleyen hesaplamayı yeniden dener
+
+        Returns:
+            (sonuç, sonuç başka bir istekten mi paylaşıldı)
+
+        Raises:
+            İlk hesaplamanın fırlattığı ve share_error'ın kabul ettiği istisna
+            DeadlineExceeded: Hesaplama bitmeden bekleyenin süresi dolarsa
+        """
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+                    self.executions += 1
+                else:
+                    self.shared += 1
+
+            if leader:
+                break
+
+            if not flight.done.wait(deadline.remaining() if deadline is not None else None):
+                with self._lock:
+                    self.timeouts += 1
+                raise DeadlineExceeded(f"İstek süresi aynı girdili hesaplama beklenirken doldu ({deadline.seconds:g} sn)")
+            if flight.error is None:
+                return flight.result, True
+            if share_error is None or share_error(flight.error):
+                raise flight.error
+            # Hata ilk isteğe özgü: süre kaldıysa hesaplama bu istek için yeniden denenir
+            if deadline is not None:
+                deadline.check("aynı girdili hesaplamanın yeniden denenmesi")
+            with self._lock:
+                self.retries += 1
+            print(f"🔁 Paylaşılmayan hata ({type(flight.error).__name__}), hesaplama yeniden deneniyor")
+
+        try:
+            flight.result = func()
+            return flight.result, False
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def stats(self) -> dict:
+        """Çalıştırılan ve paylaşılan hesaplama sayılarını döndürür"""
+        with self._lock:
+            total = self.executions + self.shared
+            return {
+                "in_flight": len(self._flights),
+                "executions": self.executions,
+                "shared": self.shared,
+                "timeouts": self.timeouts,
+                "retries": self.retries,
+                "shared_rate": round(self.shared / total, 4) if total else 0.0,
+            }
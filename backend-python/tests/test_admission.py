@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from admission import AdmissionController, ServerOverloadedError
+
+
+def _hold(controller, endpoint, started, release):
+    with controller.admit(endpoint):
+        started.set()
+        release.wait(5)
+
+
+def test_free_slot_admits_with_full_tier():
+    controller = AdmissionController(default_limit=1)
+
+    with controller.admit("analyze") as tier:
+        assert tier == "full"
+    assert controller.stats()["analyze"]["in_flight"] == 0
+
+
+def test_queue_full_rejects_with_503_and_retry_after():
+    controller = AdmissionController(default_limit=1, max_queue=0)
+    started, release = threading.Event(), threading.Event()
+    holder = threading.Thread(target=_hold, args=(controller, "analyze", started, release))
+    holder.start()
+    started.wait(5)
+    try:
+        with pytest.raises(ServerOverloadedError) as error:
+            controller.acquire("analyze")
+    finally:
+        release.set()
+        holder.join()
+
+    response = error.value.get_response()
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert controller.stats()["analyze"]["rejected"] == 1
+
+
+def test_queue_timeout_rejects_with_503():
+    controller = AdmissionController(default_limit=1, queue_timeout=0.1)
+    started, release = threading.Event(), threading.Event()
+    holder = threading.Thread(target=_hold, args=(controller, "analyze", started, release))
+    holder.start()
+    started.wait(5)
+    try:
+        begin = time.monotonic()
+        with pytest.raises(ServerOverloadedError) as error:
+            controller.acquire("analyze", timeout=5)
+        # İstenen süre queue_timeout'tan uzunsa queue_timeout kadar beklenir
+        assert time.monotonic() - begin < 2
+    finally:
+        release.set()
+        holder.join()
+
+    assert error.value.code == 503
+    assert error.value.retry_after >= 1
+    assert controller.stats()["analyze"]["queued"] == 0
+
+
+def test_tier_follows_queue_depth_at_admission():
+    controller = AdmissionController(tier_depths=(1, 3, 6))
+
+    assert [controller._tier(depth) for depth in (0, 1, 2, 3, 5, 6, 10)] == [
+        "full", "no_rag", "no_rag", "no_analyzer", "no_analyzer", "score_only", "score_only"
+    ]
+
+
+def test_queued_request_gets_degraded_tier():
+    controller = AdmissionController(default_limit=1, tier_depths=(1, 3, 6))
+    started, release = threading.Event(), threading.Event()
+    holder = threading.Thread(target=_hold, args=(controller, "analyze", started, release))
+    holder.start()
+    started.wait(5)
+    tiers = []
+    waiter = threading.Thread(target=lambda: tiers.append(controller.acquire("analyze")))
+    waiter.start()
+    time.sleep(0.05)
+    release.set()
+    holder.join()
+    waiter.join(5)
+    controller.release("analyze", 0.0)
+
+    assert tiers == ["no_rag"]
+    assert controller.stats()["analyze"]["tiers"]["no_rag"] == 1
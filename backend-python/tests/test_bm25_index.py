@@ -0,0 +1,74 @@
+import math
+
+import pytest
+
+from bm25_index import BM25Index, BM25IndexWriter, reciprocal_rank_fusion, tokenize
+
+
+def _index():
+    writer = BM25IndexWriter()
+    writer.add(["python", "java", "python-django", "tasarım"], [
+        "Python ile backend geliştirme",
+        "Java ve Spring ile backend",
+        "Python Django Python REST API",
+        "Figma ile arayüz tasarımı",
+    ])
+    return writer.build()
+
+
+def test_search_ranks_documents_containing_query_terms():
+    results = _index().search("python", k=10)
+
+    assert [chunk_id for chunk_id, _ in results] == ["python-django", "python"]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_search_limits_results_and_ignores_unknown_terms():
+    index = _index()
+
+    assert len(index.search("backend ile", k=2)) == 2
+    assert index.search("kotlin", k=5) == []
+    assert index.search("", k=5) == []
+
+
+def test_search_matches_turkish_dotted_capital_i():
+    writer = BM25IndexWriter()
+    writer.add(["a"], ["istanbul ofisi"])
+
+    assert [chunk_id for chunk_id, _ in writer.build().search("İSTANBUL")] == ["a"]
+    assert tokenize("İstanbul") == ["istanbul"]
+
+
+def test_search_score_matches_bm25_formula():
+    index = BM25Index(["a", "b"], {"python": [(0, 2)]}, doc_lengths=[4, 2], k1=1.5, b=0.75)
+    idf = math.log(1 + (2 - 1 + 0.5) / (1 + 0.5))
+    length_norm = 1 - 0.75 + 0.75 * 4 / 3
+
+    [(chunk_id, score)] = index.search("python")
+    assert chunk_id == "a"
+    assert score == pytest.approx(idf * 2 * 2.5 / (2 + 1.5 * length_norm))
+
+
+def test_persisted_index_gives_same_results(tmp_path):
+    index = _index()
+    index.persist(str(tmp_path))
+
+    assert BM25Index.load(str(tmp_path)).search("python backend") == index.search("python backend")
+    assert BM25Index.load(str(tmp_path / "yok")) is None
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    dense = [("a", 0.9), ("b", 0.8), ("c", 0.7)]
+    sparse = [("b", 12.0), ("d", 9.0), ("a", 3.0)]
+
+    fused = reciprocal_rank_fusion([dense, sparse], k=4, rrf_k=60)
+
+    assert [chunk_id for chunk_id, _ in fused] == ["b", "a", "d", "c"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+
+def test_reciprocal_rank_fusion_ignores_raw_scores_and_limits_k():
+    fused = reciprocal_rank_fusion([[("x", 1000.0), ("y", 0.001)]], k=1)
+
+    assert fused == [("x", pytest.approx(1 / 61))]
+    assert reciprocal_rank_fusion([], k=3) == []
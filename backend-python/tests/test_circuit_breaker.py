@@ -0,0 +1,90 @@
+import time
+
+import pytest
+
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def _open_breaker(open_seconds=0.05):
+    breaker = CircuitBreaker("model", window_seconds=60, min_calls=2, failure_rate=0.5,
+                             slow_call_seconds=10, open_seconds=open_seconds)
+    breaker.record(0.1, True)
+    breaker.record(0.1, True)
+    assert breaker.state == "open"
+    return breaker
+
+
+def test_failures_open_the_circuit_and_reject_calls():
+    breaker = _open_breaker(open_seconds=30)
+
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.before_call("test")
+    assert error.value.retry_after >= 1
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+
+    breaker.before_call("probe")
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("second")
+
+
+def test_successful_probe_closes_the_circuit():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+
+    probe = breaker.before_call("probe")
+    breaker.record(0.1, False, probe)
+
+    assert breaker.state == "closed"
+    breaker.before_call("next")
+
+
+def test_failed_or_slow_probe_reopens_the_circuit():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+    probe = breaker.before_call("probe")
+    breaker.record(0.1, True, probe)
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    probe = breaker.before_call("probe")
+    breaker.record(11, False, probe)
+    assert breaker.state == "open"
+    assert breaker.stats()["trips"] == 3
+
+
+def test_neutral_probe_releases_without_closing():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+    probe = breaker.before_call("probe")
+
+    breaker.release(probe)
+
+    assert breaker.state == "half_open"
+    assert breaker.before_call("next probe") is not None
+
+
+def test_older_call_finishing_during_half_open_does_not_change_state():
+    breaker = CircuitBreaker("model", window_seconds=60, min_calls=2, failure_rate=0.5,
+                             slow_call_seconds=10, open_seconds=0.05)
+    # Devre açılmadan önce başlamış, yavaşça süren çağrı
+    old_call = breaker.before_call("eski")
+    assert old_call is None
+    breaker.record(0.1, True)
+    breaker.record(0.1, True)
+    time.sleep(0.06)
+    probe = breaker.before_call("probe")
+
+    breaker.record(0.1, False, old_call)
+    assert breaker.state == "half_open"
+    breaker.release(old_call)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("ikinci deneme")
+
+    breaker.record(0.1, False, probe)
+    assert breaker.state == "closed"
@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+
+from circuit_breaker import LLMUnavailableError
+from deadlines import Deadline, DeadlineExceeded
+from report_cache import ReportCache, report_key
+
+
+def test_report_is_generated_once_and_cached():
+    cache = ReportCache()
+    key = report_key("cv", "ilan", None, "Türkçe")
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return {"analysis": "rapor"}
+
+    assert cache.get_or_generate(key, generate) == {"analysis": "rapor"}
+    assert cache.get_or_generate(key, generate) == {"analysis": "rapor"}
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_failed_generation_is_shared_and_not_cached():
+    cache = ReportCache()
+    key = report_key("cv", "ilan", None, "Türkçe")
+    calls = []
+    errors = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.1)
+        raise LLMUnavailableError("LLM hatası", model="model", stage="rapor")
+
+    def call():
+        try:
+            cache.get_or_generate(key, generate)
+        except LLMUnavailableError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert len(errors) == 4
+    assert cache.stats()["generations"] == 1
+    assert cache.get(key) is None
+
+    # Hata saklanmaz; sonraki istek yeniden üretir
+    assert cache.get_or_generate(key, lambda: {"analysis": "rapor"}) == {"analysis": "rapor"}
+
+
+def test_waiter_regenerates_after_generators_own_deadline():
+    cache = ReportCache()
+    key = report_key("cv", "ilan", None, "Türkçe")
+    generating = threading.Event()
+    calls = []
+    generator_errors = []
+
+    def slow_generate():
+        calls.append("ilk")
+        generating.set()
+        time.sleep(0.1)
+        raise DeadlineExceeded("ilk isteğin süresi doldu")
+
+    def first_request():
+        try:
+            cache.get_or_generate(key, slow_generate, Deadline(0.05))
+        except DeadlineExceeded as e:
+            generator_errors.append(e)
+
+    first = threading.Thread(target=first_request)
+    first.start()
+    generating.wait(5)
+
+    def generate():
+        calls.append("bekleyen")
+        return {"analysis": "rapor"}
+
+    assert cache.get_or_generate(key, generate, Deadline(5)) == {"analysis": "rapor"}
+    first.join()
+
+    assert len(generator_errors) == 1
+    assert calls == ["ilk", "bekleyen"]
+    assert cache.get(key) == {"analysis": "rapor"}
+
+
+def test_none_result_is_returned_but_not_cached():
+    cache = ReportCache()
+    key = report_key("cv", "ilan", "Şirket", "English")
+
+    assert cache.get_or_generate(key, lambda: None) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_expired_report_is_regenerated():
+    cache = ReportCache(ttl_seconds=0.05)
+    key = report_key("cv", "ilan", None, "Türkçe")
+    cache.get_or_generate(key, lambda: {"analysis": "eski"})
+    time.sleep(0.06)
+
+    assert cache.get_or_generate(key, lambda: {"analysis": "yeni"}) == {"analysis": "yeni"}
+
+
+def test_waiters_share_the_generators_result():
+    cache = ReportCache()
+    key = report_key("cv", "ilan", None, "Türkçe")
+    calls = []
+    results = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"analysis": "rapor"}
+
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_generate(key, generate)))
+               for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [{"analysis": "rapor"}] * 3
+
+
+@pytest.mark.parametrize("company", [None, ""])
+def test_missing_company_gives_the_same_key(company):
+    assert report_key("cv", "ilan", company, "Türkçe") == report_key("cv", "ilan", None, "Türkçe")
+
+
+def test_report_key_depends_on_model_mode():
+    assert report_key("cv", "ilan", None, "Türkçe", "quality") != report_key("cv", "ilan", None, "Türkçe", "auto")
+    assert report_key("cv", "ilan", None, "Türkçe") == report_key("cv", "ilan", None, "Türkçe", "auto")
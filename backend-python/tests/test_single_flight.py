@@ -0,0 +1,112 @@
+import threading
+import time
+
+import pytest
+
+from deadlines import Deadline, DeadlineExceeded
+from single_flight import SingleFlight
+
+
+def _run_concurrently(count, target):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return "sonuç"
+
+    _run_concurrently(4, lambda: results.append(flights.do("key", compute)))
+
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False, True, True, True]
+    assert {result for result, _ in results} == {"sonuç"}
+
+
+def test_error_is_shared_with_followers():
+    flights = SingleFlight()
+    calls = []
+    errors = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        raise ValueError("üretim hatası")
+
+    def call():
+        try:
+            flights.do("key", compute)
+        except ValueError as e:
+            errors.append(e)
+
+    _run_concurrently(4, call)
+
+    assert len(calls) == 1
+    assert len(errors) == 4
+    assert len({id(error) for error in errors}) == 1
+    assert flights.stats()["in_flight"] == 0
+
+
+def test_follower_stops_waiting_at_its_deadline():
+    flights = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=lambda: flights.do("key", lambda: release.wait(5)))
+    leader.start()
+    time.sleep(0.05)
+    try:
+        begin = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            flights.do("key", lambda: None, Deadline(0.1))
+        assert time.monotonic() - begin < 1
+    finally:
+        release.set()
+        leader.join()
+
+    assert flights.stats()["timeouts"] == 1
+
+
+def test_unshared_error_makes_follower_retry_as_leader():
+    flights = SingleFlight()
+    not_deadline = lambda e: not isinstance(e, DeadlineExceeded)  # noqa: E731
+    leader_started = threading.Event()
+    calls = []
+
+    def leader_compute():
+        calls.append("leader")
+        leader_started.set()
+        time.sleep(0.1)
+        raise DeadlineExceeded("liderin kendi süresi doldu")
+
+    leader_errors = []
+
+    def lead():
+        try:
+            flights.do("key", leader_compute, None, not_deadline)
+        except DeadlineExceeded as e:
+            leader_errors.append(e)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    leader_started.wait(5)
+
+    def follower_compute():
+        calls.append("follower")
+        return "sonuç"
+
+    result = flights.do("key", follower_compute, Deadline(5), not_deadline)
+    leader.join()
+
+    assert len(leader_errors) == 1
+    assert result == ("sonuç", False)
+    assert calls == ["leader", "follower"]
+    assert flights.stats()["retries"] == 1
+
@@ -0,0 +1,37 @@
+import pytest
+
+from translation import split_into_chunks
+
+
+def _join(chunks):
+    return "".join(chunk + separator for chunk, separator in chunks)
+
+
+@pytest.mark.parametrize("text", [
+    "Python geliştirici arıyoruz. Django bilgisi şart! Uzaktan çalışma mümkün mü?",
+    "Sorumluluklar:\n- API tasarımı\n- Kod incelemesi\n\nNitelikler:\n  5 yıl deneyim.",
+    "Tek cümlelik ve ayraçsız metin",
+    "Cümle sonu boşlukları.   Çoklu boşluk\tve sekme.",
+])
+def test_chunks_join_back_to_the_original_text(text):
+    chunks = split_into_chunks(text, max_chars=30)
+
+    assert _join(chunks) == text
+    assert all(len(chunk) <= 30 for chunk, _ in chunks)
+
+
+def test_long_sentence_is_split_on_words_and_long_word_on_characters():
+    text = "kelime " * 20 + "a" * 50
+    chunks = split_into_chunks(text, max_chars=16)
+
+    assert all(0 < len(chunk) <= 16 for chunk, _ in chunks)
+    assert _join(chunks) == text
+
+
+def test_short_text_is_a_single_chunk():
+    assert split_into_chunks("Kısa metin.", max_chars=100) == [("Kısa metin.", "")]
+
+
+@pytest.mark.parametrize("text", ["", None])
+def test_empty_text_gives_no_chunks(text):
+    assert split_into_chunks(text) == []
@@ -0,0 +1,67 @@
+import hashlib
+import io
+
+import pytest
+
+from parse_pool import _send_job
+from uploads import HashingStream, UploadTooLargeError
+
+
+class _RecordingConnection:
+    """_send_job'un gönderdiklerini kaydeden sahte bağlantı"""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+        self.messages = []
+        self.payloads = []
+
+    def send(self, message):
+        self.messages.append(message)
+
+    def send_bytes(self, payload):
+        if self.stream is not None:
+            # Buffer dışa açıkken BytesIO büyütülemez: gönderilen, kopyası değil kendisi
+            with pytest.raises(BufferError):
+                self.stream.write(b"x" * 1024)
+        self.payloads.append(payload)
+
+
+def test_hashing_stream_tracks_size_and_digest():
+    stream = HashingStream(io.BytesIO(), max_bytes=10)
+    stream.write(b"cv ")
+    stream.write(b"metni")
+
+    assert stream.size == 8
+    assert stream.sha256 == hashlib.sha256(b"cv metni").hexdigest()
+    stream.seek(0)
+    assert stream.read() == b"cv metni"
+
+
+def test_hashing_stream_accepts_exactly_max_bytes():
+    stream = HashingStream(io.BytesIO(), max_bytes=4)
+    stream.write(b"abcd")
+
+    assert stream.size == 4
+
+
+def test_hashing_stream_rejects_write_over_limit():
+    inner = io.BytesIO()
+    stream = HashingStream(inner, max_bytes=4)
+    stream.write(b"abc")
+
+    with pytest.raises(UploadTooLargeError) as error:
+        stream.write(b"de")
+    assert error.value.code == 413
+    # Sınırı aşan parça yazılmaz
+    assert inner.getvalue() == b"abc"
+
+
+def test_in_memory_upload_is_sent_without_copy():
+    inner = io.BytesIO(b"%PDF-1.4 cv")
+    conn = _RecordingConnection(stream=inner)
+
+    _send_job(conn, HashingStream(inner), ".pdf", 1000)
+
+    assert conn.messages == [("bytes", None, ".pdf", 1000)]
+    assert len(conn.payloads) == 1
+    assert isinstance(conn.payloads[0], memoryview)
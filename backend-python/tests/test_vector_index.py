@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from vector_index import compact_scores, dequantize_vectors, quantize_vectors
+
+
+def _normalized(rows, dim, seed=0):
+    matrix = np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def test_float32_is_stored_as_is():
+    matrix = _normalized(4, 8)
+    vectors, scales = quantize_vectors(matrix, "float32")
+
+    assert vectors.dtype == np.float32
+    assert scales is None
+    np.testing.assert_array_equal(vectors, matrix)
+
+
+@pytest.mark.parametrize("dtype, tolerance", [("float16", 1e-3), ("int8", 1e-2)])
+def test_quantized_vectors_round_trip_within_tolerance(dtype, tolerance):
+    matrix = _normalized(16, 32)
+    vectors, scales = quantize_vectors(matrix, dtype)
+
+    assert vectors.dtype == np.dtype(dtype)
+    assert (scales is not None) == (dtype == "int8")
+    np.testing.assert_allclose(dequantize_vectors(vectors, scales), matrix, atol=tolerance)
+
+
+def test_int8_zero_row_keeps_unit_scale():
+    matrix = np.zeros((2, 4), dtype=np.float32)
+    matrix[1] = [1, 0, 0, 0]
+    vectors, scales = quantize_vectors(matrix, "int8")
+
+    assert scales[0] == 1.0
+    assert not vectors[0].any()
+    assert vectors[1, 0] == 127
+
+
+def test_unknown_dtype_is_rejected():
+    with pytest.raises(ValueError):
+        quantize_vectors(_normalized(2, 4), "int4")
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16", "int8"])
+def test_compact_scores_match_float32_scores_across_blocks(dtype):
+    matrix = _normalized(10, 16)
+    query = _normalized(1, 16, seed=1)[0]
+    vectors, scales = quantize_vectors(matrix, dtype)
+
+    # Satır sayısından küçük blok: blok sınırları ve son kısmi blok da hesaplanır
+    scores = compact_scores(vectors, scales, query, block_rows=3)
+
+    assert scores.shape == (10,)
+    assert scores.dtype == np.float32
+    np.testing.assert_allclose(scores, matrix @ query, atol=2e-2)
+    assert list(np.argsort(-scores)[:3]) == list(np.argsort(-(matrix @ query))[:3])
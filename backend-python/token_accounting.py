@@ -0,0 +1,315 @@
+"""
+LLM çağrıları için token hesabı
+
+Her çağrıdan önce prompt token sayısı yerel tokenizer (prompt_tokens) ile
+hesaplanır ve max_tokens sabit bir değer yerine şunların en küçüğü olur:
+
+    - ajanın metod için belirlediği üst sınır (varsa)
+    - isteğin kalan çıkış bütçesi (endpoint başına, ENDPOINT_OUTPUT_BUDGETS)
+    - modelin bağlam penceresinde prompt'tan sonra kalan yer
+
+Prompt bağlam penceresine sığmıyorsa (en az MIN_OUTPUT_TOKENS çıkış için yer
+kalmıyorsa) talimatlara dokunulmadan prompt'a gömülü alanlar (CV, uzman
+bilgileri, iş ilanı) sırayla kısaltılır veya çağrı reddedilir
+(OVERSIZED_PROMPT_POLICY). CV bölüm farkındalıklı olarak iş ilanına göre
+sıkıştırılır (cv_compression), diğer alanların sonu kesilir. Reddedilen
+çağrı LLMUnavailableError gibi ele alınır: ilgili aşama atlanır, istek
+yerel skorla devam eder. Her isteğin prompt / completion token'ları
+endpoint bazında kapasite planlaması için toplanır.
+
+Yerel tokenizer modelin tokenizer'ı ile aynı olmadığından sayım
+PROMPT_TOKEN_MARGIN ile büyütülür; gerçek / tahmini oran metriklerde izlenir.
+"""
+
+import math
+import os
+import threading
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from circuit_breaker import LLMUnavailableError
+from prompt_tokens import count_tokens_batch, token_spans
+
+load_dotenv('config.env')
+
+
+def parse_token_limits(spec: str) -> Dict[str, int]:
+    """
+    "ad=sayı,ad=sayı" biçimindeki token sınırlarını okur
+
+    Returns:
+        ad -> token sayısı
+    """
+    limits = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            limits[name.strip()] = int(value)
+    return limits
+
+
+# Modellerin bağlam penceresi (prompt + çıkış)
+MODEL_CONTEXT_TOKENS = parse_token_limits(os.getenv("MODEL_CONTEXT_TOKENS",
+                                                    "llama3-8b-8192=8192,llama3-70b-8192=8192"))
+DEFAULT_CONTEXT_TOKENS = int(os.getenv("DEFAULT_CONTEXT_TOKENS", "8192"))
+# İstek başına toplam çıkış token bütçesi (tüm LLM çağrıları)
+ENDPOINT_OUTPUT_BUDGETS = parse_token_limits(os.getenv("ENDPOINT_OUTPUT_BUDGETS", "analyze=8000"))
+DEFAULT_OUTPUT_BUDGET = int(os.getenv("DEFAULT_OUTPUT_BUDGET", "6000"))
+# Bu kadar çıkış için yer kalmıyorsa prompt sığmıyor sayılır
+MIN_OUTPUT_TOKENS = int(os.getenv("MIN_OUTPUT_TOKENS", "256"))
+# Yerel tokenizer ile model tokenizer'ı arasındaki fark için pay
+PROMPT_TOKEN_MARGIN = float(os.getenv("PROMPT_TOKEN_MARGIN", "1.1"))
+# Sohbet şablonunun mesaj başına eklediği token'lar
+MESSAGE_OVERHEAD_TOKENS = 8
+# compress: prompt alanları kısaltılır, reject: LLM çağrısı yapılmaz (aşama atlanır)
+OVERSIZED_PROMPT_POLICY = os.getenv("OVERSIZED_PROMPT_POLICY", "compress").lower()
+# Alanların kısaltılma sırası; listede olmayan alanlar en son kısaltılır
+PROMPT_FIELD_PRIORITY = ("cv_text", "knowledge_base", "job_text")
+# Kısaltılan bir alanda en az bırakılacak token
+MIN_FIELD_TOKENS = 64
+TRUNCATION_MARKER = "\n[...]"
+
+
+class PromptTooLargeError(LLMUnavailableError):
+    """Prompt modelin bağlam penceresine sığmadığında (aşama atlanır, istek yerel skorla devam eder)"""
+
+
+class RequestTokens:
+    """Tek bir isteğin LLM token kullanımı"""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.output_budget = ENDPOINT_OUTPUT_BUDGETS.get(endpoint, DEFAULT_OUTPUT_BUDGET)
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.estimated_prompt_tokens = 0
+        self.compressed_prompts = 0
+
+    def remaining_output(self) -> int:
+        return max(0, self.output_budget - self.completion_tokens)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "output_budget": self.output_budget,
+        }
+
+
+_current_request = ContextVar("request_tokens", default=None)
+
+
+def start_request(endpoint: str):
+    """İstek için token hesabını başlatır; finish_request'e verilecek jetonu döndürür"""
+    return _current_request.set(RequestTokens(endpoint))
+
+
+def current_request() -> Optional[RequestTokens]:
+    """Devam eden isteğin token hesabı (istek dışında None)"""
+    return _current_request.get()
+
+
+def finish_request(token) -> Optional[RequestTokens]:
+    """İsteğin token hesabını kapatır, toplamlara ekler ve döndürür"""
+    account = _current_request.get()
+    _current_request.reset(token)
+    if account is not None:
+        token_ledger.record(account)
+        print(f"🧮 Token kullanımı ({account.endpoint}): prompt {account.prompt_tokens}, "
+              f"completion {account.completion_tokens}, {account.calls} çağrı")
+    return account
+
+
+def estimate_prompt_tokens(messages: List[dict]) -> int:
+    """Mesajların modelde tutacağı tahmini token sayısı (pay dahil)"""
+    counts = count_tokens_batch([message["content"] for message in messages])
+    return math.ceil(sum(counts) * PROMPT_TOKEN_MARGIN) + MESSAGE_OVERHEAD_TOKENS * len(messages)
+
+
+def context_tokens(model: str) -> int:
+    return MODEL_CONTEXT_TOKENS.get(model, DEFAULT_CONTEXT_TOKENS)
+
+
+def _truncate_tail(text: str, keep_tokens: int) -> str:
+    # Alanın başı korunur (ilan ve belgelerde gereksinimler / başlıklar genelde baştadır)
+    spans = token_spans(text)
+    if len(spans) <= keep_tokens:
+        return text
+    return text[:spans[keep_tokens - 1][1]] + TRUNCATION_MARKER
+
+
+def _shrink_field(name: str, text: str, keep_tokens: int, fields: Dict[str, str]) -> str:
+    """Alanı keep_tokens'a indirir: CV iş ilanına göre sıkıştırılır, diğer alanların sonu kesilir"""
+    job_text = fields.get("job_text")
+    if name == "cv_text" and job_text:
+        try:
+            from cv_compression import compress_cv
+            return compress_cv(text, job_text, token_budget=keep_tokens)[0]
+        except Exception as e:
+            print(f"⚠️ CV sıkıştırılamadı, sonu kesiliyor: {e}")
+    return _truncate_tail(text, keep_tokens)
+
+
+def fit_prompt(messages: List[dict], prompt_tokens: int, model: str, stage: str,
+               output_tokens: Optional[int] = None,
+               fields: Optional[Dict[str, str]] = None) -> Tuple[List[dict], int]:
+    """
+    Prompt'u modelin bağlam penceresine sığdırır
+
+    Talimatlar kısaltılmaz; sadece fields ile bildirilen ve mesajlarda aynen
+    geçen alanlar PROMPT_FIELD_PRIORITY sırasıyla, her biri en az
+    MIN_FIELD_TOKENS kalacak şekilde kısaltılır.
+
+    Args:
+        messages: Sohbet mesajları
+        prompt_tokens: estimate_prompt_tokens sonucu
+        model: Model adı
+        stage: Log ve hata mesajı için aşama adı
+        output_tokens: Kısaltırken çıkış için bırakılacak yer (varsayılan: isteğin kalan çıkış bütçesi;
+            en fazla bağlamın dörtte biri)
+        fields: Prompt'a gömülü değişken alanlar, ad -> metin (cv_text, job_text, knowledge_base ...)
+
+    Returns:
+        (mesajlar, tahmini prompt token sayısı); sığıyorsa değişmeden döner
+
+    Raises:
+        PromptTooLargeError: Politika reject ise veya alanları kısaltmak yetmezse
+    """
+    limit = context_tokens(model) - MIN_OUTPUT_TOKENS
+    if prompt_tokens <= limit:
+        return messages, prompt_tokens
+
+    too_large = PromptTooLargeError(f"Girdi çok uzun: ~{prompt_tokens} token, {model} için en fazla {limit}",
+                                    model=model, stage=stage)
+    if OVERSIZED_PROMPT_POLICY != "compress" or not fields:
+        raise too_large
+
+    account = current_request()
+    if output_tokens is None and account is not None:
+        output_tokens = account.remaining_output()
+    # Kısaltılan prompt'ta çıkış için sadece MIN_OUTPUT_TOKENS değil, istenen kadar yer bırakılır
+    reserve = min(output_tokens or MIN_OUTPUT_TOKENS, context_tokens(model) // 4)
+    target = context_tokens(model) - max(MIN_OUTPUT_TOKENS, reserve)
+
+    def field_order(name: str) -> int:
+        return PROMPT_FIELD_PRIORITY.index(name) if name in PROMPT_FIELD_PRIORITY else len(PROMPT_FIELD_PRIORITY)
+
+    messages = [dict(message) for message in messages]
+    fitted_tokens = prompt_tokens
+    for name in sorted(fields, key=field_order):
+        text = fields[name]
+        if not text or not any(text in message["content"] for message in messages):
+            continue
+        # Fazlalık yerel tokenizer birimine çevrilir; işaret için birkaç token pay bırakılır
+        excess = math.ceil((fitted_tokens - target) / PROMPT_TOKEN_MARGIN) + 8
+        keep = max(MIN_FIELD_TOKENS, count_tokens_batch([text])[0] - excess)
+        shortened = _shrink_field(name, text, keep, fields)
+        if shortened == text:
+            continue
+        for message in messages:
+            message["content"] = message["content"].replace(text, shortened, 1)
+        fitted_tokens = estimate_prompt_tokens(messages)
+        print(f"✂️ Prompt alanı kısaltıldı ({stage}, {name}): ~{prompt_tokens} -> ~{fitted_tokens} token")
+        if fitted_tokens <= target:
+            break
+
+    if fitted_tokens == prompt_tokens:
+        raise too_large
+    if account is not None:
+        account.compressed_prompts += 1
+    if fitted_tokens > limit:
+        raise too_large
+    return messages, fitted_tokens
+
+
+def plan_max_tokens(model: str, prompt_tokens: int, requested: Optional[int] = None) -> int:
+    """
+    Çağrının max_tokens değerini belirler
+
+    Args:
+        model: Model adı
+        prompt_tokens: Tahmini prompt token sayısı
+        requested: Ajanın metod için belirlediği üst sınır (opsiyonel)
+
+    Returns:
+        En az MIN_OUTPUT_TOKENS, en fazla bağlamda kalan yer kadar max_tokens
+    """
+    available = max(MIN_OUTPUT_TOKENS, context_tokens(model) - prompt_tokens)
+    limits = [available]
+    if requested:
+        limits.append(requested)
+    account = current_request()
+    if account is not None:
+        # Bütçe tükense de çağrı en az MIN_OUTPUT_TOKENS ile yapılır
+        limits.append(max(MIN_OUTPUT_TOKENS, account.remaining_output()))
+    return min(limits)
+
+
+def record_usage(prompt_tokens: int, usage) -> None:
+    """
+    Tamamlanan çağrının token kullanımını isteğin hesabına ekler
+
+    Args:
+        prompt_tokens: Çağrıdan önceki tahmini prompt token sayısı
+        usage: Groq yanıtındaki usage nesnesi (yoksa tahmin kullanılır)
+    """
+    account = current_request()
+    if account is None:
+        return
+    account.calls += 1
+    account.estimated_prompt_tokens += prompt_tokens
+    account.prompt_tokens += getattr(usage, "prompt_tokens", None) or prompt_tokens
+    account.completion_tokens += getattr(usage, "completion_tokens", None) or 0
+
+
+class TokenLedger:
+    """Endpoint bazında toplam token kullanımı (thread-safe)"""
+
+    def __init__(self):
+        self._endpoints: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, account: RequestTokens) -> None:
+        with self._lock:
+            totals = self._endpoints.setdefault(account.endpoint, {
+                "requests": 0,
+                "requests_without_calls": 0,
+                "calls": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "estimated_prompt_tokens": 0,
+                "compressed_prompts": 0,
+                "max_request_tokens": 0,
+            })
+            totals["requests"] += 1
+            # LLM aşamaları atlanan (yük, devre, önbellek) istekler de kapasite planına dahildir
+            if not account.calls:
+                totals["requests_without_calls"] += 1
+            totals["calls"] += account.calls
+            totals["prompt_tokens"] += account.prompt_tokens
+            totals["completion_tokens"] += account.completion_tokens
+            totals["estimated_prompt_tokens"] += account.estimated_prompt_tokens
+            totals["compressed_prompts"] += account.compressed_prompts
+            totals["max_request_tokens"] = max(totals["max_request_tokens"],
+                                               account.prompt_tokens + account.completion_tokens)
+
+    def stats(self) -> Dict[str, dict]:
+        """Endpoint başına toplamlar, istek başına ortalamalar ve gerçek / tahmini prompt oranı"""
+        with self._lock:
+            stats = {}
+            for endpoint, totals in self._endpoints.items():
+                requests = totals["requests"]
+                stats[endpoint] = {
+                    **totals,
+                    "avg_prompt_tokens": round(totals["prompt_tokens"] / requests, 1),
+                    "avg_completion_tokens": round(totals["completion_tokens"] / requests, 1),
+                    "prompt_estimate_ratio": round(totals["prompt_tokens"] / totals["estimated_prompt_tokens"], 4)
+                    if totals["estimated_prompt_tokens"] else None,
+                }
+            return stats
+
+
+token_ledger = TokenLedger()
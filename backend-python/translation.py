@@ -0,0 +1,258 @@
+"""
+Önbellekli ve parçalı (chunked) paralel çeviri katmanı
+
+- Uzun metinler cümle sınırlarından TRANSLATION_CHUNK_CHARS karakterlik
+  parçalara bölünür (sağlayıcının uzunluk sınırı aşılmaz)
+- Parçalar eşzamanlı çevrilir ve orijinal sırayla birleştirilir
+- Her parçanın çevirisi (metin özeti, kaynak dil, hedef dil) anahtarıyla
+  SQLite üzerinde kalıcı olarak saklanır; aynı ilan tekrar işlendiğinde
+  ağ isteği yapılmaz
+- TRANSLATION_BACKEND=local ile ağ gerektirmeyen yerel bir çevirmen
+  kullanılır (offline test ve benchmark için)
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv('config.env')
+
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "google").lower()
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH", "./translation_cache.db")
+# GoogleTranslator istek başına 5000 karakteri kabul eder
+TRANSLATION_CHUNK_CHARS = int(os.getenv("TRANSLATION_CHUNK_CHARS", "4500"))
+TRANSLATION_WORKERS = int(os.getenv("TRANSLATION_WORKERS", "4"))
+
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…])[ \t]+|\s*\n\s*')
+
+
+def _split_pieces(text: str, max_chars: int) -> List[Tuple[str, str]]:
+    """Metni (cümle, ardından gelen ayraç) çiftlerine böler; sınırı aşan cümleleri kelimelere ayırır"""
+    pieces = []
+    position = 0
+    boundaries = list(_SENTENCE_BOUNDARY.finditer(text)) + [None]
+    for match in boundaries:
+        end = match.start() if match else len(text)
+        sentence, separator = text[position:end], (match.group() if match else "")
+        position = match.end() if match else len(text)
+        if not sentence.strip():
+            if pieces and separator:
+                pieces[-1] = (pieces[-1][0], pieces[-1][1] + separator)
+            continue
+        if len(sentence) <= max_chars:
+            pieces.append((sentence, separator))
+            continue
+        words = sentence.split()
+        for i, word in enumerate(words):
+            parts = [word[j:j + max_chars] for j in range(0, len(word), max_chars)]
+            for k, part in enumerate(parts):
+                last = i == len(words) - 1 and k == len(parts) - 1
+                pieces.append((part, separator if last else ("" if k < len(parts) - 1 else " ")))
+    return pieces
+
+
+def split_into_chunks(text: str, max_chars: int = TRANSLATION_CHUNK_CHARS) -> List[Tuple[str, str]]:
+    """
+    Metni cümle sınırlarından en fazla max_chars karakterlik parçalara böler
+
+    Tek başına sınırı aşan cümleler kelime sınırlarından, tek başına sınırı
+    aşan kelimeler ise karakter bazında bölünür. Parçalar arasındaki ayraçlar
+    (boşluk / satır sonu) korunur, böylece çeviriler aynı düzende birleştirilir.
+
+    Args:
+        text: Bölünecek metin
+        max_chars: Parça başına en fazla karakter
+
+    Returns:
+        Sırayı koruyan (parça, parçadan sonra gelen ayraç) listesi
+    """
+    chunks = []
+    current, current_separator = "", ""
+    for piece, separator in _split_pieces(text or '', max_chars):
+        if current and len(current) + len(current_separator) + len(piece) > max_chars:
+            chunks.append((current, current_separator))
+            current = piece
+        else:
+            current = current + current_separator + piece
+        current_separator = separator
+    if current:
+        chunks.append((current, current_separator))
+    return chunks
+
+
+class GoogleTranslatorBackend:
+    """deep_translator.GoogleTranslator (thread başına tek örnek)"""
+
+    name = "google"
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        from deep_translator import GoogleTranslator
+
+        # GoogleTranslator istek parametrelerini örnek üzerinde tuttuğundan thread'ler arasında paylaşılmaz
+        translators = getattr(self._local, "translators", None)
+        if translators is None:
+            translators = self._local.translators = {}
+        translator = translators.get((source, target))
+        if translator is None:
+            translator = translators[(source, target)] = GoogleTranslator(source=source, target=target)
+        return translator.translate(text)
+
+
+class LocalTranslatorBackend:
+    """Ağ gerektirmeyen yerel çevirmen: metni hedef dil etiketiyle işaretler"""
+
+    name = "local"
+
+    def __init__(self, latency_seconds: float = 0.0):
+        """
+        Args:
+            latency_seconds: Her istek için taklit edilecek ağ gecikmesi
+        """
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def translate(self, text: str, source: str, target: str) -> str:
+        with self._lock:
+            self.calls += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return f"[{target}] {text}"
+
+
+class TranslationCache:
+    """(metin özeti, kaynak dil, hedef dil) anahtarlı kalıcı SQLite çeviri önbelleği"""
+
+    def __init__(self, path: str = TRANSLATION_CACHE_PATH):
+        """
+        Args:
+            path: SQLite dosya yolu (":memory:" ile sadece bellekte)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "text_hash TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL, "
+            "translated TEXT NOT NULL, created_at REAL NOT NULL, "
+            "PRIMARY KEY (text_hash, source, target))"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, text: str, source: str, target: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translated FROM translations WHERE text_hash = ? AND source = ? AND target = ?",
+                (self.text_hash(text), source, target)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, text: str, source: str, target: str, translated: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+                (self.text_hash(text), source, target, translated, time.time())
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+class TranslationService:
+    """Parçalı, paralel ve önbellekli çeviri servisi"""
+
+    def __init__(self, backend=None, cache: Optional[TranslationCache] = None,
+                 chunk_chars: int = TRANSLATION_CHUNK_CHARS, workers: int = TRANSLATION_WORKERS):
+        """
+        Args:
+            backend: translate(text, source, target) sunan çevirmen (varsayılan: TRANSLATION_BACKEND)
+            cache: Çeviri önbelleği (varsayılan: TRANSLATION_CACHE_PATH)
+            chunk_chars: Parça başına en fazla karakter
+            workers: Eşzamanlı çevrilecek en fazla parça sayısı
+        """
+        if backend is None:
+            backend = LocalTranslatorBackend() if TRANSLATION_BACKEND == "local" else GoogleTranslatorBackend()
+        self.backend = backend
+        self.cache = cache if cache is not None else TranslationCache()
+        self.chunk_chars = chunk_chars
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="translate")
+
+    def _translate_chunk(self, chunk: str, source: str, target: str) -> str:
+        cached = self.cache.get(chunk, source, target)
+        if cached is not None:
+            return cached
+        translated = self.backend.translate(chunk, source, target)
+        if translated is None:
+            raise RuntimeError("Çevirmen boş sonuç döndürdü")
+        self.cache.put(chunk, source, target, translated)
+        return translated
+
+    def translate(self, text: str, target: str, source: str = 'auto') -> str:
+        """
+        Metni hedef dile çevirir
+
+        Args:
+            text: Çevrilecek metin
+            target: Hedef dil kodu
+            source: Kaynak dil kodu (varsayılan: otomatik algılama)
+
+        Returns:
+            Çevrilmiş metin (parçalar orijinal sırayla birleştirilir)
+        """
+        chunks = split_into_chunks(text, self.chunk_chars)
+        if not chunks:
+            return text
+        if len(chunks) == 1:
+            return self._translate_chunk(chunks[0][0], source, target)
+
+        started = time.perf_counter()
+        translated = self._executor.map(lambda chunk: self._translate_chunk(chunk[0], source, target), chunks)
+        result = "".join(part + separator for part, (_, separator) in zip(translated, chunks)).strip()
+        print(f"🔄 {len(chunks)} parça paralel çevrildi: {(time.perf_counter() - started) * 1000:.1f} ms")
+        return result
+
+    def stats(self) -> dict:
+        """Çeviri önbelleği metriklerini döndürür"""
+        return {"backend": self.backend.name, **self.cache.stats()}
+
+
+_service: Optional[TranslationService] = None
+_service_lock = threading.Lock()
+
+
+def get_translation_service() -> TranslationService:
+    """Paylaşılan çeviri servisini döndürür (ilk kullanımda oluşturulur)"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TranslationService()
+        return _service
@@ -0,0 +1,199 @@
+"""
+CV dosyası yüklemeleri için akış (streaming) tabanlı işleme
+
+- İstek gövdesi MAX_UPLOAD_MB sınırını aşarsa okunmadan 413 ile reddedilir
+- UPLOAD_SPOOL_THRESHOLD_KB üzerindeki dosyalar bellekte tutulmak yerine
+  adlandırılmış geçici dosyaya yazılır; parse worker'larına sadece yolu gönderilir
+- SHA-256 özeti ve boyut, dosya bellek/diske yazılırken artımlı hesaplanır ve
+  dosya sınırı aynı yazma sırasında uygulanır; içerik tabanlı önbellekler için
+  ayrıca okuma gerekmez
+- Çıkarıcılara (utils) içerik kopyalanmadan dosya nesnesi veya yol olarak verilir
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+from typing import BinaryIO, List, Optional, Union
+
+from dotenv import load_dotenv
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+load_dotenv('config.env')
+
+MAX_UPLOAD_MB = float(os.getenv("MAX_UPLOAD_MB", "10"))
+MAX_UPLOAD_BYTES = int(MAX_UPLOAD_MB * 1024 * 1024)
+# Form alanları (iş ilanı vb.) için dosya sınırının üzerine eklenen pay
+MAX_FORM_OVERHEAD_BYTES = 1024 * 1024
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD_KB", "512")) * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLargeError(RequestEntityTooLarge):
+    """Yüklenen dosya MAX_UPLOAD_MB sınırını aştığında"""
+
+
+class HashingStream:
+    """
+    Yazılan içeriğin boyutunu ve SHA-256 özetini yazma sırasında hesaplayan dosya nesnesi sarmalayıcısı
+
+    Diğer tüm işlemler (read, seek, name, close ...) sarılan nesneye iletilir.
+    """
+
+    def __init__(self, stream: BinaryIO, max_bytes: int = MAX_UPLOAD_BYTES):
+        self._stream = stream
+        self._digest = hashlib.sha256()
+        self.max_bytes = max_bytes
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise UploadTooLargeError(f"Dosya çok büyük (en fazla {MAX_UPLOAD_MB:g} MB)")
+        self._digest.update(data)
+        return self._stream.write(data)
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    def __iter__(self):
+        return iter(self._stream)
+
+
+class SpoolingRequest(Request):
+    """
+    Yüklenen dosyaları boyuta göre bellekte veya adlandırılmış geçici dosyada tutan istek sınıfı
+
+    Werkzeug'un varsayılanı büyük dosyaları isimsiz geçici dosyaya alır; isim
+    olmadan içerik başka bir process'e ancak kopyalanarak aktarılabilir.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._spooled_paths: List[str] = []
+
+    def _get_file_stream(self, total_content_length: Optional[int], content_type: Optional[str],
+                         filename: Optional[str] = None, content_length: Optional[int] = None) -> BinaryIO:
+        if total_content_length is not None and total_content_length <= UPLOAD_SPOOL_THRESHOLD:
+            return HashingStream(io.BytesIO())
+
+        # Windows'ta açık dosya silinemediği için dosya istek kapanınca (close) silinir
+        spool = tempfile.NamedTemporaryFile(prefix="cv_upload_", delete=False)
+        self._spooled_paths.append(spool.name)
+        return HashingStream(spool)
+
+    def close(self) -> None:
+        """Dosya nesnelerini kapatır ve diske alınan geçici dosyaları siler"""
+        try:
+            super().close()
+        finally:
+            for path in self._spooled_paths:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+
+class UploadedDocument:
+    """Akış halinde okunup özetlenmiş (hash) yüklenen dosya"""
+
+    def __init__(self, stream: BinaryIO, filename: str, content_type: Optional[str],
+                 size: int, sha256: str):
+        """
+        Args:
+            stream: Yüklenen içeriğin dosya nesnesi (bellekte veya diskte)
+            filename: Dosya adı
+            content_type: İstemcinin bildirdiği MIME tipi
+            size: Byte cinsinden boyut
+            sha256: İçeriğin SHA-256 özeti (hex)
+        """
+        self.stream = stream
+        self.filename = filename
+        self.content_type = content_type
+        self.size = size
+        self.sha256 = sha256
+
+    @property
+    def extension(self) -> str:
+        return os.path.splitext(self.filename)[1]
+
+    @property
+    def path(self) -> Optional[str]:
+        """İçerik diske alındıysa geçici dosyanın yolu, bellekteyse None"""
+        name = getattr(self.stream, "name", None)
+        return name if isinstance(name, str) and os.path.isfile(name) else None
+
+    @property
+    def source(self) -> Union[str, BinaryIO]:
+        """Çıkarıcılara verilecek kaynak: diskteyse yol, değilse dosya nesnesi"""
+        return self.path or self.stream
+
+    def file_info(self) -> dict:
+        return {
+            "filename": self.filename,
+            "content_type": self.content_type,
+            "size": self.size,
+            "sha256": self.sha256
+        }
+
+
+def receive_upload(file_storage, max_bytes: int = MAX_UPLOAD_BYTES) -> UploadedDocument:
+    """
+    Yüklenen dosyanın boyutunu ve özetini döndürür
+
+    SpoolingRequest ile alınan dosyalarda boyut ve özet yazma sırasında
+    hesaplanmıştır; dosya tekrar okunmaz. Diğer dosya nesneleri parça parça
+    tek geçişte okunur. İçerik bellekte tekrar kopyalanmaz; dosya nesnesi
+    başa sarılıp UploadedDocument içinde olduğu gibi kullanılır.
+
+    Args:
+        file_storage: request.files içindeki werkzeug FileStorage nesnesi
+        max_bytes: İzin verilen en büyük dosya boyutu
+
+    Returns:
+        UploadedDocument
+
+    Raises:
+        UploadTooLargeError: Dosya max_bytes sınırını aşarsa
+    """
+    # Aynı istekte tekrar çağrılırsa (ör. önce istek birleştirme anahtarı için) dosya yeniden okunmaz
+    received = getattr(file_storage, "_received_upload", None)
+    if received is not None:
+        received.stream.seek(0)
+        return received
+
+    stream = file_storage.stream
+    if isinstance(stream, HashingStream):
+        # Sınır yazma sırasında MAX_UPLOAD_BYTES ile uygulandı; daha küçük bir sınır istenmiş olabilir
+        size, sha256 = stream.size, stream.sha256
+        if size > max_bytes:
+            raise UploadTooLargeError(f"Dosya çok büyük (en fazla {MAX_UPLOAD_MB:g} MB)")
+    else:
+        stream.seek(0)
+        digest = hashlib.sha256()
+        size = 0
+        while True:
+            chunk = stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLargeError(f"Dosya çok büyük (en fazla {MAX_UPLOAD_MB:g} MB)")
+            digest.update(chunk)
+        sha256 = digest.hexdigest()
+
+    # Diskteki dosya başka bir process'te yoluyla açılacağı için tamponu boşalt
+    stream.flush()
+    stream.seek(0)
+
+    upload = UploadedDocument(stream, file_storage.filename or "", file_storage.content_type,
+                              size, sha256)
+    print(f"📥 Yükleme alındı: {upload.filename} ({size} byte, "
+          f"{'disk' if upload.path else 'bellek'}, sha256={upload.sha256[:12]})")
+    file_storage._received_upload = upload
+    return upload
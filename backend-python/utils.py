@@ -2,114 +2,433 @@
 PDF ve DOCX dosya okuma yardımcı fonksiyonları
 """
 
-import PyPDF2
 import docx
 import io
+import multiprocessing
+import os
 import re
-from typing import Optional
+import time
+import zipfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+from xml.etree import ElementTree
+from dotenv import load_dotenv
+from pdf_backends import PdfBackend, PdfDocumentHandle, available_pdf_backends, get_pdf_backend
 
-def extract_text_from_pdf(file_content: bytes) -> Optional[str]:
+load_dotenv('config.env')
+
+# PDF okuma limitleri (config.env üzerinden değiştirilebilir)
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "100"))
+PDF_TIMEOUT_SECONDS = float(os.getenv("PDF_TIMEOUT_SECONDS", "30"))
+PDF_PARALLEL_PAGE_THRESHOLD = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "20"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+
+# Denenecek PDF backend'leri (sırayla); boş metin dönerse bir sonrakine geçilir
+PDF_BACKENDS = [name for name in os.getenv("PDF_BACKENDS", "pypdf2,pypdfium2,pdfminer").split(",") if name.strip()]
+
+# Belge kaynağı: dosya yolu, byte içeriği veya okunabilir (seek destekli) dosya nesnesi
+DocumentSource = Union[str, bytes, bytearray, memoryview, BinaryIO]
+
+_pdf_backend_chain = None
+
+@contextmanager
+def open_document_source(source: DocumentSource) -> Iterator[BinaryIO]:
+    """
+    Belge kaynağını baştan okunabilir bir dosya nesnesi olarak açar
+
+    Dosya yolları açılıp işlem sonunda kapatılır; byte içeriği kopyalanmadan
+    BytesIO ile sarılır; dosya nesneleri başa sarılıp olduğu gibi kullanılır.
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as file:
+            yield file
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    else:
+        source.seek(0)
+        yield source
+
+def document_size(source: DocumentSource) -> int:
+    """Belge kaynağının byte cinsinden boyutunu döndürür"""
+    if isinstance(source, str):
+        return os.path.getsize(source)
+    if isinstance(source, memoryview):
+        return source.nbytes
+    if isinstance(source, (bytes, bytearray)):
+        return len(source)
+    position = source.tell()
+    size = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return size
+
+def _picklable_source(source: DocumentSource) -> Union[str, bytes]:
+    """Kaynağı başka bir process'e gönderilebilir hale getirir (dosya yolu olduğu gibi kalır)"""
+    if isinstance(source, (str, bytes)):
+        return source
+    with open_document_source(source) as stream:
+        return stream.read()
+
+def _get_pdf_backend_chain(names: Optional[List[str]] = None) -> List[PdfBackend]:
+    """Yapılandırılmış (veya verilen) sıradaki kurulu PDF backend'lerini döndürür"""
+    global _pdf_backend_chain
+    if names is not None:
+        return available_pdf_backends(names)
+    if _pdf_backend_chain is None:
+        _pdf_backend_chain = available_pdf_backends(PDF_BACKENDS)
+    return _pdf_backend_chain
+
+def _timed_pages(handle: PdfDocumentHandle, start: int, stop: int) -> Iterator[Tuple[int, str, float]]:
+    """Sayfaları sırayla okuyup (sayfa indeksi, metin, süre sn) üretir"""
+    pages = handle.iter_pages(start, stop)
+    for i in range(start, stop):
+        started = time.perf_counter()
+        page_text = next(pages)
+        yield i, page_text, time.perf_counter() - started
+
+def _extract_pdf_page_range(task: Tuple[str, Union[str, bytes], int, int]) -> List[Tuple[int, str, float]]:
+    """
+    PDF'in [start, stop) aralığındaki sayfalarını okur (paralel okuma worker'ında çalışır)
+
+    Args:
+        task: (PDF backend'inin adı, PDF dosya yolu veya byte içeriği, ilk sayfa indeksi, son sayfa indeksi (hariç))
+
+    Returns:
+        (sayfa indeksi, sayfa metni, süre sn) listesi
+    """
+    backend_name, source, start, stop = task
+    with open_document_source(source) as stream:
+        handle = get_pdf_backend(backend_name).open(stream)
+        return list(_timed_pages(handle, start, stop))
+
+def _pdf_worker_context():
+    # fork: worker'lar modülleri yeniden import etmez (izole okuma worker'ının bellek sınırını miras alırlar)
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+def _extract_pdf_pages_parallel(backend: PdfBackend, source: DocumentSource, page_count: int, deadline: float,
+                                max_chars: Optional[int] = None) -> Tuple[List[Tuple[int, str, float]], bool]:
+    """
+    Sayfaları aralıklara bölüp paralel okur; sonuçlar sayfa sırasıyla toplanır
+
+    Karakter bütçesi dolunca veya zaman limiti aşılınca kalan aralıkları
+    okuyan worker'lar beklenmeden sonlandırılır.
+
+    Returns:
+        (sayfa listesi, okuma erken durduruldu mu)
+    """
+    # Belge açılırken harcanan süre düşülmüş, bu okumaya kalan süre
+    budget = max(0.0, deadline - time.perf_counter())
+    step = max(1, -(-page_count // (PDF_WORKERS * 2)))
+    # Diske alınmış yüklemelerde worker'lara içerik yerine dosya yolu gönderilir
+    source = _picklable_source(source)
+    tasks = [(backend.name, source, start, min(start + step, page_count)) for start in range(0, page_count, step)]
+
+    pages = []
+    total_chars = 0
+    stopped = False
+    pool = _pdf_worker_context().Pool(processes=min(PDF_WORKERS, len(tasks)))
+    try:
+        results = pool.imap(_extract_pdf_page_range, tasks)
+        for index in range(len(tasks)):
+            try:
+                chunk = results.next(timeout=max(0.0, deadline - time.perf_counter()))
+            except multiprocessing.TimeoutError:
+                print(f"⚠️ PDF zaman limiti aşıldı ({budget:.1f} sn), {len(tasks) - index} sayfa grubu atlandı")
+                stopped = True
+                break
+            pages.extend(chunk)
+            total_chars += sum(cleaned_length(page_text) + 1 for _, page_text, _ in chunk)
+            if max_chars is not None and total_chars >= max_chars and index < len(tasks) - 1:
+                print(f"✂️ Karakter bütçesi doldu ({max_chars}), {len(tasks) - index - 1} sayfa grubu okunmadı")
+                stopped = True
+                break
+    finally:
+        # Çalışmakta olan worker'lar da durdurulur; zaman limiti gerçekten uygulanır
+        pool.terminate()
+        pool.join()
+    return pages, stopped
+
+def cleaned_length(text: str) -> int:
+    """Metnin clean_text sonrası (boşluklar birleştirilmiş) uzunluğunu hesaplar"""
+    return len(' '.join(text.split()))
+
+def _extract_pdf_pages_sequential(handle: PdfDocumentHandle, page_count: int, deadline: float,
+                                  max_chars: Optional[int] = None) -> Tuple[List[Tuple[int, str, float]], bool]:
+    """Sayfaları sırayla okur; zaman limiti aşılınca veya karakter bütçesi dolunca durur"""
+    budget = max(0.0, deadline - time.perf_counter())
+    pages = []
+    total_chars = 0
+    for i, page_text, seconds in _timed_pages(handle, 0, page_count):
+        pages.append((i, page_text, seconds))
+        # Sayfalar arasındaki birleştirme boşluğu da temizlenmiş metinde yer alır
+        total_chars += cleaned_length(page_text) + 1
+        remaining = page_count - i - 1
+        if not remaining:
+            break
+        if max_chars is not None and total_chars >= max_chars:
+            print(f"✂️ Karakter bütçesi doldu ({max_chars}), {remaining} sayfa okunmadı")
+            return pages, True
+        if time.perf_counter() > deadline:
+            print(f"⚠️ PDF zaman limiti aşıldı ({budget:.1f} sn), {remaining} sayfa atlandı")
+            return pages, True
+    return pages, False
+
+def _extract_pdf_with_backend(backend: PdfBackend, source: DocumentSource,
+                              max_chars: Optional[int] = None) -> Tuple[str, bool]:
+    """Tek bir backend ile sayfa limiti, zaman limiti ve bütçe dahilinde PDF okur"""
+    started = time.perf_counter()
+    deadline = started + PDF_TIMEOUT_SECONDS
+
+    with open_document_source(source) as stream:
+        handle = backend.open(stream)
+        total_pages = handle.page_count
+        page_count = min(total_pages, PDF_MAX_PAGES)
+        truncated = total_pages > page_count
+        print(f"📄 PDF sayfa sayısı: {total_pages} (backend: {backend.name})")
+        if truncated:
+            print(f"⚠️ Sayfa limiti: sadece ilk {page_count} sayfa okunacak")
+
+        # Büyük belgelerde sayfalar paralel okunur (sayfa sırası ve bütçe korunur)
+        if page_count > PDF_PARALLEL_PAGE_THRESHOLD and PDF_WORKERS > 1:
+            print(f"⚡ Paralel okuma: {PDF_WORKERS} process")
+            pages, stopped = _extract_pdf_pages_parallel(backend, source, page_count, deadline, max_chars)
+            truncated = truncated or stopped
+        else:
+            pages, stopped = _extract_pdf_pages_sequential(handle, page_count, deadline, max_chars)
+            truncated = truncated or stopped
+
+    for i, page_text, seconds in pages:
+        print(f"📝 Sayfa {i+1}: {len(page_text)} karakter ({seconds * 1000:.1f} ms)")
+
+    final_text = "\n".join(page_text for _, page_text, _ in pages).strip()
+    print(f"✅ PDF okuma tamamlandı: {len(final_text)} karakter, {len(pages)} sayfa, {(time.perf_counter() - started) * 1000:.1f} ms")
+    return final_text, truncated
+
+def extract_text_from_pdf(source: DocumentSource, max_chars: Optional[int] = None,
+                          backends: Optional[List[str]] = None) -> Tuple[Optional[str], bool]:
     """
     PDF dosyasından metin çıkarır
+
+    PDF_BACKENDS sırasındaki backend'ler denenir; biri hata verir veya boş metin
+    döndürürse bir sonrakine geçilir. Sayfa sayısı PDF_PARALLEL_PAGE_THRESHOLD'u
+    aşan belgeler worker process'lerde sayfa sırasıyla paralel okunur. En fazla
+    PDF_MAX_PAGES sayfa ve PDF_TIMEOUT_SECONDS süre harcanır. Karakter bütçesi
+    verilirse bütçe dolunca (paralel okumada kalan worker'lar sonlandırılarak) durulur.
     
     Args:
-        file_content: PDF dosyasının byte içeriği
+        source: PDF dosya yolu, byte içeriği veya dosya nesnesi
+        max_chars: Temizlenmiş metin için karakter bütçesi (opsiyonel)
+        backends: Denenecek backend adları (varsayılan: PDF_BACKENDS)
         
     Returns:
-        Çıkarılan metin veya None
+        (Çıkarılan metin veya None, metin kısaltıldı mı)
     """
-    try:
-        print(f"🔍 PDF okuma başlatılıyor...")
-        
-        # PDF dosyasını oku
-        pdf_file = io.BytesIO(file_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        
-        print(f"📄 PDF sayfa sayısı: {len(pdf_reader.pages)}")
-        
-        text = ""
-        # Tüm sayfaları oku
-        for i, page in enumerate(pdf_reader.pages):
-            page_text = page.extract_text()
-            text += page_text + "\n"
-            print(f"📝 Sayfa {i+1}: {len(page_text)} karakter")
-            
-        final_text = text.strip()
-        print(f"✅ PDF okuma tamamlandı: {len(final_text)} karakter")
-        print(f"📋 İlk 200 karakter: {final_text[:200]}...")
-        
-        return final_text
-        
-    except Exception as e:
-        print(f"❌ PDF okuma hatası: {e}")
-        return None
+    print(f"🔍 PDF okuma başlatılıyor...")
+
+    for backend in _get_pdf_backend_chain(backends):
+        try:
+            final_text, truncated = _extract_pdf_with_backend(backend, source, max_chars)
+        except Exception as e:
+            print(f"❌ PDF okuma hatası ({backend.name}): {e}")
+            continue
+
+        if final_text:
+            print(f"📋 İlk 200 karakter: {final_text[:200]}...")
+            return final_text, truncated
+        print(f"⚠️ {backend.name} boş metin döndürdü, sonraki backend deneniyor...")
+
+    print("❌ Hiçbir PDF backend'i metin çıkaramadı")
+    return None, False
+
+# DOCX okuyucu: "stream" (varsayılan, zip içinden artımlı XML) veya "python-docx"
+DOCX_READER = os.getenv("DOCX_READER", "stream").lower()
+DOCX_MAX_XML_BYTES = int(os.getenv("DOCX_MAX_XML_BYTES", str(50 * 1024 * 1024)))
 
-def extract_text_from_docx(file_content: bytes) -> Optional[str]:
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_P, _W_T, _W_TAB, _W_BR = _W_NS + "p", _W_NS + "t", _W_NS + "tab", _W_NS + "br"
+_W_TC, _W_TR, _W_BODY = _W_NS + "tc", _W_NS + "tr", _W_NS + "body"
+
+def _iter_docx_blocks_streaming(source: DocumentSource) -> Iterator[str]:
+    """
+    word/document.xml'i zip içinden akış halinde artımlı XML parser ile okur
+
+    Paragrafları ve tablo satırlarını (hücreler " | " ile ayrılmış) belge
+    sırasıyla üretir; python-docx nesne modeli oluşturulmaz. Metin kutusu
+    (w:txbxContent) paragrafları içinde bulundukları paragraftan sonra ayrı
+    blok olarak üretilir. İşlenen gövde elemanları ağaçtan silinir; bellek
+    kullanımı belge boyutuyla değil en büyük tek blokla sınırlıdır.
+
+    Args:
+        source: DOCX dosya yolu, byte içeriği veya dosya nesnesi
+
+    Yields:
+        Paragraf veya tablo satırı metni
+    """
+    with open_document_source(source) as stream, zipfile.ZipFile(stream) as archive:
+        info = archive.getinfo("word/document.xml")
+        if info.file_size > DOCX_MAX_XML_BYTES:
+            raise ValueError(f"document.xml çok büyük: {info.file_size} byte (limit: {DOCX_MAX_XML_BYTES})")
+
+        with archive.open(info) as xml_stream:
+            # Açık paragraflar (metin kutusunda iç içe olabilir): (run'lar, içindeki metin kutusu blokları)
+            paragraphs: List[Tuple[List[str], List[str]]] = []
+            # İç içe tablolar için her seviyede (satır hücreleri, hücre paragrafları)
+            rows: List[List[str]] = []
+            cells: List[List[str]] = []
+            # Açık paragraf / hücre sırası: biten blok en içteki kapsayıcıya eklenir
+            containers: List[str] = []
+            body = None
+            depth = 0
+
+            for event, elem in ElementTree.iterparse(xml_stream, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    depth += 1
+                    if tag == _W_P:
+                        paragraphs.append(([], []))
+                        containers.append(tag)
+                    elif tag == _W_TR:
+                        rows.append([])
+                    elif tag == _W_TC:
+                        cells.append([])
+                        containers.append(tag)
+                    elif tag == _W_BODY:
+                        body = elem
+                    continue
+
+                depth -= 1
+                blocks: List[str] = []
+                if tag == _W_T:
+                    if paragraphs:
+                        paragraphs[-1][0].append(elem.text or "")
+                elif tag == _W_TAB:
+                    if paragraphs:
+                        paragraphs[-1][0].append("\t")
+                elif tag == _W_BR:
+                    if paragraphs:
+                        paragraphs[-1][0].append("\n")
+                elif tag == _W_P:
+                    containers.pop()
+                    runs, nested = paragraphs.pop()
+                    blocks = ["".join(runs)] + nested
+                    elem.clear()
+                elif tag == _W_TC:
+                    containers.pop()
+                    cell = " ".join(p for p in cells.pop() if p.strip())
+                    if rows:
+                        rows[-1].append(cell)
+                    elem.clear()
+                elif tag == _W_TR:
+                    blocks = [" | ".join(cell for cell in rows.pop() if cell)]
+                    elem.clear()
+
+                if blocks:
+                    if containers and containers[-1] == _W_P:
+                        # Metin kutusundaki blok, içinde bulunduğu paragraf bitince üretilir
+                        paragraphs[-1][1].extend(blocks)
+                    elif containers:
+                        cells[-1].extend(blocks)
+                    else:
+                        yield from (block for block in blocks if block.strip())
+
+                # w:document > w:body > blok: işlenen gövde elemanı ağaçtan çıkarılır
+                if depth == 2 and body is not None:
+                    body.remove(elem)
+
+def _iter_docx_blocks_python_docx(source: DocumentSource) -> Iterator[str]:
+    """python-docx nesne modeli ile paragrafları okur (sadece gövde paragrafları)"""
+    with open_document_source(source) as stream:
+        doc = docx.Document(stream)
+    for paragraph in doc.paragraphs:
+        if paragraph.text.strip():  # Boş paragrafları atla
+            yield paragraph.text
+
+def extract_text_from_docx(source: DocumentSource, max_chars: Optional[int] = None,
+                           reader: Optional[str] = None) -> Tuple[Optional[str], bool]:
     """
     DOCX dosyasından metin çıkarır
+
+    Varsayılan okuyucu word/document.xml'i akış halinde okur, tablo hücrelerini de
+    belge sırasıyla dahil eder ve karakter bütçesi dolunca okumayı bırakır.
     
     Args:
-        file_content: DOCX dosyasının byte içeriği
+        source: DOCX dosya yolu, byte içeriği veya dosya nesnesi
+        max_chars: Temizlenmiş metin için karakter bütçesi (opsiyonel)
+        reader: "stream" veya "python-docx" (varsayılan: DOCX_READER)
         
     Returns:
-        Çıkarılan metin veya None
+        (Çıkarılan metin veya None, metin kısaltıldı mı)
     """
     try:
-        print(f"🔍 DOCX okuma başlatılıyor...")
+        reader = (reader or DOCX_READER).lower()
+        print(f"🔍 DOCX okuma başlatılıyor... (okuyucu: {reader})")
+        started = time.perf_counter()
         
-        # DOCX dosyasını oku
-        docx_file = io.BytesIO(file_content)
-        doc = docx.Document(docx_file)
+        if reader == "python-docx":
+            blocks = _iter_docx_blocks_python_docx(source)
+        else:
+            blocks = _iter_docx_blocks_streaming(source)
         
-        print(f"📄 DOCX paragraf sayısı: {len(doc.paragraphs)}")
-        
-        text = ""
-        # Tüm paragrafları oku
-        for i, paragraph in enumerate(doc.paragraphs):
-            if paragraph.text.strip():  # Boş paragrafları atla
-                text += paragraph.text + "\n"
-                print(f"📝 Paragraf {i+1}: {len(paragraph.text)} karakter")
+        parts = []
+        total_chars = 0
+        truncated = False
+        # Paragrafları bütçe dolana kadar oku
+        for block in blocks:
+            if max_chars is not None and total_chars >= max_chars:
+                print(f"✂️ Karakter bütçesi doldu ({max_chars}), kalan paragraflar okunmadı")
+                truncated = True
+                break
+            parts.append(block)
+            total_chars += cleaned_length(block) + 1
+        blocks.close()
             
-        final_text = text.strip()
-        print(f"✅ DOCX okuma tamamlandı: {len(final_text)} karakter")
+        final_text = "\n".join(parts).strip()
+        print(f"✅ DOCX okuma tamamlandı: {len(parts)} blok, {len(final_text)} karakter, {(time.perf_counter() - started) * 1000:.1f} ms")
         print(f"📋 İlk 200 karakter: {final_text[:200]}...")
         
-        return final_text
+        return final_text, truncated
         
     except Exception as e:
         print(f"❌ DOCX okuma hatası: {e}")
-        return None
+        return None, False
 
-def extract_text_from_file(file_content: bytes, file_extension: str) -> Optional[str]:
+def extract_text_from_file(source: DocumentSource, file_extension: str,
+                           max_chars: Optional[int] = None) -> Tuple[Optional[str], bool]:
     """
     Dosya uzantısına göre metin çıkarır
+
+    Karakter bütçesi verilirse temizlenmiş metin bütçeye ulaştığında sayfa/paragraf
+    okuma durdurulur; böylece okuma maliyeti prompt'ta kullanılabilecek metinle sınırlı kalır.
     
     Args:
-        file_content: Dosya içeriği
+        source: Dosya yolu, byte içeriği veya dosya nesnesi
         file_extension: Dosya uzantısı (.pdf, .docx)
+        max_chars: Temizlenmiş metin için karakter bütçesi (opsiyonel)
         
     Returns:
-        Çıkarılan metin veya None
+        (Çıkarılan metin veya None, metin bütçe/limit nedeniyle kısaltıldı mı)
     """
     print(f"🔍 Dosya okuma başlatılıyor: {file_extension}")
-    print(f"📊 Dosya boyutu: {len(file_content)} byte")
+    print(f"📊 Dosya boyutu: {document_size(source)} byte")
     
     file_extension = file_extension.lower()
     
     if file_extension == '.pdf':
-        result = extract_text_from_pdf(file_content)
+        result, truncated = extract_text_from_pdf(source, max_chars)
     elif file_extension == '.docx':
-        result = extract_text_from_docx(file_content)
+        result, truncated = extract_text_from_docx(source, max_chars)
     else:
         print(f"❌ Desteklenmeyen dosya formatı: {file_extension}")
-        return None
+        return None, False
     
     if result:
-        print(f"✅ Dosya okuma başarılı: {len(result)} karakter")
+        truncated = truncated or (max_chars is not None and cleaned_length(result) > max_chars)
+        print(f"✅ Dosya okuma başarılı: {len(result)} karakter{' (bütçe nedeniyle kısaltıldı)' if truncated else ''}")
     else:
         print(f"❌ Dosya okuma başarısız")
     
-    return result
+    return result, truncated
 
 def clean_text(text: str) -> str:
     """
@@ -0,0 +1,328 @@
+"""
+Bellek eşlemeli (memory-mapped) düz vektör indeksi
+
+Küçük bilgi tabanları için ChromaDB'ye hafif bir alternatif: normalize
+edilmiş float32 matris `.npy` olarak saklanır, metadata yan dosyada tutulur
+ve top-k arama tek bir matris-vektör çarpımı ile tam (exact) yapılır.
+Matris salt okunur mmap ile açıldığından aynı makinedeki worker process'ler
+işletim sisteminin sayfa önbelleğini paylaşır.
+
+Büyük indekslerde matris float16 veya vektör başına ölçekli int8 olarak
+saklanabilir (float32'ye göre 2x / ~4x daha az bellek). Skorlar kompakt
+dizi üzerinde blok blok hesaplanır; float32 kopyası hiçbir zaman tamamen
+oluşturulmaz.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+VECTORS_FILE = "vectors.npy"
+SCALES_FILE = "scales.npy"
+METADATA_FILE = "metadata.json"
+
+VECTOR_DTYPES = ("float32", "float16", "int8")
+# NumPy'da float16/int8 için BLAS yok: skorlar bu kadar satırlık float32 bloklarla hesaplanır
+SCORE_BLOCK_ROWS = 2048
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """Satırları L2 normuna göre normalize eder"""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def quantize_vectors(matrix: np.ndarray, dtype: str = "float32") -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Normalize edilmiş float32 matrisi kompakt saklama biçimine çevirir
+
+    Args:
+        matrix: (n, d) float32 matris
+        dtype: "float32", "float16" veya "int8"
+
+    Returns:
+        (kompakt matris, int8 için satır başına float32 ölçekler, diğerlerinde None)
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if dtype == "float32":
+        return np.ascontiguousarray(matrix), None
+    if dtype == "float16":
+        return np.ascontiguousarray(matrix, dtype=np.float16), None
+    if dtype == "int8":
+        # Simetrik skaler quantization: her satır kendi en büyük mutlak değerine göre [-127, 127]'ye ölçeklenir
+        scales = np.abs(matrix).max(axis=1) / 127.0 if matrix.size else np.zeros(matrix.shape[0], dtype=np.float32)
+        scales[scales == 0] = 1.0
+        quantized = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+    raise ValueError(f"Desteklenmeyen vektör tipi: {dtype} (seçenekler: {', '.join(VECTOR_DTYPES)})")
+
+
+def dequantize_vectors(vectors: np.ndarray, scales: Optional[np.ndarray] = None) -> np.ndarray:
+    """Kompakt satırları float32'ye geri çevirir"""
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if scales is not None:
+        matrix *= np.asarray(scales, dtype=np.float32)[:, None]
+    return matrix
+
+
+def compact_scores(vectors: np.ndarray, scales: Optional[np.ndarray], query: np.ndarray,
+                   block_rows: int = SCORE_BLOCK_ROWS) -> np.ndarray:
+    """
+    Sorgu vektörü ile kompakt matrisin tüm satırları arasındaki skorları hesaplar
+
+    Args:
+        vectors: float32, float16 veya int8 matris (mmap olabilir)
+        scales: int8 için satır başına ölçekler
+        query: Normalize edilmiş float32 sorgu vektörü
+        block_rows: Tek seferde float32'ye çevrilecek satır sayısı
+
+    Returns:
+        (n,) float32 skor dizisi
+    """
+    if vectors.dtype == np.float32:
+        return vectors @ query
+
+    scores = np.empty(vectors.shape[0], dtype=np.float32)
+    for start in range(0, vectors.shape[0], block_rows):
+        block = np.asarray(vectors[start:start + block_rows], dtype=np.float32)
+        scores[start:start + block.shape[0]] = block @ query
+    if scales is not None:
+        scores *= scales
+    return scores
+
+
+class FlatVectorIndex:
+    """Salt okunur, mmap ile açılan düz vektör indeksi"""
+
+    def __init__(self, directory: str, embedding_function=None):
+        """
+        Args:
+            directory: İndeks klasörü
+            embedding_function: Sorguları embed etmek için LangChain embedding nesnesi
+        """
+        self.directory = directory
+        self.embedding_function = embedding_function
+        self.vectors = np.load(os.path.join(directory, VECTORS_FILE), mmap_mode='r')
+        self.scales = None
+        if self.vectors.dtype == np.int8:
+            self.scales = np.load(os.path.join(directory, SCALES_FILE), mmap_mode='r')
+        with open(os.path.join(directory, METADATA_FILE), 'r', encoding='utf-8') as file:
+            self.records = json.load(file)
+
+        if len(self.records) != self.vectors.shape[0]:
+            raise ValueError(
+                f"İndeks bozuk: {self.vectors.shape[0]} vektör, {len(self.records)} metadata kaydı"
+            )
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        """Klasörde okunabilir bir indeks olup olmadığını kontrol eder"""
+        return (os.path.exists(os.path.join(directory, VECTORS_FILE))
+                and os.path.exists(os.path.join(directory, METADATA_FILE)))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def dtype(self) -> str:
+        """Vektörlerin saklama tipi ("float32", "float16" veya "int8")"""
+        return self.vectors.dtype.name
+
+    @property
+    def nbytes(self) -> int:
+        """Vektör matrisi ve ölçeklerin bayt cinsinden boyutu"""
+        return self.vectors.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def get_vectors(self, ids: List[int]) -> np.ndarray:
+        """Kayıt indekslerine karşılık gelen vektörleri float32 olarak döndürür"""
+        ids = np.asarray(ids, dtype=np.int64)
+        return dequantize_vectors(self.vectors[ids], self.scales[ids] if self.scales is not None else None)
+
+    def search_by_vector(self, vector, k: int = 4) -> List[Tuple[int, float]]:
+        """
+        Sorgu vektörüne en yakın k kaydı bulur
+
+        Args:
+            vector: Sorgu embedding vektörü
+            k: Getirilecek kayıt sayısı
+
+        Returns:
+            (kayıt indeksi, cosine skoru) listesi, skora göre azalan
+        """
+        if len(self.records) == 0:
+            return []
+
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        scores = compact_scores(self.vectors, self.scales, query)
+
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def _to_document(self, index: int) -> Document:
+        record = self.records[index]
+        return Document(page_content=record["text"], metadata=record.get("metadata", {}))
+
+    def similarity_search_with_score(self, query: str, k: int = 4) -> List[Tuple[Document, float]]:
+        """
+        Metin sorgusu için en benzer belge parçalarını skorlarıyla döndürür
+
+        Args:
+            query: Sorgu metni
+            k: Getirilecek belge parçası sayısı
+
+        Returns:
+            (Document, cosine skoru) listesi
+        """
+        vector = self.embedding_function.embed_query(query)
+        return [(self._to_document(i), score) for i, score in self.search_by_vector(vector, k)]
+
+    def similarity_search(self, query: str, k: int = 4) -> List[Document]:
+        """Chroma ile aynı arayüz: en benzer k belge parçasını döndürür"""
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def get_documents(self, ids: List[int]) -> List[Document]:
+        """Kayıt indekslerine karşılık gelen belge parçalarını sırayla döndürür"""
+        return [self._to_document(i) for i in ids]
+
+
+class FlatVectorIndexWriter:
+    """Ingestion sırasında düz indeksi biriktirip diske yazan yardımcı sınıf"""
+
+    def __init__(self, directory: str, embedding_function):
+        """
+        Args:
+            directory: İndeksin yazılacağı klasör
+            embedding_function: Chunk'ları embed etmek için LangChain embedding nesnesi
+        """
+        self.directory = directory
+        self.embedding_function = embedding_function
+        self._vectors: List[np.ndarray] = []
+        self._records: List[Dict] = []
+
+    def add_texts(self, texts: List[str], metadatas: Optional[List[Dict]] = None) -> List[int]:
+        """Chroma ile aynı arayüz: metinleri embed edip indekse ekler ve id'lerini döndürür"""
+        vectors = self.embedding_function.embed_documents(texts)
+        return self.add_vectors(vectors, texts, metadatas)
+
+    def add_vectors(self, vectors, texts: List[str], metadatas: Optional[List[Dict]] = None) -> List[int]:
+        """Önceden hesaplanmış embedding'leri metinleriyle birlikte indekse ekler"""
+        metadatas = metadatas or [{} for _ in texts]
+        self._vectors.append(_normalize(np.asarray(vectors, dtype=np.float32)))
+        ids = []
+        for text, metadata in zip(texts, metadatas):
+            ids.append(len(self._records))
+            self._records.append({"id": ids[-1], "text": text, "metadata": metadata})
+        return ids
+
+    def persist(self, dtype: str = "float32") -> None:
+        """
+        İndeksi geçici dosyalara yazıp atomik olarak yerine taşır
+
+        Args:
+            dtype: Vektörlerin saklama tipi ("float32", "float16" veya "int8")
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if self._vectors:
+            matrix = np.vstack(self._vectors)
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        matrix, scales = quantize_vectors(matrix, dtype)
+
+        vectors_path = os.path.join(self.directory, VECTORS_FILE)
+        scales_path = os.path.join(self.directory, SCALES_FILE)
+        metadata_path = os.path.join(self.directory, METADATA_FILE)
+
+        with open(vectors_path + ".tmp", 'wb') as file:
+            np.save(file, matrix)
+        if scales is not None:
+            with open(scales_path + ".tmp", 'wb') as file:
+                np.save(file, scales)
+        with open(metadata_path + ".tmp", 'w', encoding='utf-8') as file:
+            json.dump(self._records, file, ensure_ascii=False)
+
+        if scales is not None:
+            os.replace(scales_path + ".tmp", scales_path)
+        os.replace(vectors_path + ".tmp", vectors_path)
+        os.replace(metadata_path + ".tmp", metadata_path)
+        if scales is None and os.path.exists(scales_path):
+            os.remove(scales_path)
+
+
+def search_ranked_ids(store, query: str, k: int) -> List[Tuple[object, float]]:
+    """
+    Vektör deposundan sıralı (chunk id, cosine skoru) listesi alır
+
+    Args:
+        store: FlatVectorIndex veya LangChain Chroma nesnesi
+        query: Sorgu metni
+        k: Getirilecek chunk sayısı
+
+    Returns:
+        (chunk id, skor) listesi, skora göre azalan
+    """
+    if isinstance(store, FlatVectorIndex):
+        return store.search_by_vector(store.embedding_function.embed_query(query), k)
+
+    vector = store._embedding_function.embed_query(query)
+    result = store._collection.query(query_embeddings=[vector], n_results=k, include=["distances"])
+    # MiniLM vektörleri birim normlu: kare L2 mesafesi d = 2 - 2*cos
+    return [(chunk_id, 1.0 - distance / 2.0)
+            for chunk_id, distance in zip(result["ids"][0], result["distances"][0])]
+
+
+def score_candidates(store, query: str, ids: List[object], k: int) -> List[Tuple[object, float]]:
+    """
+    Aday chunk'ları sorguya göre dense (cosine) skorla yeniden sıralar
+
+    Args:
+        store: FlatVectorIndex veya LangChain Chroma nesnesi
+        query: Sorgu metni
+        ids: Yeniden skorlanacak aday chunk id'leri
+        k: Döndürülecek chunk sayısı
+
+    Returns:
+        (chunk id, cosine skoru) listesi, skora göre azalan
+    """
+    if not ids:
+        return []
+
+    if isinstance(store, FlatVectorIndex):
+        query_vector = _normalize(np.asarray(store.embedding_function.embed_query(query), dtype=np.float32))
+        candidates = store.get_vectors(ids)
+    else:
+        query_vector = _normalize(np.asarray(store._embedding_function.embed_query(query), dtype=np.float32))
+        result = store._collection.get(ids=list(ids), include=["embeddings"])
+        ids = list(result["ids"])
+        candidates = _normalize(np.asarray(result["embeddings"], dtype=np.float32))
+
+    scores = candidates @ query_vector
+    order = np.argsort(-scores)[:k]
+    return [(ids[i], float(scores[i])) for i in order]
+
+
+def fetch_documents(store, ids: List[object]) -> List[Document]:
+    """
+    Chunk id'lerine karşılık gelen belge parçalarını verilen sırada döndürür
+
+    Args:
+        store: FlatVectorIndex veya LangChain Chroma nesnesi
+        ids: search_ranked_ids ile alınan chunk id'leri
+
+    Returns:
+        Document listesi
+    """
+    if isinstance(store, FlatVectorIndex):
+        return store.get_documents(ids)
+
+    result = store._collection.get(ids=list(ids), include=["documents", "metadatas"])
+    by_id = {
+        chunk_id: Document(page_content=text, metadata=metadata or {})
+        for chunk_id, text, metadata in zip(result["ids"], result["documents"], result["metadatas"])
+    }
+    return [by_id[chunk_id] for chunk_id in ids if chunk_id in by_id]